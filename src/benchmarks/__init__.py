@@ -0,0 +1,6 @@
+"""
+Growcube client library benchmarks
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Run from the src directory with ``python -m benchmarks``.
+"""
@@ -0,0 +1,52 @@
+import argparse
+import sys
+
+from .captures import load_capture, make_captures
+from .runner import BASELINE_PATH, BENCHMARKS, DEFAULT_TOLERANCE, compare, load_baseline, run_all, save_baseline
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Benchmark Growcube framing, parsing and dispatch")
+    parser.add_argument("--frames", type=int, default=2000, help="Number of frames in each capture")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the captures")
+    parser.add_argument("--capture", action="append",
+                        help="Capture file recorded from a device to run on, can be given more than once")
+    parser.add_argument("--rounds", type=int, default=5, help="Number of timed rounds")
+    parser.add_argument("--benchmark", action="append", choices=list(BENCHMARKS),
+                        help="Benchmark to run, can be given more than once, defaults to all")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Path of the baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 on regressions against the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative difference from the baseline")
+    args = parser.parse_args()
+
+    captures = make_captures(args.frames, args.seed) + [load_capture(path) for path in args.capture or []]
+    results = run_all(captures, args.benchmark, args.rounds)
+    print(f"{'benchmark':<26} {'frames/s':>12} {'MB/s':>8} {'p99 us':>10} {'peak B/frame':>12} "
+          f"{'kept blocks':>10}")
+    for result in results:
+        print(result)
+
+    if args.save_baseline:
+        save_baseline(results, args.frames, args.seed, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
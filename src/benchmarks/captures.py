@@ -0,0 +1,158 @@
+import os
+import random
+from typing import List
+
+from growcube_client.growcubecapture import GrowcubeCaptureReader
+from growcube_client.growcubeenums import CaptureDirection
+from growcube_client.growcubeframer import GrowcubeFrameScanner
+from growcube_client.growcubemessage import GrowcubeMessage
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+FRAME_SIZE = 64
+
+
+class GrowcubeCapture:
+    """
+    Synthetic capture of received data, as a list of chunks passed to data_received
+
+    :ivar name: Name of the capture.
+    :type name: str
+    :ivar chunks: The received data chunks.
+    :type chunks: list[bytes]
+    :ivar frames: Number of complete frames in the capture.
+    :type frames: int
+    """
+
+    def __init__(self, name: str, chunks: List[bytes], frames: int):
+        """
+        GrowcubeCapture constructor
+
+        :param name: Name of the capture.
+        :type name: str
+        :param chunks: The received data chunks.
+        :type chunks: list[bytes]
+        :param frames: Number of complete frames in the capture.
+        :type frames: int
+        """
+        self.name = name
+        self.chunks = chunks
+        self.frames = frames
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the capture
+
+        :return: Size in bytes.
+        :rtype: int
+        """
+        return sum(len(chunk) for chunk in self.chunks)
+
+
+def make_frames(rng: random.Random, count: int) -> List[bytes]:
+    """
+    Make a mix of reports as sent by the device, mostly moisture reports
+
+    :param rng: Random number generator.
+    :type rng: random.Random
+    :param count: Number of frames.
+    :type count: int
+    :return: The encoded frames, without padding.
+    :rtype: list[bytes]
+    """
+    frames = []
+    for _ in range(count):
+        kind = rng.random()
+        channel = rng.randrange(4)
+        if kind < 0.7:
+            frame = GrowcubeMessage.to_bytes(21, f"{channel}@{rng.randint(0, 100)}@{rng.randint(20, 80)}"
+                                                 f"@{rng.randint(10, 35)}")
+        elif kind < 0.8:
+            frame = GrowcubeMessage.to_bytes(22, f"{channel}@2023@12@{rng.randint(1, 28)}@{rng.randint(0, 23)}"
+                                                 f"@{rng.randint(0, 100)}")
+        elif kind < 0.85:
+            frame = GrowcubeMessage.to_bytes(24, "3.6@12663500")
+        elif kind < 0.9:
+            frame = GrowcubeMessage.to_bytes(26 + rng.randrange(2), str(channel))
+        elif kind < 0.95:
+            frame = GrowcubeMessage.to_bytes(33, f"0@{rng.randrange(2)}")
+        else:
+            frame = GrowcubeMessage.to_bytes(20, str(rng.randrange(2)))
+        frames.append(frame)
+    return frames
+
+
+def pad(frame: bytes) -> bytes:
+    """
+    Pad a frame with NUL characters, as the device does
+    """
+    return frame + b'\x00' * max(0, FRAME_SIZE - len(frame))
+
+
+def make_captures(frames: int = 2000, seed: int = 1) -> List[GrowcubeCapture]:
+    """
+    Make the standard set of reproducible captures.
+
+    small: one unpadded frame per chunk.
+    padded: one padded frame per chunk, as received from a device.
+    bursty: 50 padded frames per chunk, as after a reconnect or curve download.
+    fragmented: the padded stream split in chunks of 1 to 16 bytes.
+    junk: padded frames with junk between them, in chunks of 32 to 256 bytes.
+
+    :param frames: Number of frames in each capture.
+    :type frames: int
+    :param seed: Random seed, the same seed gives the same captures.
+    :type seed: int
+    :return: The captures.
+    :rtype: list[GrowcubeCapture]
+    """
+    rng = random.Random(seed)
+    source = make_frames(rng, frames)
+    padded = [pad(frame) for frame in source]
+    stream = b''.join(padded)
+
+    def split(data: bytes, low: int, high: int) -> List[bytes]:
+        chunks = []
+        index = 0
+        while index < len(data):
+            size = rng.randint(low, high)
+            chunks.append(data[index:index + size])
+            index += size
+        return chunks
+
+    # Junk never contains 'e', so it can not form a header
+    junk_bytes = bytes(value for value in range(256) if value != ord('e'))
+    junk = b''.join(frame + bytes(rng.choice(junk_bytes) for _ in range(rng.randint(0, 24)))
+                    for frame in padded)
+
+    return [
+        GrowcubeCapture("small", source, frames),
+        GrowcubeCapture("padded", padded, frames),
+        GrowcubeCapture("bursty", [b''.join(padded[index:index + 50]) for index in range(0, frames, 50)], frames),
+        GrowcubeCapture("fragmented", split(stream, 1, 16), frames),
+        GrowcubeCapture("junk", split(junk, 32, 256), frames),
+    ]
+
+
+def load_capture(path: str) -> GrowcubeCapture:
+    """
+    Load the received data of a capture file recorded from a device
+
+    :param path: Path of the capture file, written by GrowcubeCaptureWriter.
+    :type path: str
+    :return: The capture, named after the file.
+    :rtype: GrowcubeCapture
+    """
+    chunks = [record.data for record in GrowcubeCaptureReader(path) if record.direction == CaptureDirection.Received]
+    scanner = GrowcubeFrameScanner(b''.join(chunks).replace(b'\x00', b''))
+    frames = 0
+    while scanner.next_message() is not None:
+        frames += 1
+    return GrowcubeCapture(os.path.splitext(os.path.basename(path))[0], chunks, frames)
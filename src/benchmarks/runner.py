@@ -0,0 +1,333 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from growcube_client import GrowcubeClient, GrowcubeMessage, GrowcubeProtocol, GrowcubeReport
+from growcube_client.growcubeframer import GrowcubeFrameScanner
+from .captures import GrowcubeCapture
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+
+class GrowcubeBenchmarkResult:
+    """
+    Result of running one benchmark on one capture
+
+    :ivar benchmark: Name of the benchmark.
+    :type benchmark: str
+    :ivar capture: Name of the capture.
+    :type capture: str
+    :ivar frames_per_second: Number of frames handled per second, best of all rounds.
+    :type frames_per_second: float
+    :ivar bytes_per_second: Number of received bytes handled per second, padding included, best of all rounds.
+    :type bytes_per_second: float
+    :ivar p99_us: 99th percentile time of one call, in microseconds.
+    :type p99_us: float
+    :ivar peak_bytes_per_frame: Peak of memory allocated during each call, summed and divided by the number
+        of frames. This is a lower bound of the bytes allocated, as CPython has no counter of all allocations.
+    :type peak_bytes_per_frame: float
+    :ivar blocks_per_frame: Memory blocks still allocated per frame after the run, to find leaks.
+    :type blocks_per_frame: float
+    """
+
+    def __init__(self, benchmark: str, capture: str, frames_per_second: float, bytes_per_second: float,
+                 p99_us: float, peak_bytes_per_frame: float, blocks_per_frame: float):
+        """
+        GrowcubeBenchmarkResult constructor
+
+        :param benchmark: Name of the benchmark.
+        :type benchmark: str
+        :param capture: Name of the capture.
+        :type capture: str
+        :param frames_per_second: Number of frames handled per second.
+        :type frames_per_second: float
+        :param bytes_per_second: Number of received bytes handled per second.
+        :type bytes_per_second: float
+        :param p99_us: 99th percentile time of one call, in microseconds.
+        :type p99_us: float
+        :param peak_bytes_per_frame: Peak of memory allocated during each call, per frame.
+        :type peak_bytes_per_frame: float
+        :param blocks_per_frame: Memory blocks still allocated per frame after the run.
+        :type blocks_per_frame: float
+        """
+        self.benchmark = benchmark
+        self.capture = capture
+        self.frames_per_second = frames_per_second
+        self.bytes_per_second = bytes_per_second
+        self.p99_us = p99_us
+        self.peak_bytes_per_frame = peak_bytes_per_frame
+        self.blocks_per_frame = blocks_per_frame
+
+    @property
+    def key(self) -> str:
+        """
+        Key of the result in the baseline
+
+        :return: Benchmark and capture name.
+        :rtype: str
+        """
+        return f"{self.benchmark}/{self.capture}"
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "frames_per_second": round(self.frames_per_second),
+            "bytes_per_second": round(self.bytes_per_second),
+            "p99_us": round(self.p99_us, 2),
+            "peak_bytes_per_frame": round(self.peak_bytes_per_frame, 1),
+            "blocks_per_frame": round(self.blocks_per_frame, 2),
+        }
+
+    def __str__(self):
+        return (f"{self.key:<26} {self.frames_per_second:>12,.0f} {self.bytes_per_second / 1e6:>8.2f} "
+                f"{self.p99_us:>10.2f} "
+                f"{self.peak_bytes_per_frame:>12.1f} {self.blocks_per_frame:>10.2f}")
+
+
+# A benchmark gets a capture and returns the inputs of the calls to time, and the function to call
+# with each input. The function returns nothing, setup work is kept out of the calls.
+Benchmark = Callable[[GrowcubeCapture], tuple]
+
+
+def padding(capture: GrowcubeCapture) -> tuple:
+    """
+    Remove the NUL padding from the received chunks, as the protocol does
+    """
+
+    def call(chunk: bytes) -> None:
+        chunk.replace(b'\x00', b'')
+
+    return capture.chunks, call
+
+
+def padding_filter(capture: GrowcubeCapture) -> tuple:
+    """
+    Remove the NUL padding from the received chunks byte by byte, as the protocol did before bytes.replace
+    """
+
+    def call(chunk: bytes) -> None:
+        bytearray(filter(lambda c: c != 0, chunk))
+
+    return capture.chunks, call
+
+
+def framing(capture: GrowcubeCapture) -> tuple:
+    """
+    Extract frames from the received chunks, as the protocol does
+    """
+    scanner = GrowcubeFrameScanner(resync=True, max_frame_size=GrowcubeFrameScanner.DEFAULT_MAX_FRAME_SIZE,
+                                   max_buffer_size=GrowcubeFrameScanner.DEFAULT_MAX_BUFFER_SIZE)
+
+    def call(chunk: bytes) -> None:
+        scanner.feed(chunk.replace(b'\x00', b''))
+        while scanner.next_message() is not None:
+            pass
+
+    return capture.chunks, call
+
+
+def parsing(capture: GrowcubeCapture) -> tuple:
+    """
+    Create reports from already framed messages
+    """
+    scanner = GrowcubeFrameScanner(b''.join(capture.chunks).replace(b'\x00', b''))
+    messages: List[GrowcubeMessage] = []
+    while True:
+        message = scanner.next_message()
+        if message is None:
+            break
+        messages.append(message)
+    return messages, GrowcubeReport.get_report
+
+
+def dispatch(capture: GrowcubeCapture) -> tuple:
+    """
+    Feed the received chunks through GrowcubeProtocol to GrowcubeClient, updating the device state
+    """
+    client = GrowcubeClient("127.0.0.1", lambda report: None)
+    protocol = GrowcubeProtocol(client.on_connected, client.on_message, client.on_connection_lost)
+    return capture.chunks, protocol.data_received
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "padding": padding,
+    "padding_filter": padding_filter,
+    "framing": framing,
+    "parsing": parsing,
+    "dispatch": dispatch,
+}
+
+
+def _frames(benchmark: str, capture: GrowcubeCapture, inputs: list) -> int:
+    # The parsing benchmark gets one message per call, the others one chunk
+    return len(inputs) if benchmark == "parsing" else capture.frames
+
+
+def run_benchmark(name: str, capture: GrowcubeCapture, rounds: int = 5) -> GrowcubeBenchmarkResult:
+    """
+    Run one benchmark on one capture.
+
+    Throughput is the best of the timed rounds, the per call times of all rounds give the p99 latency.
+    Allocations are measured in a separate round with tracemalloc, which slows the calls down.
+
+    :param name: Name of the benchmark.
+    :type name: str
+    :param capture: The capture to run on.
+    :type capture: GrowcubeCapture
+    :param rounds: Number of timed rounds.
+    :type rounds: int
+    :return: The result.
+    :rtype: GrowcubeBenchmarkResult
+    """
+    benchmark = BENCHMARKS[name]
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        best = None
+        times: List[float] = []
+        frames = 0
+        for _ in range(rounds):
+            inputs, call = benchmark(capture)
+            frames = _frames(name, capture, inputs)
+            clock = time.perf_counter
+            start = clock()
+            for item in inputs:
+                before = clock()
+                call(item)
+                times.append(clock() - before)
+            elapsed = clock() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        inputs, call = benchmark(capture)
+        tracemalloc.start()
+        try:
+            peak = 0
+            for item in inputs:
+                tracemalloc.reset_peak()
+                current, _ = tracemalloc.get_traced_memory()
+                call(item)
+                peak += tracemalloc.get_traced_memory()[1] - current
+            retained = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        finally:
+            tracemalloc.stop()
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+    times.sort()
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))] if times else 0.0
+    return GrowcubeBenchmarkResult(name, capture.name, frames / best if best else 0.0,
+                                   capture.size / best if best else 0.0, p99 * 1e6,
+                                   peak / frames if frames else 0.0, retained / frames if frames else 0.0)
+
+
+def run_all(captures: List[GrowcubeCapture], benchmarks: Optional[List[str]] = None,
+            rounds: int = 5) -> List[GrowcubeBenchmarkResult]:
+    """
+    Run benchmarks on all captures.
+
+    :param captures: The captures to run on.
+    :type captures: list[GrowcubeCapture]
+    :param benchmarks: Names of the benchmarks to run, defaults to all.
+    :type benchmarks: list[str] or None
+    :param rounds: Number of timed rounds.
+    :type rounds: int
+    :return: The results.
+    :rtype: list[GrowcubeBenchmarkResult]
+    """
+    # Debug logging of every message would dominate the results
+    logger = logging.getLogger("growcube_client")
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        return [run_benchmark(name, capture, rounds)
+                for name in (benchmarks or list(BENCHMARKS))
+                for capture in captures]
+    finally:
+        logger.setLevel(level)
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    """
+    Load stored baseline results.
+
+    :param path: Path of the baseline file.
+    :type path: str
+    :return: Baseline results keyed by benchmark and capture name, empty if there is no baseline.
+    :rtype: dict[str, dict[str, float]]
+    """
+    try:
+        with open(path) as file:
+            return json.load(file)["results"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save_baseline(results: List[GrowcubeBenchmarkResult], frames: int, seed: int,
+                  path: str = BASELINE_PATH) -> None:
+    """
+    Store results as the baseline.
+
+    :param results: The results to store.
+    :type results: list[GrowcubeBenchmarkResult]
+    :param frames: Number of frames in each capture.
+    :type frames: int
+    :param seed: Random seed of the captures.
+    :type seed: int
+    :param path: Path of the baseline file.
+    :type path: str
+    """
+    data = {
+        "frames": frames,
+        "seed": seed,
+        "results": {result.key: result.to_dict() for result in results},
+    }
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2)
+        file.write("\n")
+
+
+def compare(results: List[GrowcubeBenchmarkResult], baseline: Dict[str, Dict[str, float]],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Throughput is a regression if it is lower than the baseline by more than the tolerance, latency
+    and allocations if they are higher by more than the tolerance. Results without a baseline are skipped.
+
+    :param results: The results to compare.
+    :type results: list[GrowcubeBenchmarkResult]
+    :param baseline: Baseline results keyed by benchmark and capture name.
+    :type baseline: dict[str, dict[str, float]]
+    :param tolerance: Allowed relative difference.
+    :type tolerance: float
+    :return: Descriptions of the regressions found.
+    :rtype: list[str]
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.key)
+        if expected is None:
+            continue
+        if result.frames_per_second < expected["frames_per_second"] * (1 - tolerance):
+            regressions.append(f"{result.key}: {result.frames_per_second:,.0f} frames/s, "
+                               f"baseline {expected['frames_per_second']:,.0f}")
+        if result.p99_us > expected["p99_us"] * (1 + tolerance):
+            regressions.append(f"{result.key}: p99 {result.p99_us:.2f} us, baseline {expected['p99_us']:.2f}")
+        # Allow a few bytes for interpreter noise on benchmarks that allocate next to nothing
+        if result.peak_bytes_per_frame > expected["peak_bytes_per_frame"] * (1 + tolerance) + 8:
+            regressions.append(f"{result.key}: {result.peak_bytes_per_frame:.1f} peak bytes/frame, "
+                               f"baseline {expected['peak_bytes_per_frame']:.1f}")
+    return regressions
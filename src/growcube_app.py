@@ -1,7 +1,6 @@
 import concurrent
 import datetime
 import queue
-import time
 
 import wx
 import threading
@@ -11,7 +10,7 @@ import logging
 _LOGGER = logging.getLogger(__name__)
 
 from growcube_client import GrowcubeClient, Channel, GrowcubeCommand, PumpOpenGrowcubeReport, PumpCloseGrowcubeReport, \
-    SyncWaterLevelCommand, SyncWaterTimeCommand, SetWorkModeCommand
+    SyncWaterLevelCommand, SyncWaterTimeCommand, SetWorkModeCommand, GrowcubeWateringScheduler
 from growcube_client import (DeviceVersionGrowcubeReport, LockStateGrowcubeReport, CheckSensorGrowcubeReport, \
                              MoistureHumidityStateGrowcubeReport, WaterStateGrowcubeReport, \
                              CheckSensorNotConnectedGrowcubeReport,  CheckOutletLockedGrowcubeReport, \
@@ -359,22 +358,27 @@ class SimpleGUI(wx.Frame):
 
     async def run_client_until_terminated(self):
         await self.client.connect()
-        while not self.exit_background_thread:
-            if not self.command_queue.empty():
-                command = self.command_queue.get()
-                if isinstance(command, GrowcubeCommand):
-                    self.client.send_command(command)
-                elif isinstance(command, WaterCommand):
-                    await self.client.water_plant(command.channel, command.duration)
-            if self.client.connected and time.time() - self.client.heartbeat > 10:
-                _LOGGER.debug("Heartbeat timeout")
-                self.client.disconnect()
-            await asyncio.sleep(1)
+        watering = GrowcubeWateringScheduler()
+        try:
+            while not self.exit_background_thread:
+                if not self.command_queue.empty():
+                    command = self.command_queue.get()
+                    if isinstance(command, GrowcubeCommand):
+                        self.client.send_command(command)
+                    elif isinstance(command, WaterCommand):
+                        watering.start(self.client, command.channel, command.duration)
+                await asyncio.sleep(1)
+        finally:
+            # Stop running pumps before the connection is closed
+            watering.shutdown()
+            self.client.disconnect()
 
     def start_async_client_thread(self, host_name):
         self.client = GrowcubeClient(host_name, self.on_message,
                                      on_connected_callback=self.on_connected,
                                      on_disconnected_callback=self.on_disconnected)
+        # Let the client close stale connections instead of polling the heartbeat
+        self.client.stale_timeout = 10
         self.exit_background_thread = False
         if self.background_thread_loop is None:
             self.background_thread_loop = asyncio.new_event_loop()
@@ -384,8 +388,7 @@ class SimpleGUI(wx.Frame):
 
     def stop_async_client_thread(self):
         if self.client is not None:
-            self.client.disconnect()
-            self.exit_background_thread = True;
+            self.exit_background_thread = True
         if self.client_thread is not None:
             self.client_thread.join()
 
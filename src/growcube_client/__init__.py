@@ -1,6 +1,7 @@
 # Import specific classes and functions to expose in the package namespace
-from .growcubeenums import Channel, WateringMode
+from .growcubeenums import Channel, WateringMode, OverflowPolicy, CaptureDirection
 from .growcubemessage import GrowcubeMessage
+from .growcubeframer import GrowcubeFrameScanner, GrowcubeReceiveBuffer, GrowcubeReceiveMetrics
 from .growcubecommand import (
     GrowcubeCommand, SetWorkModeCommand, SyncTimeCommand, PlantEndCommand,
     ClosePumpCommand, WaterCommand, RequestCurveDataCommand, WateringModeCommand,
@@ -8,13 +9,22 @@ from .growcubecommand import (
     SyncDeviceUpgradeCommand, SyncWFactoryResetCommand
 )
 from .growcubereport import (
-    GrowcubeReport, WaterStateGrowcubeReport, MoistureHumidityStateGrowcubeReport,
+    GrowcubeReport, WaterStateGrowcubeReport, MoistureHumidityStateGrowcubeReport, CurveGrowcubeReport,
     AutoWaterGrowcubeReport, DeviceVersionGrowcubeReport, EraseDataGrowcubeReport,
     PumpOpenGrowcubeReport, PumpCloseGrowcubeReport, CheckSensorGrowcubeReport,
     CheckOutletBlockedGrowcubeReport, CheckSensorNotConnectedGrowcubeReport,
     CheckWifiStateGrowcubeReport, GrowCubeIPGrowcubeReport, LockStateGrowcubeReport,
     CheckOutletLockedGrowcubeReport, RepCurveEndFlagGrowcubeReport, UnknownGrowcubeReport
 )
-from .growcubeprotocol import GrowcubeProtocol
-from .growcubeclient import GrowcubeClient
-from .growcubediscovery import GrowcubeDiscovery
+from .growcubecapture import (
+    GrowcubeCaptureRecord, GrowcubeCaptureWriter, GrowcubeCaptureReader, GrowcubeReplayTransport
+)
+from .growcubeprotocol import GrowcubeProtocol, GrowcubeSendMetrics
+from .growcubereportstream import GrowcubeReportStream
+from .growcubehistory import GrowcubeHistory, GrowcubeSeries
+from .growcubestate import GrowcubeDeviceState, GrowcubeChannelState
+from .growcubeclient import GrowcubeClient, GrowcubeReconnectMetrics, GrowcubeCommandMetrics
+from .growcubefleet import GrowcubeFleet, GrowcubeFleetDevice
+from .growcubediscovery import GrowcubeDiscovery, GrowcubeDiscoveryCache, GrowcubeDiscoveryCacheEntry
+from .growcubewatering import GrowcubeWateringScheduler, GrowcubeWateringJob
+from .growcubesimulator import GrowcubeSimulator
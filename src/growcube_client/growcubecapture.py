@@ -0,0 +1,368 @@
+import asyncio
+import logging
+import struct
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+from typing import Iterable, Iterator, List, Optional
+from .growcubeenums import CaptureDirection
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+CAPTURE_MAGIC = b"GCAP\x01"
+CAPTURE_RECORD = struct.Struct("<BQI")
+
+
+class GrowcubeCaptureRecord:
+    """
+    Raw data sent or received at one point in time
+
+    :ivar direction: Direction of the data.
+    :type direction: CaptureDirection
+    :ivar timestamp: Monotonic time in nanoseconds when the data was sent or received.
+    :type timestamp: int
+    :ivar data: The raw data.
+    :type data: bytes
+    """
+    __slots__ = ("direction", "timestamp", "data")
+
+    def __init__(self, direction: CaptureDirection, timestamp: int, data: bytes):
+        """
+        GrowcubeCaptureRecord constructor
+
+        :param direction: Direction of the data.
+        :type direction: CaptureDirection
+        :param timestamp: Monotonic time in nanoseconds when the data was sent or received.
+        :type timestamp: int
+        :param data: The raw data.
+        :type data: bytes
+        """
+        self.direction = direction
+        self.timestamp = timestamp
+        self.data = data
+
+
+class GrowcubeCaptureWriter:
+    """
+    Append-only writer of raw device traffic to a capture file.
+
+    The file starts with a short magic header, followed by records of a direction byte, a monotonic
+    timestamp in nanoseconds, the data length and the raw data. Records are added to a memory buffer,
+    and a background thread writes the buffer to the file when it is full or every flush_interval
+    seconds, so no file I/O is done on the event loop.
+
+    :cvar DEFAULT_BUFFER_SIZE: Default buffer size in bytes that triggers a write.
+    :vartype DEFAULT_BUFFER_SIZE: int
+    :cvar DEFAULT_FLUSH_INTERVAL: Default maximum time in seconds that records stay in the buffer.
+    :vartype DEFAULT_FLUSH_INTERVAL: float
+
+    :ivar path: Path of the capture file.
+    :type path: str
+    :ivar buffer_size: Buffer size in bytes that triggers a write.
+    :type buffer_size: int
+    :ivar flush_interval: Maximum time in seconds that records stay in the buffer.
+    :type flush_interval: float
+    :ivar records: Number of records captured.
+    :type records: int
+    :ivar written: Number of bytes written to the file.
+    :type written: int
+    :ivar errors: Number of failed writes, capturing stops after a failed write.
+    :type errors: int
+    :ivar _buffer: Records waiting to be written.
+    :type _buffer: bytearray
+    :ivar _lock: Lock protecting the buffer.
+    :type _lock: threading.Lock
+    :ivar _wakeup: Event waking the writer thread.
+    :type _wakeup: threading.Event
+    :ivar _closed: True when the writer has been closed or has failed.
+    :type _closed: bool
+    :ivar _thread: The writer thread.
+    :type _thread: threading.Thread
+    """
+
+    DEFAULT_BUFFER_SIZE = 65536
+    DEFAULT_FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path: str, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL) -> None:
+        """
+        GrowcubeCaptureWriter constructor, opens the file for appending
+
+        :param path: Path of the capture file, records are appended if it exists.
+        :type path: str
+        :param buffer_size: Buffer size in bytes that triggers a write.
+        :type buffer_size: int
+        :param flush_interval: Maximum time in seconds that records stay in the buffer.
+        :type flush_interval: float
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.records = 0
+        self.written = 0
+        self.errors = 0
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(CAPTURE_MAGIC)
+            self.written += len(CAPTURE_MAGIC)
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="GrowcubeCaptureWriter", daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        """
+        Closed state
+
+        :return: True if the writer is closed, or has stopped after a failed write.
+        :rtype: bool
+        """
+        return self._closed
+
+    def record(self, direction: CaptureDirection, data: bytes) -> None:
+        """
+        Add data to the capture, with the current monotonic time.
+
+        :param direction: Direction of the data.
+        :type direction: CaptureDirection
+        :param data: The raw data.
+        :type data: bytes
+        """
+        header = CAPTURE_RECORD.pack(direction, time.monotonic_ns(), len(data))
+        with self._lock:
+            if self._closed:
+                return
+            buffer = self._buffer
+            buffer += header
+            buffer += data
+            self.records += 1
+            full = len(buffer) >= self.buffer_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """
+        Ask the writer thread to write the buffered records now, without waiting for it.
+        """
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """
+        Write the buffered records and close the file. Blocks until the writer thread has finished.
+        """
+        with self._lock:
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """
+        Writer thread, writes the buffer when woken up or every flush_interval seconds
+        """
+        try:
+            while True:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                with self._lock:
+                    closing = self._closed
+                    data = self._buffer
+                    self._buffer = bytearray()
+                if data:
+                    self._file.write(data)
+                    self._file.flush()
+                    self.written += len(data)
+                if closing:
+                    break
+        except OSError as e:
+            self.errors += 1
+            self._closed = True
+            _LOGGER.error("Failed to write capture file %s: %s", self.path, e)
+        finally:
+            self._file.close()
+
+
+class GrowcubeCaptureReader:
+    """
+    Reads the records of a capture file written by GrowcubeCaptureWriter.
+
+    Iterating the reader yields the records in the order they were captured. An incomplete record at
+    the end of the file, for example after a crash, is ignored.
+
+    :ivar path: Path of the capture file.
+    :type path: str
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        GrowcubeCaptureReader constructor
+
+        :param path: Path of the capture file.
+        :type path: str
+        """
+        self.path = path
+
+    def __iter__(self) -> Iterator[GrowcubeCaptureRecord]:
+        """
+        Read the records.
+
+        :return: Iterator over the records.
+        :rtype: Iterator[GrowcubeCaptureRecord]
+        :raises ValueError: If the file is not a capture file.
+        """
+        with open(self.path, "rb") as file:
+            if file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+                raise ValueError(f"{self.path} is not a Growcube capture file")
+            while True:
+                header = file.read(CAPTURE_RECORD.size)
+                if len(header) < CAPTURE_RECORD.size:
+                    return
+                direction, timestamp, length = CAPTURE_RECORD.unpack(header)
+                data = file.read(length)
+                if len(data) < length:
+                    return
+                yield GrowcubeCaptureRecord(CaptureDirection(direction), timestamp, data)
+
+
+class GrowcubeReplayTransport(asyncio.Transport):
+    """
+    Transport that feeds the received data of a capture to a protocol.
+
+    The received records are passed to data_received, either with the original timing scaled by speed,
+    or as fast as possible. Data written by the protocol is kept in written, sent records of the capture
+    are skipped. The connection is lost when the capture ends or the transport is closed.
+
+    :ivar speed: Replay speed, 1.0 for the original timing, or None for maximum speed.
+    :type speed: float or None
+    :ivar written: Data written to the transport by the protocol.
+    :type written: list[bytes]
+    :ivar replayed: Number of received records fed to the protocol.
+    :type replayed: int
+    :ivar _protocol: The protocol receiving the data.
+    :type _protocol: asyncio.Protocol
+    :ivar _records: The capture records.
+    :type _records: Iterable[GrowcubeCaptureRecord]
+    :ivar _reading: Event that is set when reading is not paused.
+    :type _reading: asyncio.Event
+    :ivar _closing: True when the transport has been closed.
+    :type _closing: bool
+    :ivar _lost: Future that is resolved when the protocol has been told the connection is lost.
+    :type _lost: asyncio.Future or None
+    """
+
+    def __init__(self, protocol: asyncio.Protocol, records: Iterable[GrowcubeCaptureRecord],
+                 speed: Optional[float] = 1.0) -> None:
+        """
+        GrowcubeReplayTransport constructor
+
+        :param protocol: The protocol receiving the data.
+        :type protocol: asyncio.Protocol
+        :param records: The capture records, for example a GrowcubeCaptureReader.
+        :type records: Iterable[GrowcubeCaptureRecord]
+        :param speed: Replay speed, 1.0 for the original timing, or None for maximum speed.
+        :type speed: float or None
+        """
+        super().__init__({"peername": ("replay", 0)})
+        self.speed = speed
+        self.written: List[bytes] = []
+        self.replayed = 0
+        self._protocol = protocol
+        self._records = records
+        self._reading = asyncio.Event()
+        self._reading.set()
+        self._closing = False
+        self._lost: Optional[asyncio.Future] = None
+
+    async def replay(self) -> int:
+        """
+        Connect the protocol and feed it the received data of the capture, then close the connection.
+
+        :return: Number of received records fed to the protocol.
+        :rtype: int
+        """
+        loop = asyncio.get_running_loop()
+        self._lost = loop.create_future()
+        self._protocol.connection_made(self)
+        start = 0.0
+        origin = None
+        try:
+            for record in self._records:
+                if self._closing:
+                    break
+                if record.direction != CaptureDirection.Received:
+                    continue
+                if self.speed:
+                    if origin is None:
+                        origin = record.timestamp
+                        start = loop.time()
+                    delay = start + (record.timestamp - origin) / 1e9 / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if not self._reading.is_set():
+                    await self._reading.wait()
+                if self._closing:
+                    break
+                self._protocol.data_received(record.data)
+                self.replayed += 1
+        finally:
+            self.close()
+        await self._lost
+        return self.replayed
+
+    def write(self, data) -> None:
+        """
+        Keep data written by the protocol.
+
+        :param data: The data.
+        :type data: bytes
+        """
+        if not self._closing:
+            self.written.append(bytes(data))
+
+    def can_write_eof(self) -> bool:
+        return False
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self) -> None:
+        """
+        Stop the replay, the protocol is told that the connection is lost
+        """
+        if self._closing:
+            return
+        self._closing = True
+        self._reading.set()
+        asyncio.get_event_loop().call_soon(self._connection_lost)
+
+    def abort(self) -> None:
+        self.close()
+
+    def pause_reading(self) -> None:
+        self._reading.clear()
+
+    def resume_reading(self) -> None:
+        self._reading.set()
+
+    def is_reading(self) -> bool:
+        return self._reading.is_set() and not self._closing
+
+    def _connection_lost(self) -> None:
+        """
+        Tell the protocol that the connection is lost
+        """
+        try:
+            self._protocol.connection_lost(None)
+        finally:
+            if self._lost is not None and not self._lost.done():
+                self._lost.set_result(None)
@@ -1,16 +1,23 @@
 import asyncio
-import datetime, time
+import time
 import inspect
 import logging
+import random
 
 _LOGGER = logging.getLogger(__name__)
 
-from typing import Callable, Tuple, Awaitable
-from .growcubeenums import Channel
+from typing import Callable, Tuple, Awaitable, Optional, List, AsyncIterator, Dict, Type, Iterable
+from .growcubeenums import Channel, OverflowPolicy, WorkMode
 from .growcubemessage import GrowcubeMessage
-from .growcubereport import GrowcubeReport
-from .growcubecommand import GrowcubeCommand, WaterCommand, SetWorkModeCommand
+from .growcubereport import (GrowcubeReport, CurveGrowcubeReport, RepCurveEndFlagGrowcubeReport,
+                              PumpOpenGrowcubeReport, PumpCloseGrowcubeReport)
+from .growcubecommand import (GrowcubeCommand, WaterCommand, SetWorkModeCommand, RequestCurveDataCommand,
+                              ClosePumpCommand)
+from .growcubeframer import GrowcubeFrameScanner
 from .growcubeprotocol import GrowcubeProtocol
+from .growcubecapture import GrowcubeCaptureRecord, GrowcubeCaptureWriter, GrowcubeReplayTransport
+from .growcubereportstream import GrowcubeReportStream
+from .growcubestate import GrowcubeDeviceState
 
 """
 Growcube client library
@@ -21,6 +28,82 @@ Date: 2023-09-05
 """
 
 
+class GrowcubeReconnectMetrics:
+    """
+    Reconnect statistics for a GrowcubeClient
+
+    :ivar attempts: Number of reconnect attempts.
+    :type attempts: int
+    :ivar successes: Number of successful reconnects.
+    :type successes: int
+    :ivar failures: Number of failed reconnect attempts.
+    :type failures: int
+    :ivar gave_up: Number of times reconnecting was given up after the maximum number of attempts.
+    :type gave_up: int
+    :ivar last_delay: The delay before the last reconnect attempt, in seconds.
+    :type last_delay: float
+    :ivar stale_links: Number of times the connection was closed because nothing was received within stale_timeout.
+    :type stale_links: int
+    :ivar keep_alives: Number of keep-alive commands sent by the supervisor.
+    :type keep_alives: int
+    """
+
+    def __init__(self):
+        """
+        GrowcubeReconnectMetrics constructor
+        """
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.gave_up = 0
+        self.last_delay = 0.0
+        self.stale_links = 0
+        self.keep_alives = 0
+
+
+class GrowcubeCommandMetrics:
+    """
+    Acknowledged command statistics for a GrowcubeClient
+
+    :ivar sent: Number of acknowledged commands sent, not counting retries.
+    :type sent: int
+    :ivar acknowledged: Number of commands acknowledged by the device.
+    :type acknowledged: int
+    :ivar retries: Number of times a command was sent again.
+    :type retries: int
+    :ivar timeouts: Number of commands that were not acknowledged after all retries.
+    :type timeouts: int
+    :ivar last_latency: Time from the last write to the acknowledgement of the last acknowledged command, in seconds.
+    :type last_latency: float
+    :ivar max_latency: Highest acknowledgement latency, in seconds.
+    :type max_latency: float
+    :ivar total_latency: Sum of all acknowledgement latencies, in seconds.
+    :type total_latency: float
+    """
+
+    def __init__(self):
+        """
+        GrowcubeCommandMetrics constructor
+        """
+        self.sent = 0
+        self.acknowledged = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        """
+        Average acknowledgement latency
+
+        :return: Average latency in seconds, or 0 if no command has been acknowledged.
+        :rtype: float
+        """
+        return self.total_latency / self.acknowledged if self.acknowledged else 0.0
+
+
 class GrowcubeClient:
     """
     Growcube client class
@@ -47,6 +130,60 @@ class GrowcubeClient:
     :type connected: bool
     :ivar connection_timeout: Timeout for connection attempts. (Default: 5 seconds)
     :type connection_timeout: int
+    :ivar last_activity: Monotonic time of the last received message, or of the connection.
+    :type last_activity: float
+    :ivar keep_alive_interval: Send a keep-alive when nothing has been sent or received for this many seconds,
+                               or None to not send keep-alives. (Default: None)
+    :type keep_alive_interval: float or None
+    :ivar stale_timeout: Close the connection when nothing has been received for this many seconds,
+                         or None to not check. A closed connection is reconnected if auto_reconnect is set.
+                         (Default: None)
+    :type stale_timeout: float or None
+    :ivar auto_reconnect: Reconnect automatically when the connection is lost.
+    :type auto_reconnect: bool
+    :ivar reconnect_min_delay: Delay before the first reconnect attempt. (Default: 1 second)
+    :type reconnect_min_delay: float
+    :ivar reconnect_max_delay: Maximum delay between reconnect attempts. (Default: 60 seconds)
+    :type reconnect_max_delay: float
+    :ivar reconnect_jitter: Fraction of the delay that is randomized, 0-1. (Default: 0.5)
+    :type reconnect_jitter: float
+    :ivar reconnect_max_attempts: Maximum number of reconnect attempts, or None for no limit.
+    :type reconnect_max_attempts: int or None
+    :ivar state: Latest known state of the device, updated from received reports.
+    :type state: GrowcubeDeviceState
+    :ivar ack_timeout: Time to wait for a command acknowledgement before sending again. (Default: 2 seconds)
+    :type ack_timeout: float
+    :ivar ack_retries: Number of times a command is sent again when not acknowledged. (Default: 2)
+    :type ack_retries: int
+    :ivar command_metrics: Acknowledged command statistics.
+    :type command_metrics: GrowcubeCommandMetrics
+    :ivar coalesce_writes: Write commands sent in the same loop iteration together. (Default: False)
+    :type coalesce_writes: bool
+    :ivar send_interval: Minimum time in seconds between writes when coalescing writes. (Default: 0)
+    :type send_interval: float
+    :ivar send_max_batch: Maximum number of commands per write when coalescing writes, or None for no limit.
+    :type send_max_batch: int or None
+    :ivar capture: Writer that raw device traffic is recorded to, or None to not record. The writer is
+                   not closed by the client. (Default: None)
+    :type capture: GrowcubeCaptureWriter or None
+    :ivar max_frame_size: Longest accepted frame in bytes, longer frames are discarded. (Default: 1024)
+    :type max_frame_size: int
+    :ivar max_buffer_size: Maximum number of pending received bytes, or None for no limit. (Default: 65536)
+    :type max_buffer_size: int or None
+    :ivar reconnect_metrics: Reconnect statistics.
+    :type reconnect_metrics: GrowcubeReconnectMetrics
+    :ivar _reconnect_task: The running reconnect task, if any.
+    :type _reconnect_task: asyncio.Task or None
+    :ivar _report_streams: Open report streams.
+    :type _report_streams: list[GrowcubeReportStream]
+    :ivar _reading_paused: Number of report streams that have paused reading.
+    :type _reading_paused: int
+    :ivar _last_sent: Monotonic time of the last sent command.
+    :type _last_sent: float
+    :ivar _supervisor_task: The running liveness supervisor task, if any.
+    :type _supervisor_task: asyncio.Task or None
+    :ivar _ack_waiters: Futures waiting for an acknowledgement, keyed by report class and channel.
+    :type _ack_waiters: dict[tuple[type, Channel], list[asyncio.Future]]
     """
     host: str
 
@@ -54,7 +191,8 @@ class GrowcubeClient:
                  host: str,
                  on_message_callback: Callable[[GrowcubeReport], Awaitable[None]],
                  on_connected_callback: Callable[[str], Awaitable[None]] = None,
-                 on_disconnected_callback: Callable[[str], Awaitable[None]] = None) -> None:
+                 on_disconnected_callback: Callable[[str], Awaitable[None]] = None,
+                 auto_reconnect: bool = False) -> None:
         """
         GrowcubeClient constructor
 
@@ -62,6 +200,7 @@ class GrowcubeClient:
         :param on_message_callback: Callback function to receive data from the Growcube.
         :param on_connected_callback: Callback function for when the connection is established.
         :param on_disconnected_callback: Callback function for when the connection is lost.
+        :param auto_reconnect: Reconnect automatically when the connection is lost.
         """
         self.host = host
         self.port = 8800
@@ -74,7 +213,41 @@ class GrowcubeClient:
         self.protocol = None
         self.connected = False
         self.connection_timeout = 5
-        self.heartbeat = datetime.datetime.now().timestamp()
+        self.last_activity = time.monotonic()
+        self.keep_alive_interval: Optional[float] = None
+        self.stale_timeout: Optional[float] = None
+        self._last_sent = 0.0
+        self._supervisor_task: Optional[asyncio.Task] = None
+        self.state = GrowcubeDeviceState()
+        self.auto_reconnect = auto_reconnect
+        self.reconnect_min_delay = 1.0
+        self.reconnect_max_delay = 60.0
+        self.reconnect_jitter = 0.5
+        self.reconnect_max_attempts: Optional[int] = None
+        self.reconnect_metrics = GrowcubeReconnectMetrics()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._report_streams: List[GrowcubeReportStream] = []
+        self._reading_paused = 0
+        self.ack_timeout = 2.0
+        self.ack_retries = 2
+        self.command_metrics = GrowcubeCommandMetrics()
+        self.coalesce_writes = False
+        self.send_interval = 0.0
+        self.send_max_batch: Optional[int] = None
+        self.capture: Optional[GrowcubeCaptureWriter] = None
+        self.max_frame_size = GrowcubeFrameScanner.DEFAULT_MAX_FRAME_SIZE
+        self.max_buffer_size: Optional[int] = GrowcubeFrameScanner.DEFAULT_MAX_BUFFER_SIZE
+        self._ack_waiters: Dict[Tuple[Type[GrowcubeReport], Channel], List[asyncio.Future]] = {}
+
+    @property
+    def heartbeat(self) -> float:
+        """
+        Time of the last received message
+
+        :return: Seconds since the epoch.
+        :rtype: float
+        """
+        return time.time() - (time.monotonic() - self.last_activity)
 
     def on_connected(self) -> None:
         """
@@ -95,9 +268,21 @@ class GrowcubeClient:
         :param message: The received GrowcubeMessage.
         :type message: GrowcubeMessage
         """
-        report = GrowcubeReport.get_report(message)
-        _LOGGER.debug(f"< {report.get_description()}")
-        self.heartbeat = datetime.datetime.now().timestamp()
+        try:
+            report = GrowcubeReport.get_report(message)
+        except (ValueError, IndexError):
+            # A corrupt payload in a valid frame, count it with the malformed frames of the connection
+            _LOGGER.warning("Invalid payload for report %s: %s", message.command, message.payload)
+            if self.protocol is not None:
+                self.protocol.receive_metrics.errors += 1
+            return
+        _LOGGER.debug("< %s", report)
+        self.last_activity = time.monotonic()
+        self.state.update(report)
+        if self._ack_waiters:
+            self._resolve_ack(report)
+        for stream in self._report_streams:
+            stream.put(report)
         if self._on_message_callback:
             if inspect.iscoroutinefunction(self._on_message_callback):
                 asyncio.create_task(self._on_message_callback(report))
@@ -113,11 +298,14 @@ class GrowcubeClient:
         """
         _LOGGER.debug(f"Connection to {self.host} lost")
         self.connected = False
+        self._stop_supervisor()
         if self._on_disconnected_callback:
             if inspect.iscoroutinefunction(self._on_disconnected_callback):
                 asyncio.create_task(self._on_disconnected_callback(self.host))
             else:
                 self._on_disconnected_callback(self.host)
+        if self.auto_reconnect and not self._exit and self._reconnect_task is None:
+            self._reconnect_task = asyncio.create_task(self._reconnect())
 
     async def connect(self) -> Tuple[bool, str]:
         """
@@ -128,18 +316,31 @@ class GrowcubeClient:
         :rtype: Tuple[bool, str]
         """
         error_message = ""
+        self._exit = False
         try:
             _LOGGER.debug("Connecting to %s:%i", self.host, self.port)
             loop = asyncio.get_event_loop()
             connection_coroutine = loop.create_connection(lambda: GrowcubeProtocol(self.on_connected,
                                                                                    self.on_message,
-                                                                                   self.on_connection_lost),
+                                                                                   self.on_connection_lost,
+                                                                                   self.coalesce_writes,
+                                                                                   self.send_interval,
+                                                                                   self.send_max_batch,
+                                                                                   self.capture,
+                                                                                   self.max_frame_size,
+                                                                                   self.max_buffer_size),
                                                           self.host,
                                                           self.port)
             self.transport, self.protocol = await asyncio.wait_for(connection_coroutine,
                                                                    timeout=self.connection_timeout)
             _LOGGER.debug("Connected to %s:%i", self.host, self.port)
-            # await asyncio.create_task(self.send_keep_alive(interval=10))
+            if self._reading_paused:
+                # A report stream is still full from the previous connection
+                self.transport.pause_reading()
+            self.last_activity = time.monotonic()
+            if self.keep_alive_interval is not None or self.stale_timeout is not None:
+                self._stop_supervisor()
+                self._supervisor_task = asyncio.create_task(self._supervise())
             return True, ""
         except ConnectionRefusedError:
             error_message = f"Connection to {self.host}:{self.port} refused"
@@ -165,9 +366,115 @@ class GrowcubeClient:
         :return: None
         """
         _LOGGER.info("Disconnecting")
+        self._exit = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._stop_supervisor()
         if self.transport:
             self.transport.close()
         self.connected = False
+        for stream in list(self._report_streams):
+            stream.close()
+
+    async def replay(self, records: Iterable[GrowcubeCaptureRecord], speed: Optional[float] = 1.0) -> int:
+        """
+        Replay captured device traffic instead of connecting to a device. The received data is passed
+        through GrowcubeProtocol as if it came from the device, commands sent during the replay are kept in
+        the transport. The replayed connection is not reconnected when the capture ends.
+
+        :param records: The capture records, for example a GrowcubeCaptureReader.
+        :type records: Iterable[GrowcubeCaptureRecord]
+        :param speed: Replay speed, 1.0 for the original timing, or None for maximum speed.
+        :type speed: float or None
+        :return: Number of received records replayed.
+        :rtype: int
+        """
+        self._exit = True
+        self.protocol = GrowcubeProtocol(self.on_connected, self.on_message, self.on_connection_lost,
+                                         self.coalesce_writes, self.send_interval, self.send_max_batch,
+                                         self.capture, self.max_frame_size, self.max_buffer_size)
+        self.transport = GrowcubeReplayTransport(self.protocol, records, speed)
+        self.last_activity = time.monotonic()
+        return await self.transport.replay()
+
+    def reports(self, max_size: int = 100,
+                policy: OverflowPolicy = OverflowPolicy.DropOldest) -> GrowcubeReportStream:
+        """
+        Open a bounded stream of received reports, to be used with ``async for``.
+        The stream ends when it is closed or when disconnect is called.
+
+        :param max_size: Maximum number of queued reports.
+        :type max_size: int
+        :param policy: What to do when the queue is full.
+        :type policy: OverflowPolicy
+        :return: The report stream.
+        :rtype: GrowcubeReportStream
+        """
+        stream = GrowcubeReportStream(max_size, policy,
+                                      self._pause_reading,
+                                      self._resume_reading,
+                                      self._report_streams.remove)
+        self._report_streams.append(stream)
+        return stream
+
+    def _pause_reading(self) -> None:
+        """
+        Pause reading from the Growcube, called by a full report stream
+        """
+        self._reading_paused += 1
+        if self._reading_paused == 1 and self.transport:
+            self.transport.pause_reading()
+
+    def _resume_reading(self) -> None:
+        """
+        Resume reading from the Growcube, called by a drained report stream
+        """
+        self._reading_paused -= 1
+        if self._reading_paused == 0 and self.transport:
+            self.transport.resume_reading()
+
+    def get_reconnect_delay(self, attempt: int) -> float:
+        """
+        Get the delay before a reconnect attempt, using exponential backoff with jitter.
+
+        :param attempt: Number of failed attempts so far.
+        :type attempt: int
+        :return: The delay in seconds.
+        :rtype: float
+        """
+        delay = min(self.reconnect_max_delay, self.reconnect_min_delay * 2 ** min(attempt, 32))
+        return delay - random.uniform(0, delay * self.reconnect_jitter)
+
+    async def _reconnect(self) -> None:
+        """
+        Reconnect to the Growcube until successful, the maximum number of attempts is reached,
+        or disconnect is called.
+        """
+        metrics = self.reconnect_metrics
+        attempt = 0
+        try:
+            while not self._exit:
+                if self.reconnect_max_attempts is not None and attempt >= self.reconnect_max_attempts:
+                    _LOGGER.error("Giving up reconnecting to %s after %i attempts", self.host, attempt)
+                    metrics.gave_up += 1
+                    return
+                delay = self.get_reconnect_delay(attempt)
+                metrics.last_delay = delay
+                _LOGGER.debug("Reconnecting to %s in %.1f seconds", self.host, delay)
+                await asyncio.sleep(delay)
+                if self._exit:
+                    return
+                metrics.attempts += 1
+                attempt += 1
+                success, _ = await self.connect()
+                if success:
+                    metrics.successes += 1
+                    return
+                metrics.failures += 1
+        finally:
+            if self._reconnect_task is asyncio.current_task():
+                self._reconnect_task = None
 
     def send_command(self, command: GrowcubeCommand) -> bool:
         """
@@ -179,9 +486,9 @@ class GrowcubeClient:
         :rtype: bool
         """
         try:
-            _LOGGER.info("> %s", command.get_description())
-            message_bytes = command.get_message().encode('ascii')
-            self.protocol.send_message(message_bytes)
+            _LOGGER.info("> %s", command)
+            self.protocol.send_message(command.get_bytes())
+            self._last_sent = time.monotonic()
         except OSError as e:
             _LOGGER.error(f"send_command OSError {str(e)}")
             return False
@@ -190,6 +497,134 @@ class GrowcubeClient:
             return False
         return True
 
+    async def send_command_acked(self, command: GrowcubeCommand, timeout: Optional[float] = None,
+                                 retries: Optional[int] = None) -> float:
+        """
+        Send a command and wait for the device to acknowledge it. The command is sent again if it is not
+        acknowledged within the timeout, at most the given number of times. If the command can't be sent,
+        for example while reconnecting, the next attempt is made after the timeout.
+
+        WaterCommand is acknowledged by RepPumpOpen or RepPumpClose depending on the state,
+        ClosePumpCommand is acknowledged by RepPumpClose, for the same channel.
+
+        :param command: A WaterCommand or ClosePumpCommand object.
+        :type command: GrowcubeCommand
+        :param timeout: Time to wait for the acknowledgement of each attempt, defaults to ack_timeout.
+        :type timeout: float or None
+        :param retries: Number of times to send the command again, defaults to ack_retries.
+        :type retries: int or None
+        :return: Time in seconds from the last write to the acknowledgement.
+        :rtype: float
+        :raises ValueError: If the command is not acknowledged by the device.
+        :raises asyncio.TimeoutError: If the command was not acknowledged after all retries.
+        """
+        key = self._get_ack_key(command)
+        timeout = self.ack_timeout if timeout is None else timeout
+        retries = self.ack_retries if retries is None else retries
+        loop = asyncio.get_running_loop()
+        metrics = self.command_metrics
+        metrics.sent += 1
+        for attempt in range(retries + 1):
+            if attempt:
+                metrics.retries += 1
+            future = loop.create_future()
+            waiters = self._ack_waiters.setdefault(key, [])
+            waiters.append(future)
+            try:
+                sent_at = time.monotonic()
+                if not self.send_command(command):
+                    # Not connected, give a reconnect time to finish before the next attempt
+                    _LOGGER.debug("Could not send %s", command)
+                    if attempt < retries:
+                        await asyncio.sleep(timeout)
+                    continue
+                try:
+                    acknowledged_at = await asyncio.wait_for(future, timeout)
+                except asyncio.TimeoutError:
+                    _LOGGER.debug("No acknowledgement for %s", command)
+                    continue
+            finally:
+                if future in waiters:
+                    waiters.remove(future)
+                if not waiters and self._ack_waiters.get(key) is waiters:
+                    del self._ack_waiters[key]
+            latency = acknowledged_at - sent_at
+            metrics.acknowledged += 1
+            metrics.last_latency = latency
+            metrics.max_latency = max(metrics.max_latency, latency)
+            metrics.total_latency += latency
+            return latency
+        metrics.timeouts += 1
+        raise asyncio.TimeoutError(f"{command} was not acknowledged")
+
+    async def _try_command_acked(self, command: GrowcubeCommand) -> bool:
+        """
+        Send a command and wait for the acknowledgement, logging an error on timeout
+        """
+        try:
+            await self.send_command_acked(command)
+        except asyncio.TimeoutError:
+            _LOGGER.error("%s was not acknowledged", command)
+            return False
+        return True
+
+    @staticmethod
+    def _get_ack_key(command: GrowcubeCommand) -> Tuple[Type[GrowcubeReport], Channel]:
+        """
+        Get the report class and channel that acknowledges a command
+        """
+        if isinstance(command, WaterCommand):
+            return (PumpOpenGrowcubeReport if command.state else PumpCloseGrowcubeReport), command.channel
+        if isinstance(command, ClosePumpCommand):
+            return PumpCloseGrowcubeReport, command.channel
+        raise ValueError(f"{command} is not acknowledged by the device")
+
+    def _resolve_ack(self, report: GrowcubeReport) -> None:
+        """
+        Resolve the futures waiting for a report
+        """
+        waiters = self._ack_waiters.get((type(report), getattr(report, 'channel', None)))
+        if waiters:
+            now = time.monotonic()
+            for future in waiters:
+                if not future.done():
+                    future.set_result(now)
+
+    async def _supervise(self) -> None:
+        """
+        Send keep-alives while the link is idle, and close the connection when it is stale
+        """
+        while self.connected and self.transport is not None:
+            now = time.monotonic()
+            received = now - self.last_activity
+            if self.stale_timeout is not None and received >= self.stale_timeout:
+                _LOGGER.warning("Nothing received from %s for %.0f seconds, closing connection",
+                                self.host, received)
+                self.reconnect_metrics.stale_links += 1
+                self._supervisor_task = None
+                # Connection lost handling, including auto reconnect, is done by the protocol
+                self.transport.abort()
+                return
+            delays = []
+            if self.stale_timeout is not None:
+                delays.append(self.stale_timeout - received)
+            if self.keep_alive_interval is not None:
+                idle = now - max(self.last_activity, self._last_sent)
+                if idle >= self.keep_alive_interval:
+                    self.reconnect_metrics.keep_alives += 1
+                    self.send_command(SetWorkModeCommand.interned(WorkMode.Direct))
+                    idle = 0
+                delays.append(self.keep_alive_interval - idle)
+            await asyncio.sleep(max(min(delays), 0.01))
+
+    def _stop_supervisor(self) -> None:
+        """
+        Cancel the liveness supervisor task
+        """
+        if self._supervisor_task is not None:
+            self._supervisor_task.cancel()
+            self._supervisor_task = None
+
     async def send_keep_alive(self, interval: int) -> None:
         """
         Send a keep alive, we are using the SetWorkModeCommand for this
@@ -199,10 +634,10 @@ class GrowcubeClient:
         :return: None
         """
         while self.connected:
-            self.send_command(SetWorkModeCommand(1))
+            self.send_command(SetWorkModeCommand.interned(WorkMode.Direct))
             await asyncio.sleep(interval)
 
-    async def water_plant(self, channel: Channel, duration: int) -> bool:
+    async def water_plant(self, channel: Channel, duration: int, acknowledged: bool = False) -> bool:
         """
         Water a plant for a given duration. This function will block until the watering is complete.
 
@@ -210,14 +645,56 @@ class GrowcubeClient:
         :type channel: Channel
         :param duration: Duration in seconds.
         :type duration: int
+        :param acknowledged: Wait for the device to confirm that the pump started and stopped,
+                             instead of sending the stop command twice on failure.
+        :type acknowledged: bool
         :return: True if the watering was successful, otherwise False.
         :rtype: bool
         """
-        success = self.send_command(WaterCommand(channel, True))
+        if acknowledged:
+            started = await self._try_command_acked(WaterCommand.interned(channel, True))
+            try:
+                if started:
+                    await asyncio.sleep(duration)
+            finally:
+                # Always stop the pump, it may have started even if not acknowledged
+                stopped = await self._try_command_acked(WaterCommand.interned(channel, False))
+            return started and stopped
+        success = self.send_command(WaterCommand.interned(channel, True))
         if success:
             await asyncio.sleep(duration)
-            success = self.send_command(WaterCommand(channel, False))
+            success = self.send_command(WaterCommand.interned(channel, False))
             if not success:
                 # Try again just to be sure
-                success = self.send_command(WaterCommand(channel, False))
+                success = self.send_command(WaterCommand.interned(channel, False))
         return success
+
+    async def download_curve(self, channel: Channel, timeout: float = 10) -> AsyncIterator[CurveGrowcubeReport]:
+        """
+        Download the historic moisture curve for a channel. The curve points are yielded as they arrive,
+        reading from the device is paused while the consumer is behind.
+
+        :param channel: Channel number 0-3.
+        :type channel: Channel
+        :param timeout: Maximum time in seconds to wait for the next curve point.
+        :type timeout: float
+        :return: An async iterator of curve points, ending when the device reports the end of the curve.
+        :rtype: AsyncIterator[CurveGrowcubeReport]
+        :raises ConnectionError: If the curve could not be requested, for example when not connected.
+        :raises asyncio.TimeoutError: If no curve point arrives within the timeout.
+        """
+        stream = self.reports(policy=OverflowPolicy.Block)
+        try:
+            if not self.send_command(RequestCurveDataCommand.interned(channel)):
+                raise ConnectionError(f"Could not request the curve of {channel} from {self.host}")
+            while True:
+                try:
+                    report = await asyncio.wait_for(stream.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+                if isinstance(report, CurveGrowcubeReport) and report.channel == channel:
+                    yield report
+                elif isinstance(report, RepCurveEndFlagGrowcubeReport) and report.channel == channel:
+                    return
+        finally:
+            stream.close()
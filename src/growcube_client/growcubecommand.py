@@ -1,6 +1,6 @@
 import datetime
 import time
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from .growcubeenums import Channel, WateringMode, WorkMode
 
@@ -50,6 +50,10 @@ class GrowcubeCommand:
     :type command: str
     :ivar message: The message to send.
     :type message: str
+    :ivar _bytes: The encoded message, once computed.
+    :type _bytes: bytes or None
+    :ivar _frozen: True if the command can no longer be changed.
+    :type _frozen: bool
 
     :param command: A string from the Command dictionary keys.
     :param message: The message to send.
@@ -83,6 +87,11 @@ class GrowcubeCommand:
     MSG_DEVICE_UPGRADE = "ele504"
     MSG_FACTORY_RESET = "ele505"
 
+    # Shared table of interned commands, keyed by class and constructor arguments
+    _interned: Dict[Tuple, 'GrowcubeCommand'] = {}
+    # Set to False in subclasses whose message changes on every call
+    _cache_bytes = True
+
     def __init__(self, command: str, message: Optional[str]):
         """
         GrowcubeCommand constructor
@@ -95,6 +104,59 @@ class GrowcubeCommand:
         self.command = command
         self.message = message
 
+    def __setattr__(self, name: str, value) -> None:
+        """
+        Set an attribute, dropping the encoded message.
+
+        :raises AttributeError: If the command is frozen.
+        """
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"{type(self).__name__} is frozen")
+        object.__setattr__(self, '_bytes', None)
+        object.__setattr__(self, name, value)
+
+    @classmethod
+    def interned(cls, *args) -> 'GrowcubeCommand':
+        """
+        Get a shared, frozen, instance of the command. Only intended for commands with a small,
+        fixed set of arguments, such as ``WaterCommand.interned(Channel.Channel_A, True)``.
+
+        :param args: The constructor arguments.
+        :return: The shared command.
+        :rtype: GrowcubeCommand
+        """
+        key = (cls, *args)
+        command = GrowcubeCommand._interned.get(key)
+        if command is None:
+            command = GrowcubeCommand._interned[key] = cls(*args).freeze()
+        return command
+
+    def freeze(self) -> 'GrowcubeCommand':
+        """
+        Encode the message and make the command immutable.
+
+        :return: The command itself.
+        :rtype: GrowcubeCommand
+        """
+        self.get_bytes()
+        object.__setattr__(self, '_frozen', True)
+        return self
+
+    def get_bytes(self) -> bytes:
+        """
+        Get the complete message for sending to the Growcube device, encoded as ASCII.
+        The encoded message is computed once and reused.
+
+        :return: The encoded message.
+        :rtype: bytes
+        """
+        data = getattr(self, '_bytes', None)
+        if data is None:
+            data = self.get_message().encode('ascii')
+            if self._cache_bytes:
+                object.__setattr__(self, '_bytes', data)
+        return data
+
     def get_message(self) -> str:
         """
         Get the complete message for sending to the Growcube device.
@@ -119,6 +181,16 @@ class GrowcubeCommand:
         else:
             return f"Unknown command: {self.command}"
 
+    def __str__(self) -> str:
+        """
+        Get a human-readable description of the command. This allows a command to be passed
+        as a logging argument, the description is then only created if the record is emitted.
+
+        :return: A human-readable description of the command.
+        :rtype: str
+        """
+        return self.get_description()
+
 
 class SetWorkModeCommand(GrowcubeCommand):
     """
@@ -198,6 +270,7 @@ class ClosePumpCommand(GrowcubeCommand):
         :type channel: Channel
         """
         super().__init__(GrowcubeCommand.CMD_CLOSE_PUMP, str(channel.value))
+        self.channel = channel
 
 
 class WaterCommand(GrowcubeCommand):
@@ -287,6 +360,9 @@ class WiFiSettingsCommand(GrowcubeCommand):
         self.password = password
         super().__init__(self.CMD_WIFI_SETTINGS, None)
 
+    # The message contains the current time
+    _cache_bytes = False
+
     def get_message(self) -> str:
         """
         Get the complete message for sending to the Growcube device.
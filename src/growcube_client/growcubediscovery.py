@@ -1,10 +1,17 @@
 import asyncio
+import errno
 import ipaddress
+import json
 import logging
+import os
+import time
 
 _LOGGER = logging.getLogger(__name__)
 
 import socket
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from .growcubeframer import GrowcubeFrameScanner
+from .growcubereport import GrowcubeReport, DeviceVersionGrowcubeReport
 
 """
 Growcube client library
@@ -21,18 +28,64 @@ class GrowcubeDiscovery:
 
     :cvar PORT: The default port for Growcube device discovery.
     :vartype PORT: int
+    :cvar MIN_CONNECT_TIMEOUT: Lowest connect timeout used by scan, in seconds.
+    :vartype MIN_CONNECT_TIMEOUT: float
+    :cvar MAX_CONNECT_TIMEOUT: Highest connect timeout used by scan, in seconds.
+    :vartype MAX_CONNECT_TIMEOUT: float
+    :cvar RESOURCE_RETRIES: Number of times scan probes an address again when out of sockets.
+    :vartype RESOURCE_RETRIES: int
+    :cvar RESOURCE_MIN_DELAY: Delay in seconds before probing again after running out of sockets, doubled for
+                              each consecutive failure.
+    :vartype RESOURCE_MIN_DELAY: float
+    :cvar RESOURCE_MAX_DELAY: Highest delay in seconds before probing again after running out of sockets.
+    :vartype RESOURCE_MAX_DELAY: float
 
     :ivar _devices: A list to store discovered devices.
     :type _devices: list[str]
+    :ivar concurrency: Current number of simultaneous connection attempts in scan.
+    :type concurrency: int
+    :ivar connect_timeout: Current connect timeout in scan, tuned from the observed round-trip times.
+    :type connect_timeout: float
+    :ivar probed: Number of addresses probed by scan.
+    :type probed: int
+    :ivar timeouts: Number of probes in scan that timed out.
+    :type timeouts: int
+    :ivar resource_failures: Number of addresses in scan that were given up because the local host stayed
+                             out of sockets.
+    :type resource_failures: int
+    :ivar _srtt: Smoothed round-trip time, or None if no host has answered.
+    :type _srtt: float or None
+    :ivar _rttvar: Round-trip time variation.
+    :type _rttvar: float
     """
 
     PORT = 8800
+    # The round-trip times are mostly measured on hosts that are awake, like wired computers and routers.
+    # A Growcube on Wi-Fi in power save mode only wakes up on the DTIM beacon, which typically adds
+    # 100-300 ms, so the timeout is kept well above that even on a fast LAN.
+    MIN_CONNECT_TIMEOUT = 0.5
+    MAX_CONNECT_TIMEOUT = 2.0
+    RESOURCE_RETRIES = 5
+    RESOURCE_MIN_DELAY = 0.05
+    RESOURCE_MAX_DELAY = 1.0
+
+    # Errors that mean the local host is out of sockets, not that the address is dead. EAGAIN is raised
+    # by connect on Linux when no local port is free for the address, and by non-blocking socket
+    # creation when the kernel is short of memory.
+    _RESOURCE_ERRORS = (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EAGAIN)
 
     def __init__(self) -> None:
         """
         GrowcubeDiscovery constructor
         """
         self._devices = []
+        self.concurrency = 0
+        self.connect_timeout = self.MAX_CONNECT_TIMEOUT
+        self.probed = 0
+        self.timeouts = 0
+        self.resource_failures = 0
+        self._srtt: Optional[float] = None
+        self._rttvar = 0.0
 
     async def discover_device(self, ip_address: str) -> bool:
         """
@@ -91,6 +144,137 @@ class GrowcubeDiscovery:
         else:
             _LOGGER.error("Failed to determine the local subnet. Make sure you are connected to a network.")
 
+    async def scan(self,
+                   subnets: Union[ipaddress.IPv4Network, Iterable[ipaddress.IPv4Network], None] = None,
+                   max_concurrency: int = 512,
+                   initial_concurrency: int = 64) -> AsyncIterator[str]:
+        """
+        Scan one or more subnets for Growcube devices, yielding each device address as soon as it answers.
+
+        The number of simultaneous connection attempts starts at initial_concurrency and grows by one for
+        each finished probe up to max_concurrency, and is halved when the local host runs out of sockets.
+        Probing then pauses for RESOURCE_MIN_DELAY, doubled for each consecutive shortage up to
+        RESOURCE_MAX_DELAY, and an address is given up after RESOURCE_RETRIES shortages.
+        The connect timeout is derived from the round-trip times of hosts that answered, accepting or refusing
+        the connection, and kept between MIN_CONNECT_TIMEOUT and MAX_CONNECT_TIMEOUT. Connections are
+        aborted as soon as they are established.
+
+        :param subnets: A subnet or a list of subnets to scan, defaults to the guessed local subnet.
+        :type subnets: ipaddress.IPv4Network or Iterable[ipaddress.IPv4Network] or None
+        :param max_concurrency: Maximum number of simultaneous connection attempts.
+        :type max_concurrency: int
+        :param initial_concurrency: Number of simultaneous connection attempts to start with.
+        :type initial_concurrency: int
+        :return: An async iterator of discovered device IP addresses.
+        :rtype: AsyncIterator[str]
+        """
+        if subnets is None:
+            subnets = [self.guess_subnet()]
+        elif isinstance(subnets, ipaddress.IPv4Network):
+            subnets = [subnets]
+        hosts = self._iterate_hosts(subnets)
+        retry = []
+        # Number of times each address ran into a shortage of sockets
+        shortages: Dict[str, int] = {}
+        consecutive_shortages = 0
+        self.concurrency = max(1, min(initial_concurrency, max_concurrency))
+        pending = set()
+        try:
+            while True:
+                while len(pending) < self.concurrency:
+                    ip = retry.pop() if retry else next(hosts, None)
+                    if ip is None:
+                        break
+                    pending.add(asyncio.create_task(self._probe(ip)))
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                out_of_sockets = False
+                for task in done:
+                    ip, found, rtt = task.result()
+                    if found is None:
+                        # Out of sockets, back off and try the address again
+                        out_of_sockets = True
+                        self.concurrency = max(1, self.concurrency // 2)
+                        shortages[ip] = shortages.get(ip, 0) + 1
+                        if shortages[ip] <= self.RESOURCE_RETRIES:
+                            retry.append(ip)
+                            continue
+                        _LOGGER.debug(f"Giving up {ip}, out of sockets")
+                        del shortages[ip]
+                        self.probed += 1
+                        self.resource_failures += 1
+                        continue
+                    shortages.pop(ip, None)
+                    self.probed += 1
+                    if rtt is None:
+                        self.timeouts += 1
+                    else:
+                        self._update_rtt(rtt)
+                    if self.concurrency < max_concurrency:
+                        self.concurrency += 1
+                    if found:
+                        _LOGGER.debug(f"Device discovered at {ip}:{self.PORT}")
+                        yield ip
+                if out_of_sockets:
+                    consecutive_shortages += 1
+                    await asyncio.sleep(min(self.RESOURCE_MAX_DELAY,
+                                            self.RESOURCE_MIN_DELAY * 2 ** (consecutive_shortages - 1)))
+                else:
+                    consecutive_shortages = 0
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _probe(self, ip: str) -> Tuple[str, Optional[bool], Optional[float]]:
+        """
+        Try to connect to an address, closing the connection at once
+
+        :return: The address, True if a device answered, False if not or None if out of sockets,
+                 and the round-trip time if the host answered.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        try:
+            transport, _ = await asyncio.wait_for(loop.create_connection(asyncio.Protocol, ip, self.PORT),
+                                                  timeout=self.connect_timeout)
+        except asyncio.TimeoutError:
+            return ip, False, None
+        except ConnectionRefusedError:
+            # The host is up, only the port is closed
+            return ip, False, time.monotonic() - start
+        except OSError as e:
+            if e.errno in self._RESOURCE_ERRORS:
+                return ip, None, None
+            return ip, False, None
+        transport.abort()
+        return ip, True, time.monotonic() - start
+
+    def _update_rtt(self, rtt: float) -> None:
+        """
+        Update the smoothed round-trip time and the connect timeout, as TCP does for retransmissions
+        """
+        if self._srtt is None:
+            self._srtt = rtt
+            self._rttvar = rtt / 2
+        else:
+            self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - rtt)
+            self._srtt = 0.875 * self._srtt + 0.125 * rtt
+        self.connect_timeout = min(self.MAX_CONNECT_TIMEOUT,
+                                   max(self.MIN_CONNECT_TIMEOUT, self._srtt + 4 * self._rttvar))
+
+    @staticmethod
+    def _iterate_hosts(subnets: Iterable[ipaddress.IPv4Network]) -> Iterator[str]:
+        """
+        Iterate over the host addresses of the subnets, skipping addresses already seen
+        """
+        seen = set()
+        for subnet in subnets:
+            for ip in subnet.hosts():
+                if ip not in seen:
+                    seen.add(ip)
+                    yield str(ip)
+
     @staticmethod
     def guess_subnet() -> ipaddress.IPv4Network:
         """
@@ -110,3 +294,244 @@ class GrowcubeDiscovery:
         subnet = f"{split[0]}.{split[1]}.{split[2]}.0/24"
         _LOGGER.debug(f"Guessed local subnet: {subnet}")
         return ipaddress.IPv4Network(subnet, strict=False)
+
+
+class GrowcubeDiscoveryCacheEntry:
+    """
+    A known Growcube device in a GrowcubeDiscoveryCache
+
+    :ivar device_id: Device ID, as reported by the device.
+    :type device_id: str
+    :ivar host: Last known IP address of the device.
+    :type host: str
+    :ivar version: Firmware version, as reported by the device.
+    :type version: str
+    :ivar last_seen: Time the device was last seen, seconds since the epoch.
+    :type last_seen: float
+    :ivar ttl: Time in seconds after last_seen that the entry expires.
+    :type ttl: float
+    """
+
+    def __init__(self, device_id: str, host: str, version: str, last_seen: float, ttl: float):
+        """
+        GrowcubeDiscoveryCacheEntry constructor
+
+        :param device_id: Device ID, as reported by the device.
+        :type device_id: str
+        :param host: Last known IP address of the device.
+        :type host: str
+        :param version: Firmware version, as reported by the device.
+        :type version: str
+        :param last_seen: Time the device was last seen, seconds since the epoch.
+        :type last_seen: float
+        :param ttl: Time in seconds after last_seen that the entry expires.
+        :type ttl: float
+        """
+        self.device_id = device_id
+        self.host = host
+        self.version = version
+        self.last_seen = last_seen
+        self.ttl = ttl
+
+    def expired(self, now: float) -> bool:
+        """
+        Check if the entry has expired
+
+        :param now: The current time, seconds since the epoch.
+        :type now: float
+        :return: True if the entry has expired, otherwise False.
+        :rtype: bool
+        """
+        return now - self.last_seen > self.ttl
+
+
+class GrowcubeDiscoveryCache:
+    """
+    Persistent cache of discovered Growcube devices, stored as a JSON file and keyed by device ID.
+
+    The refresh method first checks the known addresses, and only scans the subnets when a known
+    device did not answer at its address, or when no devices are known. A device that came back on a
+    new address is recognized by its device ID.
+
+    :cvar DEFAULT_TTL: Default time in seconds that an entry is kept without the device being seen.
+    :vartype DEFAULT_TTL: float
+
+    :ivar path: Path of the cache file.
+    :type path: str
+    :ivar ttl: Time in seconds that new entries are kept without the device being seen.
+    :type ttl: float
+    :ivar identify_timeout: Time in seconds to wait for a device to report its device ID.
+    :type identify_timeout: float
+    :ivar entries: Known devices, keyed by device ID.
+    :type entries: dict[str, GrowcubeDiscoveryCacheEntry]
+    """
+
+    DEFAULT_TTL = 7 * 24 * 3600
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL) -> None:
+        """
+        GrowcubeDiscoveryCache constructor, loads the cache file if it exists
+
+        :param path: Path of the cache file.
+        :type path: str
+        :param ttl: Time in seconds that new entries are kept without the device being seen.
+        :type ttl: float
+        """
+        self.path = path
+        self.ttl = ttl
+        self.identify_timeout = 2.0
+        self.entries: Dict[str, GrowcubeDiscoveryCacheEntry] = {}
+        self.load()
+
+    @property
+    def hosts(self) -> Dict[str, str]:
+        """
+        Known device addresses
+
+        :return: IP addresses, keyed by device ID.
+        :rtype: dict[str, str]
+        """
+        return {device_id: entry.host for device_id, entry in self.entries.items()}
+
+    def load(self) -> None:
+        """
+        Load the cache file, expired entries are skipped. A missing or invalid file gives an empty cache.
+        """
+        self.entries = {}
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+            if not isinstance(data, dict) or not isinstance(data.get("devices", []), list):
+                raise ValueError("Unexpected file content")
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            _LOGGER.error(f"Failed to load discovery cache {self.path}: {str(e)}")
+            return
+        now = time.time()
+        for item in data.get("devices", []):
+            try:
+                entry = GrowcubeDiscoveryCacheEntry(item["device_id"], item["host"], item.get("version", ""),
+                                                    float(item["last_seen"]), float(item.get("ttl", self.ttl)))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not entry.expired(now):
+                self.entries[entry.device_id] = entry
+
+    def save(self) -> None:
+        """
+        Save the cache file, replacing the old file in one step
+        """
+        data = {"devices": [vars(entry) for entry in self.entries.values()]}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(data, file, indent=2)
+        os.replace(temp_path, self.path)
+
+    def update(self, host: str, report: DeviceVersionGrowcubeReport) -> GrowcubeDiscoveryCacheEntry:
+        """
+        Record that a device was seen at an address.
+
+        :param host: IP address of the device.
+        :type host: str
+        :param report: The version report received from the device.
+        :type report: DeviceVersionGrowcubeReport
+        :return: The cache entry.
+        :rtype: GrowcubeDiscoveryCacheEntry
+        """
+        entry = self.entries.get(report.device_id)
+        if entry is None:
+            entry = self.entries[report.device_id] = GrowcubeDiscoveryCacheEntry(
+                report.device_id, host, report.version, time.time(), self.ttl)
+        else:
+            if entry.host != host:
+                _LOGGER.info(f"Device {entry.device_id} moved from {entry.host} to {host}")
+            entry.host = host
+            entry.version = report.version
+            entry.last_seen = time.time()
+        return entry
+
+    async def identify(self, host: str, port: int = GrowcubeDiscovery.PORT) -> Optional[DeviceVersionGrowcubeReport]:
+        """
+        Connect to a device and wait for it to report its version and device ID.
+
+        :param host: IP address of the device.
+        :type host: str
+        :param port: Port of the device.
+        :type port: int
+        :return: The version report, or None if the device did not answer in time.
+        :rtype: DeviceVersionGrowcubeReport or None
+        """
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.identify_timeout)
+        except (asyncio.TimeoutError, OSError):
+            return None
+
+        async def read_version() -> Optional[DeviceVersionGrowcubeReport]:
+            scanner = GrowcubeFrameScanner(resync=True)
+            while True:
+                data = await reader.read(1024)
+                if not data:
+                    return None
+                scanner.feed(data.replace(b'\x00', b''))
+                while True:
+                    message = scanner.next_message()
+                    if message is None:
+                        break
+                    try:
+                        report = GrowcubeReport.get_report(message)
+                    except (ValueError, IndexError):
+                        # Skip a malformed report, as GrowcubeClient.on_message does
+                        continue
+                    if isinstance(report, DeviceVersionGrowcubeReport):
+                        return report
+
+        try:
+            return await asyncio.wait_for(read_version(), self.identify_timeout)
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            writer.close()
+
+    async def refresh(self, discovery: GrowcubeDiscovery,
+                      subnets: Union[ipaddress.IPv4Network, Iterable[ipaddress.IPv4Network], None] = None,
+                      full_scan: bool = False) -> Dict[str, str]:
+        """
+        Revalidate the known devices, scanning the subnets only if a known device is missing,
+        no devices are known or a full scan is requested. The cache file is saved afterwards.
+
+        :param discovery: The discovery instance used for scanning.
+        :type discovery: GrowcubeDiscovery
+        :param subnets: A subnet or a list of subnets to scan, defaults to the guessed local subnet.
+        :type subnets: ipaddress.IPv4Network or Iterable[ipaddress.IPv4Network] or None
+        :param full_scan: Always scan the subnets, to find new devices.
+        :type full_scan: bool
+        :return: IP addresses of the devices found, keyed by device ID.
+        :rtype: dict[str, str]
+        """
+        now = time.time()
+        self.entries = {device_id: entry for device_id, entry in self.entries.items() if not entry.expired(now)}
+        found: Dict[str, str] = {}
+        known = list(self.entries.values())
+        reports = await asyncio.gather(*[self.identify(entry.host, discovery.PORT) for entry in known])
+        for entry, report in zip(known, reports):
+            if report is not None:
+                self.update(entry.host, report)
+                found[report.device_id] = entry.host
+        missing = [entry.device_id for entry in known if entry.device_id not in found]
+        if full_scan or missing or not known:
+            _LOGGER.debug(f"Scanning for devices, missing: {missing}")
+            checked = set(found.values())
+            # Identify devices while the scan continues
+            pending: List[Tuple[str, asyncio.Task]] = []
+            async for host in discovery.scan(subnets):
+                if host not in checked:
+                    pending.append((host, asyncio.create_task(self.identify(host, discovery.PORT))))
+                    checked.add(host)
+            for host, task in pending:
+                report = await task
+                if report is not None:
+                    self.update(host, report)
+                    found[report.device_id] = host
+        self.save()
+        return found
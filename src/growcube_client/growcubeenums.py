@@ -52,4 +52,33 @@ class WorkMode(IntEnum):
     :vartype Network: int
     """
     Direct = 1
-    Network = 2
\ No newline at end of file
+    Network = 2
+
+
+class OverflowPolicy(IntEnum):
+    """
+    Enum representing what a report stream does when its queue is full
+
+    :cvar DropOldest: Discard the oldest queued report
+    :vartype DropOldest: int
+    :cvar DropNewest: Discard the newly received report
+    :vartype DropNewest: int
+    :cvar Block: Pause reading from the device until the reader has caught up
+    :vartype Block: int
+    """
+    DropOldest = 1
+    DropNewest = 2
+    Block = 3
+
+
+class CaptureDirection(IntEnum):
+    """
+    Enum representing the direction of data in a capture file
+
+    :cvar Received: Data received from the device
+    :vartype Received: int
+    :cvar Sent: Data sent to the device
+    :vartype Sent: int
+    """
+    Received = 0
+    Sent = 1
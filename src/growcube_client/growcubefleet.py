@@ -0,0 +1,288 @@
+import asyncio
+import inspect
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from .growcubeclient import GrowcubeClient
+from .growcubecommand import GrowcubeCommand
+from .growcubereport import GrowcubeReport
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+MessageCallback = Callable[[str, GrowcubeReport], Union[Awaitable[None], None]]
+HostCallback = Callable[[str], Union[Awaitable[None], None]]
+
+
+class GrowcubeFleetDevice:
+    """
+    State of a single device in a GrowcubeFleet
+
+    :ivar client: The client used for the device.
+    :type client: GrowcubeClient
+    :ivar last_error: The error message from the last failed connection attempt.
+    :type last_error: str
+    :ivar message_count: Number of reports received from the device.
+    :type message_count: int
+    :ivar last_message: Monotonic time of the last received report, or None.
+    :type last_message: float or None
+    """
+
+    def __init__(self, client: GrowcubeClient):
+        """
+        GrowcubeFleetDevice constructor
+
+        :param client: The client used for the device.
+        :type client: GrowcubeClient
+        """
+        self.client = client
+        self.last_error = ""
+        self.message_count = 0
+        self.last_message = None
+
+    @property
+    def host(self) -> str:
+        """
+        Name or IP address of the device
+
+        :return: Name or IP address of the device.
+        :rtype: str
+        """
+        return self.client.host
+
+    @property
+    def connected(self) -> bool:
+        """
+        Connection state
+
+        :return: True if connected, otherwise False.
+        :rtype: bool
+        """
+        return self.client.connected
+
+
+class GrowcubeFleet:
+    """
+    Manages connections to many Growcube devices on a single event loop.
+
+    Reports and connection events from all devices are fanned out to the callbacks registered
+    on the fleet, together with the host name of the device.
+
+    :cvar DEFAULT_MAX_CONCURRENT_CONNECTS: Default number of simultaneous connection attempts.
+    :vartype DEFAULT_MAX_CONCURRENT_CONNECTS: int
+
+    :ivar max_concurrent_connects: Number of simultaneous connection attempts in connect_all.
+    :type max_concurrent_connects: int
+    :ivar auto_reconnect: Reconnect devices automatically when their connection is lost.
+    :type auto_reconnect: bool
+    :ivar _devices: Devices in the fleet, keyed by host.
+    :type _devices: dict[str, GrowcubeFleetDevice]
+    :ivar _message_callbacks: Callbacks for received reports.
+    :type _message_callbacks: list[Callable[[str, GrowcubeReport], None]]
+    :ivar _connected_callbacks: Callbacks for established connections.
+    :type _connected_callbacks: list[Callable[[str], None]]
+    :ivar _disconnected_callbacks: Callbacks for lost connections.
+    :type _disconnected_callbacks: list[Callable[[str], None]]
+    """
+
+    DEFAULT_MAX_CONCURRENT_CONNECTS = 20
+
+    def __init__(self,
+                 on_message_callback: Optional[MessageCallback] = None,
+                 on_connected_callback: Optional[HostCallback] = None,
+                 on_disconnected_callback: Optional[HostCallback] = None,
+                 max_concurrent_connects: int = DEFAULT_MAX_CONCURRENT_CONNECTS,
+                 auto_reconnect: bool = False) -> None:
+        """
+        GrowcubeFleet constructor
+
+        :param on_message_callback: Callback function to receive reports from all devices.
+        :param on_connected_callback: Callback function for when a connection is established.
+        :param on_disconnected_callback: Callback function for when a connection is lost.
+        :param max_concurrent_connects: Number of simultaneous connection attempts in connect_all.
+        :param auto_reconnect: Reconnect devices automatically when their connection is lost,
+                               with jittered backoff so devices coming back at once are spread out.
+        """
+        self.max_concurrent_connects = max_concurrent_connects
+        self.auto_reconnect = auto_reconnect
+        self._devices: Dict[str, GrowcubeFleetDevice] = {}
+        self._message_callbacks: List[MessageCallback] = []
+        self._connected_callbacks: List[HostCallback] = []
+        self._disconnected_callbacks: List[HostCallback] = []
+        if on_message_callback:
+            self._message_callbacks.append(on_message_callback)
+        if on_connected_callback:
+            self._connected_callbacks.append(on_connected_callback)
+        if on_disconnected_callback:
+            self._disconnected_callbacks.append(on_disconnected_callback)
+
+    def __len__(self) -> int:
+        """
+        Number of devices in the fleet
+
+        :return: Number of devices.
+        :rtype: int
+        """
+        return len(self._devices)
+
+    @property
+    def devices(self) -> Dict[str, GrowcubeFleetDevice]:
+        """
+        Devices in the fleet
+
+        :return: Devices, keyed by host.
+        :rtype: dict[str, GrowcubeFleetDevice]
+        """
+        return self._devices
+
+    @property
+    def connected_hosts(self) -> List[str]:
+        """
+        Hosts that are currently connected
+
+        :return: List of connected hosts.
+        :rtype: list[str]
+        """
+        return [host for host, device in self._devices.items() if device.connected]
+
+    def add_message_callback(self, callback: MessageCallback) -> None:
+        """
+        Add a callback for reports received from any device.
+
+        :param callback: Callback function, called with the host and the report.
+        :type callback: Callable[[str, GrowcubeReport], None]
+        """
+        self._message_callbacks.append(callback)
+
+    def remove_message_callback(self, callback: MessageCallback) -> None:
+        """
+        Remove a callback for received reports.
+
+        :param callback: Callback function to remove.
+        :type callback: Callable[[str, GrowcubeReport], None]
+        """
+        self._message_callbacks.remove(callback)
+
+    def add_device(self, host: str) -> GrowcubeClient:
+        """
+        Add a device to the fleet. Adding a host that is already in the fleet returns the existing client.
+
+        :param host: Name or IP address of the device.
+        :type host: str
+        :return: The client used for the device.
+        :rtype: GrowcubeClient
+        """
+        device = self._devices.get(host)
+        if device is not None:
+            return device.client
+        client = GrowcubeClient(host,
+                                lambda report: self._on_message(host, report),
+                                self._on_connected,
+                                self._on_disconnected,
+                                auto_reconnect=self.auto_reconnect)
+        self._devices[host] = GrowcubeFleetDevice(client)
+        return client
+
+    def remove_device(self, host: str) -> None:
+        """
+        Disconnect and remove a device from the fleet.
+
+        :param host: Name or IP address of the device.
+        :type host: str
+        """
+        device = self._devices.pop(host, None)
+        if device is not None:
+            device.client.disconnect()
+
+    def get_client(self, host: str) -> Optional[GrowcubeClient]:
+        """
+        Get the client for a device
+
+        :param host: Name or IP address of the device.
+        :type host: str
+        :return: The client, or None if the host is not in the fleet.
+        :rtype: GrowcubeClient or None
+        """
+        device = self._devices.get(host)
+        return device.client if device is not None else None
+
+    async def connect_all(self) -> Dict[str, Tuple[bool, str]]:
+        """
+        Connect to all devices that are not connected, with at most max_concurrent_connects
+        connection attempts running at the same time.
+
+        :return: The result of each connection attempt, keyed by host.
+        :rtype: dict[str, Tuple[bool, str]]
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_connects)
+
+        async def connect_with_limit(device: GrowcubeFleetDevice) -> Tuple[bool, str]:
+            async with semaphore:
+                result = await device.client.connect()
+            device.last_error = result[1]
+            return result
+
+        devices = [device for device in self._devices.values() if not device.connected]
+        results = await asyncio.gather(*[connect_with_limit(device) for device in devices])
+        return {device.host: result for device, result in zip(devices, results)}
+
+    def disconnect_all(self) -> None:
+        """
+        Disconnect from all devices
+        """
+        for device in self._devices.values():
+            device.client.disconnect()
+
+    def send_command_all(self, command: GrowcubeCommand) -> Dict[str, bool]:
+        """
+        Send a command to all connected devices.
+
+        :param command: A GrowcubeCommand object.
+        :type command: GrowcubeCommand
+        :return: True for each host the command was sent to successfully, otherwise False.
+        :rtype: dict[str, bool]
+        """
+        return {host: self._devices[host].client.send_command(command) for host in self.connected_hosts}
+
+    def _on_message(self, host: str, report: GrowcubeReport) -> None:
+        """
+        Fan out a report from a device to the message callbacks
+        """
+        device = self._devices.get(host)
+        if device is not None:
+            device.message_count += 1
+            device.last_message = time.monotonic()
+        for callback in self._message_callbacks:
+            self._call(callback, host, report)
+
+    def _on_connected(self, host: str) -> None:
+        """
+        Fan out a connection established event to the connected callbacks
+        """
+        for callback in self._connected_callbacks:
+            self._call(callback, host)
+
+    def _on_disconnected(self, host: str) -> None:
+        """
+        Fan out a connection lost event to the disconnected callbacks
+        """
+        for callback in self._disconnected_callbacks:
+            self._call(callback, host)
+
+    @staticmethod
+    def _call(callback: Callable, *args) -> None:
+        """
+        Call a callback, scheduling it as a task if it is a coroutine function
+        """
+        if inspect.iscoroutinefunction(callback):
+            asyncio.create_task(callback(*args))
+        else:
+            callback(*args)
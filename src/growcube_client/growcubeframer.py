@@ -0,0 +1,463 @@
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+from typing import Optional
+
+from .growcubemessage import GrowcubeMessage
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+
+class GrowcubeReceiveMetrics:
+    """
+    Receive statistics for a GrowcubeFrameScanner
+
+    :ivar frames: Number of valid frames extracted.
+    :type frames: int
+    :ivar errors: Number of malformed frames skipped when resynchronizing.
+    :type errors: int
+    :ivar discarded: Number of received bytes discarded, junk between frames, malformed frames and overflows.
+    :type discarded: int
+    :ivar overflows: Number of times a frame or the buffer exceeded its maximum size and was discarded.
+    :type overflows: int
+    """
+
+    def __init__(self):
+        """
+        GrowcubeReceiveMetrics constructor
+        """
+        self.frames = 0
+        self.errors = 0
+        self.discarded = 0
+        self.overflows = 0
+
+
+class GrowcubeReceiveBuffer:
+    """
+    Preallocated, growable receive buffer.
+
+    Data is appended at the write position and consumed from the read position. Positions
+    are stream positions, counting all bytes ever appended, so they stay valid when the buffer
+    is compacted. Consuming data only moves the read position, the remaining data is moved to
+    the start of the buffer when the read position crosses the compaction watermark, or for free
+    when all data has been consumed.
+
+    :cvar DEFAULT_CAPACITY: Default initial capacity in bytes.
+    :vartype DEFAULT_CAPACITY: int
+
+    :ivar _buffer: The underlying storage.
+    :type _buffer: bytearray
+    :ivar _base: Stream position of the first byte of the storage.
+    :type _base: int
+    :ivar _start: Index of the first non-consumed byte in the storage.
+    :type _start: int
+    :ivar _end: Index of the first free byte in the storage.
+    :type _end: int
+    :ivar _watermark: Number of consumed bytes that triggers compaction.
+    :type _watermark: int
+    :ivar compactions: Number of times the buffer has been compacted.
+    :type compactions: int
+    """
+
+    DEFAULT_CAPACITY = 4096
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, watermark: Optional[int] = None):
+        """
+        GrowcubeReceiveBuffer constructor
+
+        :param capacity: Initial capacity in bytes.
+        :type capacity: int
+        :param watermark: Number of consumed bytes that triggers compaction, defaults to half the capacity.
+        :type watermark: int or None
+        """
+        self._buffer = bytearray(capacity)
+        self._base = 0
+        self._start = 0
+        self._end = 0
+        self._watermark = watermark if watermark is not None else capacity // 2
+        self.compactions = 0
+
+    def __len__(self) -> int:
+        """
+        Number of non-consumed bytes
+
+        :return: Number of non-consumed bytes.
+        :rtype: int
+        """
+        return self._end - self._start
+
+    @property
+    def capacity(self) -> int:
+        """
+        Current capacity of the buffer
+
+        :return: Capacity in bytes.
+        :rtype: int
+        """
+        return len(self._buffer)
+
+    @property
+    def read_position(self) -> int:
+        """
+        Stream position of the first non-consumed byte
+
+        :return: Read position.
+        :rtype: int
+        """
+        return self._base + self._start
+
+    @property
+    def write_position(self) -> int:
+        """
+        Stream position following the last appended byte
+
+        :return: Write position.
+        :rtype: int
+        """
+        return self._base + self._end
+
+    def append(self, data: bytes) -> None:
+        """
+        Append data to the buffer, growing it if needed.
+
+        :param data: The data to append.
+        :type data: bytes
+        """
+        if self._start and self._start >= self._watermark:
+            self._compact()
+        end = self._end + len(data)
+        # Slice assignment grows the storage if the data does not fit
+        self._buffer[self._end:end] = data
+        self._end = end
+
+    def consume(self, position: int) -> None:
+        """
+        Mark all data before a stream position as consumed.
+
+        :param position: Stream position of the first byte to keep.
+        :type position: int
+        """
+        self._start = min(max(position - self._base, self._start), self._end)
+        if self._start == self._end:
+            # Nothing left, start over from the beginning of the storage
+            self._base += self._end
+            self._start = 0
+            self._end = 0
+
+    def find(self, sub: bytes, position: int) -> int:
+        """
+        Find a byte sequence in the non-consumed data.
+
+        :param sub: The byte sequence to find.
+        :type sub: bytes
+        :param position: Stream position to start searching from.
+        :type position: int
+        :return: Stream position of the byte sequence, or -1 if not found.
+        :rtype: int
+        """
+        index = self._buffer.find(sub, max(position - self._base, self._start), self._end)
+        return index + self._base if index >= 0 else -1
+
+    def read(self, start: int, end: int) -> bytes:
+        """
+        Get a copy of the data between two stream positions.
+
+        :param start: Stream position of the first byte.
+        :type start: int
+        :param end: Stream position following the last byte.
+        :type end: int
+        :return: The data.
+        :rtype: bytes
+        """
+        with memoryview(self._buffer) as view:
+            return bytes(view[start - self._base:end - self._base])
+
+    def _compact(self) -> None:
+        """
+        Move the non-consumed data to the start of the storage
+        """
+        size = self._end - self._start
+        self._buffer[:size] = self._buffer[self._start:self._end]
+        self._base += self._start
+        self._start = 0
+        self._end = size
+        self.compactions += 1
+
+
+class GrowcubeFrameScanner:
+    """
+    Incremental scanner that extracts GrowcubeMessage frames from a stream of received bytes.
+
+    The scanner remembers how far it has searched for the header and delimiters of the current
+    frame, so bytes are only scanned once no matter how the data is fragmented. Frames are located
+    with ``bytearray.find`` in a GrowcubeReceiveBuffer, and only the bytes of a complete frame are
+    copied out of the buffer.
+
+    By default a malformed frame raises ValueError. In resync mode the scanner instead counts the
+    error, skips to the next header after the start of the malformed frame and continues from there.
+    In resync mode the end of a frame is found from the payload length, a frame without an end delimiter
+    at that position is malformed.
+
+    Memory use is bounded in both modes. A frame longer than max_frame_size is discarded, and scanning
+    continues after its header. Fed data that would make the pending data exceed max_buffer_size discards
+    the pending data, and the start of the fed data if it alone is too long. Both count as overflows.
+
+    :cvar HEADER: The frame header as bytes.
+    :vartype HEADER: bytes
+    :cvar DELIMITER: The field delimiter as bytes.
+    :vartype DELIMITER: bytes
+    :cvar DEFAULT_MAX_FRAME_SIZE: Default longest accepted frame, in bytes.
+    :vartype DEFAULT_MAX_FRAME_SIZE: int
+    :cvar DEFAULT_MAX_BUFFER_SIZE: Default maximum number of pending bytes.
+    :vartype DEFAULT_MAX_BUFFER_SIZE: int
+
+    :ivar resync: Skip malformed frames instead of raising ValueError.
+    :type resync: bool
+    :ivar max_frame_size: Longest accepted frame, in bytes.
+    :type max_frame_size: int
+    :ivar max_buffer_size: Maximum number of pending bytes, or None for no limit.
+    :type max_buffer_size: int or None
+    :ivar metrics: Receive statistics.
+    :type metrics: GrowcubeReceiveMetrics
+
+    :ivar _buffer: Buffer holding received, not yet consumed, data.
+    :type _buffer: GrowcubeReceiveBuffer
+    :ivar _header: Stream position of the header of the current frame, or -1 if no header is found yet.
+    :type _header: int
+    :ivar _delimiters: Stream positions of the delimiters found so far for the current frame.
+    :type _delimiters: list[int]
+    :ivar _search: Stream position where the search for the next header or delimiter continues.
+    :type _search: int
+    """
+
+    HEADER = GrowcubeMessage.HEADER.encode('ascii')
+    DELIMITER = GrowcubeMessage.DELIMITER.encode('ascii')
+    DEFAULT_MAX_FRAME_SIZE = 1024
+    DEFAULT_MAX_BUFFER_SIZE = 65536
+
+    def __init__(self, data: bytes = b'', buffer: Optional[GrowcubeReceiveBuffer] = None, resync: bool = False,
+                 max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+                 max_buffer_size: Optional[int] = DEFAULT_MAX_BUFFER_SIZE):
+        """
+        GrowcubeFrameScanner constructor
+
+        :param data: Optional initial data.
+        :type data: bytes
+        :param buffer: Optional receive buffer to use.
+        :type buffer: GrowcubeReceiveBuffer or None
+        :param resync: Skip malformed frames instead of raising ValueError.
+        :type resync: bool
+        :param max_frame_size: Longest accepted frame, in bytes.
+        :type max_frame_size: int
+        :param max_buffer_size: Maximum number of pending bytes, or None for no limit.
+                                Should be larger than max_frame_size.
+        :type max_buffer_size: int or None
+        """
+        self.resync = resync
+        self.max_frame_size = max_frame_size
+        self.max_buffer_size = max_buffer_size
+        self.metrics = GrowcubeReceiveMetrics()
+        self._buffer = buffer if buffer is not None else GrowcubeReceiveBuffer()
+        self._header = -1
+        self._delimiters = []
+        self._search = self._buffer.read_position
+        if data:
+            self.feed(data)
+
+    @property
+    def buffer(self) -> GrowcubeReceiveBuffer:
+        """
+        The receive buffer
+
+        :return: The receive buffer.
+        :rtype: GrowcubeReceiveBuffer
+        """
+        return self._buffer
+
+    @property
+    def offset(self) -> int:
+        """
+        Stream position of the first non-consumed byte
+
+        :return: Stream position of the first non-consumed byte.
+        :rtype: int
+        """
+        return self._buffer.read_position
+
+    @property
+    def header_index(self) -> int:
+        """
+        Stream position of the header of the frame currently being scanned
+
+        :return: Stream position of the header, or -1 if no header has been found.
+        :rtype: int
+        """
+        return self._header
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of received bytes that are not yet consumed
+
+        :return: Number of pending bytes.
+        :rtype: int
+        """
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> None:
+        """
+        Add received data to the scanner.
+
+        :param data: The received data.
+        :type data: bytes
+        """
+        buffer = self._buffer
+        limit = self.max_buffer_size
+        if limit is not None and len(buffer) + len(data) > limit:
+            # Drop the pending data, and the start of the new data if it alone is too much
+            discarded = len(buffer)
+            if len(data) > limit:
+                discarded += len(data) - limit
+                data = data[len(data) - limit:]
+            _LOGGER.debug("Receive buffer overflow, discarding %i bytes", discarded)
+            self.metrics.overflows += 1
+            self.metrics.discarded += discarded
+            buffer.consume(buffer.write_position)
+            self._header = -1
+            self._delimiters.clear()
+            self._search = buffer.read_position
+        buffer.append(data)
+
+    def next_message(self) -> Optional[GrowcubeMessage]:
+        """
+        Extract the next complete message from the buffer.
+
+        :return: The next complete message, or None if no complete message is available.
+        :rtype: GrowcubeMessage or None
+        :raises ValueError: If the frame has an invalid payload length or command, and resync is not set.
+                            The frame is discarded, the next call continues with the data after it.
+        """
+        buffer = self._buffer
+        delimiters = self._delimiters
+        while True:
+            if self._header < 0:
+                header = buffer.find(self.HEADER, self._search)
+                if header < 0:
+                    # Keep a possibly incomplete header at the end of the buffer
+                    self._search = max(self._search, buffer.write_position - len(self.HEADER) + 1)
+                    self._discard(self._search)
+                    return None
+                # Discard any junk before the header
+                self._discard(header)
+                self._header = header
+                self._search = header + len(self.HEADER)
+
+            start = self._header
+            needed = 2 if self.resync else 3
+            while len(delimiters) < needed:
+                index = buffer.find(self.DELIMITER, self._search)
+                if index < 0:
+                    self._search = buffer.write_position
+                    if self._search - start > self.max_frame_size:
+                        self._skip_frame("frame too long", overflow=True)
+                        break
+                    return None
+                delimiters.append(index)
+                self._search = index + 1
+            if len(delimiters) < needed:
+                continue
+
+            if self.resync:
+                # The frame ends at the delimiter following the payload
+                if len(delimiters) == 2:
+                    try:
+                        length = int(buffer.read(delimiters[0] + 1, delimiters[1]))
+                    except ValueError:
+                        self._skip_frame("invalid payload length")
+                        continue
+                    if length < 0:
+                        self._skip_frame("invalid payload length")
+                        continue
+                    if delimiters[1] + 1 + length - start >= self.max_frame_size:
+                        self._skip_frame("frame too long", overflow=True)
+                        continue
+                    # Remember the end position while waiting for the rest of the frame
+                    delimiters.append(delimiters[1] + 1 + length)
+                end = delimiters[2]
+                if end >= buffer.write_position:
+                    return None
+                if buffer.find(self.DELIMITER, end) != end:
+                    self._skip_frame("invalid end delimiter")
+                    continue
+                self._search = end + 1
+            elif delimiters[2] + 1 - start > self.max_frame_size:
+                self._skip_frame("frame too long", overflow=True)
+                continue
+
+            data = buffer.read(start, delimiters[2] + 1)
+            first, second, third = (index - start for index in delimiters)
+            if not self.resync:
+                # Already checked in resync mode
+                try:
+                    int(data[first + 1:second])
+                except ValueError:
+                    self._reject_frame('Invalid payload length')
+            try:
+                command = int(data[len(self.HEADER):first])
+            except ValueError:
+                if self.resync:
+                    self._skip_frame("invalid command")
+                    continue
+                self._reject_frame('Invalid command')
+            try:
+                payload = data[second + 1:third].decode('ascii')
+            except UnicodeDecodeError:
+                if self.resync:
+                    self._skip_frame("invalid payload")
+                    continue
+                self._reject_frame('Invalid payload')
+
+            buffer.consume(self._search)
+            self._header = -1
+            delimiters.clear()
+            self.metrics.frames += 1
+            return GrowcubeMessage(command, payload, data)
+
+    def _discard(self, position: int) -> None:
+        """
+        Discard the data before a stream position, counting the discarded bytes
+        """
+        discarded = position - self._buffer.read_position
+        if discarded > 0:
+            self.metrics.discarded += discarded
+            self._buffer.consume(position)
+
+    def _reject_frame(self, reason: str) -> None:
+        """
+        Discard a malformed frame and raise ValueError, so the next call continues after the frame
+        """
+        self.metrics.errors += 1
+        self._discard(self._search)
+        self._header = -1
+        self._delimiters.clear()
+        raise ValueError(reason)
+
+    def _skip_frame(self, reason: str, overflow: bool = False) -> None:
+        """
+        Skip a malformed or too long frame, continuing the search for a header after the start of the frame
+        """
+        _LOGGER.debug("Skipping frame: %s", reason)
+        if overflow:
+            self.metrics.overflows += 1
+        else:
+            self.metrics.errors += 1
+        self._search = self._header + 1
+        self._header = -1
+        self._delimiters.clear()
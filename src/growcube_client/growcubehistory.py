@@ -0,0 +1,268 @@
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - NumPy is optional
+    numpy = None
+
+from .growcubeenums import Channel
+from .growcubereport import GrowcubeReport, MoistureHumidityStateGrowcubeReport
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+
+class GrowcubeSeries:
+    """
+    Append-only columnar time series of moisture, humidity and temperature readings for one channel.
+
+    Each column is an ``array.array``, so a sample takes 14 bytes, about a fifth of a retained report object.
+    Timestamps must be added in non-decreasing order, window queries use binary search.
+
+    :cvar COLUMNS: Names and array type codes of the columns.
+    :vartype COLUMNS: tuple[tuple[str, str], ...]
+
+    :ivar timestamps: Timestamps, seconds since the epoch.
+    :type timestamps: array.array
+    :ivar moisture: Moisture values, %.
+    :type moisture: array.array
+    :ivar humidity: Humidity values, %.
+    :type humidity: array.array
+    :ivar temperature: Temperature values, °C.
+    :type temperature: array.array
+    """
+
+    COLUMNS = (('timestamps', 'd'), ('moisture', 'h'), ('humidity', 'h'), ('temperature', 'h'))
+
+    def __init__(self):
+        """
+        GrowcubeSeries constructor
+        """
+        self.timestamps = array('d')
+        self.moisture = array('h')
+        self.humidity = array('h')
+        self.temperature = array('h')
+
+    def __len__(self) -> int:
+        """
+        Number of samples
+
+        :return: Number of samples.
+        :rtype: int
+        """
+        return len(self.timestamps)
+
+    def __iter__(self) -> Iterator[Tuple[float, int, int, int]]:
+        """
+        Iterate over the samples
+
+        :return: An iterator of (timestamp, moisture, humidity, temperature) tuples.
+        :rtype: Iterator[Tuple[float, int, int, int]]
+        """
+        return zip(self.timestamps, self.moisture, self.humidity, self.temperature)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes used by the samples
+
+        :return: Number of bytes.
+        :rtype: int
+        """
+        return sum(len(column) * column.itemsize for column in self._columns())
+
+    def append(self, timestamp: float, moisture: int, humidity: int, temperature: int) -> None:
+        """
+        Append a sample.
+
+        :param timestamp: Timestamp, seconds since the epoch.
+        :type timestamp: float
+        :param moisture: Moisture value, %.
+        :type moisture: int
+        :param humidity: Humidity value, %.
+        :type humidity: int
+        :param temperature: Temperature value, °C.
+        :type temperature: int
+        :raises ValueError: If the timestamp is older than the last sample.
+        """
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            raise ValueError('Timestamps must be added in non-decreasing order')
+        count = len(self.timestamps)
+        try:
+            self.timestamps.append(timestamp)
+            self.moisture.append(moisture)
+            self.humidity.append(humidity)
+            self.temperature.append(temperature)
+        except BufferError:
+            # A column is exported, for example by to_numpy, and can't be resized. Continue in a copy
+            # and leave the exported memory to its holder.
+            for (name, typecode), column, value in zip(self.COLUMNS, self._columns(),
+                                                       (timestamp, moisture, humidity, temperature)):
+                if len(column) == count:
+                    column = array(typecode, column)
+                    column.append(value)
+                    setattr(self, name, column)
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None) -> 'GrowcubeSeries':
+        """
+        Get the samples within a time window.
+
+        :param start: First timestamp to include, or None to start at the first sample.
+        :type start: float or None
+        :param end: Last timestamp to include, or None to end at the last sample.
+        :type end: float or None
+        :return: A new series with the samples in the window.
+        :rtype: GrowcubeSeries
+        """
+        first, last = self._range(start, end)
+        result = GrowcubeSeries()
+        for (name, _), column in zip(self.COLUMNS, self._columns()):
+            setattr(result, name, column[first:last])
+        return result
+
+    def downsample(self, interval: float, start: Optional[float] = None,
+                   end: Optional[float] = None) -> 'GrowcubeSeries':
+        """
+        Get the average of the samples in each interval.
+
+        :param interval: Interval length in seconds.
+        :type interval: float
+        :param start: First timestamp to include, or None to start at the first sample.
+        :type start: float or None
+        :param end: Last timestamp to include, or None to end at the last sample.
+        :type end: float or None
+        :return: A new series with one sample per non-empty interval, timestamped at the interval start.
+        :rtype: GrowcubeSeries
+        """
+        if interval <= 0:
+            raise ValueError('interval must be positive')
+        first, last = self._range(start, end)
+        result = GrowcubeSeries()
+        index = first
+        while index < last:
+            bucket = self.timestamps[index] - self.timestamps[index] % interval
+            bucket_end = min(bisect_left(self.timestamps, bucket + interval, index, last), last)
+            count = bucket_end - index
+            result.append(bucket,
+                          round(sum(self.moisture[index:bucket_end]) / count),
+                          round(sum(self.humidity[index:bucket_end]) / count),
+                          round(sum(self.temperature[index:bucket_end]) / count))
+            index = bucket_end
+        return result
+
+    def to_numpy(self) -> Dict[str, 'numpy.ndarray']:
+        """
+        Export the columns as NumPy arrays without copying.
+        The arrays share memory with the series until the next sample is appended, the series then
+        continues in a copy and the arrays keep the samples at the time of the export.
+
+        :return: NumPy arrays, keyed by column name.
+        :rtype: dict[str, numpy.ndarray]
+        :raises ImportError: If NumPy is not installed.
+        """
+        if numpy is None:
+            raise ImportError('NumPy is required for to_numpy')
+        return {name: numpy.frombuffer(column, dtype=column.typecode)
+                for (name, _), column in zip(self.COLUMNS, self._columns())}
+
+    def _columns(self) -> List[array]:
+        """
+        The columns, in COLUMNS order
+        """
+        return [self.timestamps, self.moisture, self.humidity, self.temperature]
+
+    def _range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """
+        Index range of the samples within a time window
+        """
+        first = 0 if start is None else bisect_left(self.timestamps, start)
+        last = len(self.timestamps) if end is None else bisect_right(self.timestamps, end)
+        return first, max(first, last)
+
+
+class GrowcubeHistory:
+    """
+    Time series history of moisture, humidity and temperature readings for many devices.
+
+    Readings are stored per device and channel in a GrowcubeSeries. The record method has the same
+    signature as a GrowcubeFleet message callback, so a history can be added to a fleet directly.
+
+    :ivar _series: The series, keyed by device and channel.
+    :type _series: dict[tuple[str, Channel], GrowcubeSeries]
+    """
+
+    def __init__(self):
+        """
+        GrowcubeHistory constructor
+        """
+        self._series: Dict[Tuple[str, Channel], GrowcubeSeries] = {}
+
+    def __len__(self) -> int:
+        """
+        Total number of samples
+
+        :return: Number of samples.
+        :rtype: int
+        """
+        return sum(len(series) for series in self._series.values())
+
+    @property
+    def keys(self) -> List[Tuple[str, Channel]]:
+        """
+        Devices and channels with samples
+
+        :return: List of (device, channel) tuples.
+        :rtype: list[tuple[str, Channel]]
+        """
+        return list(self._series)
+
+    def series(self, device: str, channel: Channel) -> GrowcubeSeries:
+        """
+        Get the series for a device and channel, creating it if needed.
+
+        :param device: The device, for example host name or device ID.
+        :type device: str
+        :param channel: Channel number 0-3.
+        :type channel: Channel
+        :return: The series.
+        :rtype: GrowcubeSeries
+        """
+        key = (device, Channel(channel))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = GrowcubeSeries()
+        return series
+
+    def record(self, device: str, report: GrowcubeReport, timestamp: Optional[float] = None) -> bool:
+        """
+        Record a report. Reports other than MoistureHumidityStateGrowcubeReport are ignored.
+
+        :param device: The device, for example host name or device ID.
+        :type device: str
+        :param report: The received report.
+        :type report: GrowcubeReport
+        :param timestamp: Timestamp, seconds since the epoch, or None to use the current time.
+                          A timestamp older than the last sample, for example after the clock has been set
+                          back, is replaced by the time of the last sample.
+        :type timestamp: float or None
+        :return: True if the report was recorded, otherwise False.
+        :rtype: bool
+        """
+        if not isinstance(report, MoistureHumidityStateGrowcubeReport):
+            return False
+        series = self.series(device, report.channel)
+        if timestamp is None:
+            timestamp = time.time()
+        if series.timestamps and timestamp < series.timestamps[-1]:
+            # Never raise from a report callback, that would close the connection
+            timestamp = series.timestamps[-1]
+        series.append(timestamp, report.moisture, report.humidity, report.temperature)
+        return True
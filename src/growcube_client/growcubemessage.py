@@ -86,50 +86,24 @@ class GrowcubeMessage:
         Tries to construct a complete GrowcubeMessage from the data and returns
         the index of the next non-consumed data in the buffer, together with the message.
         Converts a byte array to a GrowcubeMessage instance.
+        This is a one-shot helper, use GrowcubeFrameScanner to parse a stream of data.
 
         :param data: The current data buffer.
         :type data: bytearray
         :return: The index of the next non-consumed data in the buffer, together with the message,
                  or the next found start index and None if the message is incomplete.
         :rtype: Tuple[int, GrowcubeMessage] or Tuple[int, None]
+        :raises ValueError: If the message has an invalid payload length or command.
         """
-        message_str = data.decode('ascii')
-
-        start_index = message_str.find(GrowcubeMessage.HEADER)
-        if start_index == -1:
-            # Header not found, return
-            return 0, None
-
-        # Move to start of message
-        message_str = message_str[start_index:]
-
-        parts = message_str[len(GrowcubeMessage.HEADER):].split(GrowcubeMessage.DELIMITER)
-        if len(parts) < 3:
-            # Still don't have the complete message
-            return start_index, None
-
-        try:
-            payload_len = int(parts[1])
-        except ValueError:
-            raise ValueError('Invalid payload length')
-
-        payload = parts[2]
-        payload_length = len(GrowcubeMessage.EMPTY_MESSAGE) + len(str(payload_len)) + len(payload)
-        consumed_index = start_index + payload_length
-        if len(data) < consumed_index:
-            # Still incomplete
-            return start_index, None
-
-        if not message_str[payload_length - 1] == GrowcubeMessage.DELIMITER:
-            raise ValueError('Invalid message end delimiter')
-
-        try:
-            # Parse command value
-            command = int(parts[0])
-        except ValueError:
-            raise ValueError('Invalid command')
-
-        return consumed_index, GrowcubeMessage(command, payload, data[start_index:consumed_index])
+        from .growcubeframer import GrowcubeFrameScanner, GrowcubeReceiveBuffer
+
+        # No frame in the data can be longer than the data itself, so nothing is discarded as too long
+        scanner = GrowcubeFrameScanner(data, GrowcubeReceiveBuffer(0), max_frame_size=len(data), max_buffer_size=None)
+        message = scanner.next_message()
+        if message is not None:
+            return scanner.offset, message
+        # Return the start index of an incomplete message, or 0 if no header was found
+        return max(scanner.header_index, 0), None
 
     @staticmethod
     def to_bytes(command: int, data: str) -> bytes:
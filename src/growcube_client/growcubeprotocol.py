@@ -5,9 +5,14 @@ _LOGGER = logging.getLogger(__name__)
 
 from typing import (
     Callable,
+    List,
+    Optional,
 )
 
+from .growcubeenums import CaptureDirection
 from .growcubemessage import GrowcubeMessage
+from .growcubeframer import GrowcubeFrameScanner, GrowcubeReceiveMetrics
+from .growcubecapture import GrowcubeCaptureWriter
 
 """
 Growcube client library
@@ -18,6 +23,33 @@ Date: 2023-09-05
 """
 
 
+class GrowcubeSendMetrics:
+    """
+    Send queue statistics for a GrowcubeProtocol
+
+    :ivar queued: Number of messages added to the send queue.
+    :type queued: int
+    :ivar writes: Number of writes to the transport.
+    :type writes: int
+    :ivar written: Number of messages written to the transport.
+    :type written: int
+    :ivar dropped: Number of queued messages dropped because the connection was lost.
+    :type dropped: int
+    :ivar max_depth: Highest number of messages waiting in the send queue.
+    :type max_depth: int
+    """
+
+    def __init__(self):
+        """
+        GrowcubeSendMetrics constructor
+        """
+        self.queued = 0
+        self.writes = 0
+        self.written = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+
 class GrowcubeProtocol(asyncio.Protocol):
     """
     Implements a custom asyncio Protocol for communication with a Growcube device.
@@ -35,19 +67,45 @@ class GrowcubeProtocol(asyncio.Protocol):
 
     :ivar transport: The transport instance associated with the protocol.
     :type transport: asyncio.Transport or None
-    :ivar _data: A buffer to accumulate received data.
-    :type _data: bytearray
+    :ivar _scanner: Frame scanner accumulating received data.
+    :type _scanner: GrowcubeFrameScanner
     :ivar _on_connected: Callback function for connection established event.
     :type _on_connected: Callable[[str], None] or None
     :ivar _on_message: Callback function for message received event.
     :type _on_message: Callable[[str], None] or None
     :ivar _on_connection_lost: Callback function for connection lost event.
     :type _on_connection_lost: Callable[[], None] or None
+    :ivar coalesce_writes: Queue sent messages and write them together at the end of the loop iteration.
+    :type coalesce_writes: bool
+    :ivar send_interval: Minimum time in seconds between writes when coalescing writes.
+    :type send_interval: float
+    :ivar max_batch: Maximum number of messages per write when coalescing writes, or None for no limit.
+    :type max_batch: int or None
+    :ivar send_metrics: Send queue statistics.
+    :type send_metrics: GrowcubeSendMetrics
+    :ivar capture: Writer that raw received and sent data is recorded to, or None.
+    :type capture: GrowcubeCaptureWriter or None
+    :ivar _last_activity: Event loop time of the last sent or received data.
+    :type _last_activity: float
+    :ivar _timeout_handle: Handle of the idle timeout timer, or None.
+    :type _timeout_handle: asyncio.TimerHandle or None
+    :ivar _send_queue: Messages waiting to be written.
+    :type _send_queue: list[bytes]
+    :ivar _send_handle: Handle of the scheduled write, or None.
+    :type _send_handle: asyncio.Handle or None
+    :ivar _next_send: Event loop time when the next write is allowed.
+    :type _next_send: float
     """
 
     def __init__(self, on_connected: Callable[[], None],
                  on_message: Callable[[GrowcubeMessage], None],
-                 on_connection_lost: Callable[[], None]):
+                 on_connection_lost: Callable[[], None],
+                 coalesce_writes: bool = False,
+                 send_interval: float = 0.0,
+                 max_batch: Optional[int] = None,
+                 capture: Optional[GrowcubeCaptureWriter] = None,
+                 max_frame_size: int = GrowcubeFrameScanner.DEFAULT_MAX_FRAME_SIZE,
+                 max_buffer_size: Optional[int] = GrowcubeFrameScanner.DEFAULT_MAX_BUFFER_SIZE):
         """
         Initializes a new instance of the GrowcubeProtocol.
 
@@ -57,15 +115,58 @@ class GrowcubeProtocol(asyncio.Protocol):
         :type on_message: Callable[[GrowcubeMessage], None]
         :param on_connection_lost: A callback function to be executed when the connection is lost.
         :type on_connection_lost: Callable[[], None]
+        :param coalesce_writes: Queue sent messages and write them together at the end of the loop iteration.
+        :type coalesce_writes: bool
+        :param send_interval: Minimum time in seconds between writes when coalescing writes.
+        :type send_interval: float
+        :param max_batch: Maximum number of messages per write when coalescing writes, or None for no limit.
+                          Use 1 together with send_interval if the device drops back-to-back messages.
+        :type max_batch: int or None
+        :param capture: Writer that raw received and sent data is recorded to, or None to not record.
+        :type capture: GrowcubeCaptureWriter or None
+        :param max_frame_size: Longest accepted frame, in bytes, longer frames are discarded.
+        :type max_frame_size: int
+        :param max_buffer_size: Maximum number of pending received bytes, or None for no limit.
+        :type max_buffer_size: int or None
         """
         self.transport = None
-        self._data = bytearray()
+        self._scanner = GrowcubeFrameScanner(resync=True, max_frame_size=max_frame_size,
+                                             max_buffer_size=max_buffer_size)
         self._on_connected = on_connected
         self._on_message = on_message
         self._on_connection_lost = on_connection_lost
         self._loop = asyncio.get_event_loop()
         self._timeout_handle = None
         self._timeout = 30
+        self._last_activity = self._loop.time()
+        self.coalesce_writes = coalesce_writes
+        self.send_interval = send_interval
+        self.max_batch = max_batch
+        self.send_metrics = GrowcubeSendMetrics()
+        self.capture = capture
+        self._send_queue: List[bytes] = []
+        self._send_handle: Optional[asyncio.Handle] = None
+        self._next_send = 0.0
+
+    @property
+    def receive_metrics(self) -> GrowcubeReceiveMetrics:
+        """
+        Receive statistics of the connection, malformed frames are counted and skipped
+
+        :return: Receive statistics.
+        :rtype: GrowcubeReceiveMetrics
+        """
+        return self._scanner.metrics
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of messages waiting in the send queue
+
+        :return: Number of queued messages.
+        :rtype: int
+        """
+        return len(self._send_queue)
 
     def connection_made(self, transport) -> None:
         """
@@ -88,26 +189,41 @@ class GrowcubeProtocol(asyncio.Protocol):
         :type data: bytes
         """
         self._reset_timeout()
+        if self.capture is not None:
+            self.capture.record(CaptureDirection.Received, data)
         # Remove all b'\x00' characters, used for padding
-        data = bytearray(filter(lambda c: c != 0, data))
-        # add the data to the message buffer
-        self._data += data
+        data = data.replace(b'\x00', b'')
+        scanner = self._scanner
+        limit = scanner.max_buffer_size
+        if limit is None or len(data) + scanner.pending <= limit:
+            scanner.feed(data)
+            self._dispatch_messages()
+            return
+        # Feed large chunks in parts that fit the buffer, so valid frames are not discarded.
+        # The parts are views of the chunk, so the rest of the chunk is not copied for each part.
+        with memoryview(data) as view:
+            offset = 0
+            while len(data) - offset + scanner.pending > limit:
+                room = limit - scanner.pending
+                if room <= 0:
+                    break
+                scanner.feed(view[offset:offset + room])
+                offset += room
+                self._dispatch_messages()
+            scanner.feed(view[offset:])
+        self._dispatch_messages()
 
+    def _dispatch_messages(self) -> None:
+        """
+        Pass all complete messages to the message callback
+        """
         while True:
-            # Check for a complete message
-            new_index, message = GrowcubeMessage.from_bytes(self._data)
-
-            # Discard any junk before the next header (new_index can be > 0 even with no message)
-            if new_index > 0 and message is None:
-                self._data = self._data[new_index:]
-
+            # Check for a complete message, junk and malformed frames are skipped by the scanner
+            message = self._scanner.next_message()
             if message is None:
-                break;
+                break
 
-            # Consume this message
-            self._data = self._data[new_index:]
-
-            _LOGGER.debug(f"message: {message.command} - {message.payload}")
+            _LOGGER.debug("message: %s - %s", message.command, message.payload)
             if self._on_message:
                 self._on_message(message)
 
@@ -118,8 +234,53 @@ class GrowcubeProtocol(asyncio.Protocol):
         :param message: The message to send.
         :type message: bytes
         """
-        self.transport.write(message)
+        if not self.coalesce_writes:
+            self.transport.write(message)
+            if self.capture is not None:
+                self.capture.record(CaptureDirection.Sent, message)
+            self._reset_timeout()
+            return
+        queue = self._send_queue
+        queue.append(message)
+        metrics = self.send_metrics
+        metrics.queued += 1
+        if len(queue) > metrics.max_depth:
+            metrics.max_depth = len(queue)
+        if self._send_handle is None:
+            self._schedule_send()
+
+    def _schedule_send(self) -> None:
+        """
+        Schedule writing the send queue, at the end of this loop iteration or when pacing allows
+        """
+        if self._loop.time() >= self._next_send:
+            self._send_handle = self._loop.call_soon(self._send_queued)
+        else:
+            self._send_handle = self._loop.call_at(self._next_send, self._send_queued)
+
+    def _send_queued(self) -> None:
+        """
+        Write queued messages to the transport in a single call
+        """
+        self._send_handle = None
+        queue = self._send_queue
+        if not queue or self.transport is None:
+            return
+        if self.max_batch is None or len(queue) <= self.max_batch:
+            batch = queue
+            self._send_queue = []
+        else:
+            batch = queue[:self.max_batch]
+            del queue[:self.max_batch]
+        self.transport.writelines(batch)
+        if self.capture is not None:
+            self.capture.record(CaptureDirection.Sent, b''.join(batch))
+        self.send_metrics.writes += 1
+        self.send_metrics.written += len(batch)
+        self._next_send = self._loop.time() + self.send_interval
         self._reset_timeout()
+        if self._send_queue:
+            self._schedule_send()
 
     def connection_lost(self, exc: Exception) -> None:
         """
@@ -131,17 +292,32 @@ class GrowcubeProtocol(asyncio.Protocol):
         _LOGGER.debug(f"Connection lost, reason: {exc}")
         if self._timeout_handle:
             self._timeout_handle.cancel()
+            self._timeout_handle = None
+        if self._send_handle:
+            self._send_handle.cancel()
+            self._send_handle = None
+        self.send_metrics.dropped += len(self._send_queue)
+        self._send_queue = []
         if self._on_connection_lost:
             self._on_connection_lost()
 
     def _reset_timeout(self) -> None:
         """
-        Resets the timeout
+        Resets the timeout. Only the time of the activity is recorded, the timer is armed
+        if it is not running and moves the deadline forward when it expires.
         """
-        if self._timeout_handle:
-            self._timeout_handle.cancel()
-        self._timeout_handle = self._loop.call_later(self._timeout, self._check_timeout)
+        self._last_activity = self._loop.time()
+        if self._timeout_handle is None:
+            self._timeout_handle = self._loop.call_at(self._last_activity + self._timeout, self._check_timeout)
 
     def _check_timeout(self) -> None:
+        """
+        Aborts the connection if there has been no activity within the timeout, otherwise re-arms the timer
+        """
+        deadline = self._last_activity + self._timeout
+        if self._loop.time() < deadline:
+            self._timeout_handle = self._loop.call_at(deadline, self._check_timeout)
+            return
+        self._timeout_handle = None
         _LOGGER.debug("Connection timed out.")
         self.transport.abort()
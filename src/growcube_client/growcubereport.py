@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple, Type
 
 from .growcubeenums import Channel
 
@@ -20,10 +20,14 @@ class GrowcubeReport:
     :vartype Response: dict[int, str]
     :cvar CMD_INNER: The inner command delimiter.
     :vartype CMD_INNER: str
-
-    :ivar _command: The report command.
-    :type _command: str
+    :cvar ReportClasses: A dictionary mapping command values to registered report classes.
+    :vartype ReportClasses: dict[int, type]
+    :cvar _command: The report command name, set when the class is registered. Report classes that are
+                    not registered, like UnknownGrowcubeReport, declare a _command slot instead.
+    :vartype _command: str or None
     """
+    __slots__ = ()
+
     Response = {
         20: "RepWaterStateCmd",
         21: "RepSTHSateCmd",
@@ -43,18 +47,24 @@ class GrowcubeReport:
         35: "RepCurveEndFlagCmd"
     }
     CMD_INNER = "@"
+    ReportClasses: Dict[int, Type['GrowcubeReport']] = {}
+    _command: Optional[str] = None
 
     def __init__(self, command: int):
         """
-        GrowcubeReport constructor
+        GrowcubeReport constructor, must be called by all report classes
 
         :param command: Command value.
         :type command: int
+        :raises ValueError: If the class is registered for another command value.
         """
-        if command in self.Response:
-            self._command = self.Response[command]
-        else:
-            self._command = f"Unknown response: {command}"
+        name = GrowcubeReport.get_command_name(command)
+        if name == type(self)._command:
+            return
+        try:
+            self._command = name
+        except AttributeError:
+            raise ValueError(f"{type(self).__name__} is registered for {type(self)._command}, not {name}")
 
     @property
     def command(self) -> str:
@@ -64,7 +74,11 @@ class GrowcubeReport:
         :return: Command value.
         :rtype: str
         """
-        return self._command
+        command = type(self)._command
+        if not isinstance(command, str):
+            # Not registered, the name is in the _command slot
+            return self._command
+        return command
 
     def get_description(self) -> str:
         """
@@ -75,6 +89,53 @@ class GrowcubeReport:
         """
         return f"command {self._command}"
 
+    def __str__(self) -> str:
+        """
+        Get a human-readable description of the report. This allows a report to be passed
+        as a logging argument, the description is then only created if the record is emitted.
+
+        :return: A human-readable description of the report.
+        :rtype: str
+        """
+        return self.get_description()
+
+    @staticmethod
+    def get_command_name(command: int) -> str:
+        """
+        Get the report name for a command value
+
+        :param command: Command value.
+        :type command: int
+        :return: The report name.
+        :rtype: str
+        """
+        if command in GrowcubeReport.Response:
+            return GrowcubeReport.Response[command]
+        return f"Unknown response: {command}"
+
+    @staticmethod
+    def register(command: int, name: Optional[str] = None) -> Callable[[Type['GrowcubeReport']], Type['GrowcubeReport']]:
+        """
+        Class decorator that registers a report class for a command value.
+        The class constructor is called with the message payload, and must call GrowcubeReport.__init__
+        with the command value. The command name is stored on the class, a report class that is not
+        registered must declare a _command slot.
+
+        :param command: Command value.
+        :type command: int
+        :param name: Report name, used to add command values not present in Response.
+        :type name: str or None
+        :return: The class decorator.
+        :rtype: Callable[[type], type]
+        """
+        def decorator(report_class: Type['GrowcubeReport']) -> Type['GrowcubeReport']:
+            if name is not None:
+                GrowcubeReport.Response[command] = name
+            GrowcubeReport.ReportClasses[command] = report_class
+            report_class._command = GrowcubeReport.get_command_name(command)
+            return report_class
+        return decorator
+
     @staticmethod
     def get_report(message) -> Optional['GrowcubeReport']:
         """
@@ -87,40 +148,13 @@ class GrowcubeReport:
         """
         if message is None:
             return None
-        if message.command == 20:
-            return WaterStateGrowcubeReport(message.payload)
-        elif message.command == 21:
-            return MoistureHumidityStateGrowcubeReport(message.payload)
-        elif message.command == 23:
-            return AutoWaterGrowcubeReport(message.payload)
-        elif message.command == 24:
-            return DeviceVersionGrowcubeReport(message.payload)
-        elif message.command == 25:
-            return EraseDataGrowcubeReport(message.payload)
-        elif message.command == 26:
-            return PumpOpenGrowcubeReport(message.payload)
-        elif message.command == 27:
-            return PumpCloseGrowcubeReport(message.payload)
-        elif message.command == 28:
-            return CheckSensorGrowcubeReport(message.payload)
-        elif message.command == 29:
-            return CheckOutletBlockedGrowcubeReport(message.payload)
-        elif message.command == 30:
-            return CheckSensorNotConnectedGrowcubeReport(message.payload)
-        elif message.command == 31:
-            return CheckWifiStateGrowcubeReport(message.payload)
-        elif message.command == 32:
-            return GrowCubeIPGrowcubeReport(message.payload)
-        elif message.command == 33:
-            return LockStateGrowcubeReport(message.payload)
-        elif message.command == 34:
-            return CheckOutletLockedGrowcubeReport(message.payload)
-        elif message.command == 35:
-            return RepCurveEndFlagGrowcubeReport(message.payload)
-        else:
+        report_class = GrowcubeReport.ReportClasses.get(message.command)
+        if report_class is None:
             return UnknownGrowcubeReport(message.command, message.payload)
+        return report_class(message.payload)
 
 
+@GrowcubeReport.register(20)
 class WaterStateGrowcubeReport(GrowcubeReport):
     """
     Response 20 - RepWaterState
@@ -130,6 +164,7 @@ class WaterStateGrowcubeReport(GrowcubeReport):
     :ivar _water_warning: Flag indicating water warning.
     :type _water_warning: bool
     """
+    __slots__ = ('_water_warning',)
 
     def __init__(self, data):
         """
@@ -161,6 +196,7 @@ class WaterStateGrowcubeReport(GrowcubeReport):
         return f"{self._command}: water_warning: {self._water_warning}"
 
 
+@GrowcubeReport.register(21)
 class MoistureHumidityStateGrowcubeReport(GrowcubeReport):
     """
     Response 21 - RepSTHSate
@@ -176,6 +212,7 @@ class MoistureHumidityStateGrowcubeReport(GrowcubeReport):
     :ivar _temperature: Temperature value.
     :type _temperature: int
     """
+    __slots__ = ('_channel', '_moisture', '_humidity', '_temperature')
 
     def __init__(self, data: str):
         """
@@ -242,6 +279,93 @@ class MoistureHumidityStateGrowcubeReport(GrowcubeReport):
                 f"temperature: {self._temperature}")
 
 
+@GrowcubeReport.register(22)
+class CurveGrowcubeReport(GrowcubeReport):
+    """
+    Response 22 - RepCurve
+
+    Reports one point of the historic moisture curve for a channel, sent in response
+    to a RequestCurveDataCommand. The end of the curve is reported with RepCurveEndFlagGrowcubeReport.
+
+    The payload layout is provisional. It is assumed to follow AutoWaterGrowcubeReport, with the moisture
+    value in place of the minute: channel@year@month@day@hour@moisture, but it has not been confirmed against
+    a device capture, and the simulator encodes the same assumption. Values are parsed by position, an empty
+    field is None so later values are not shifted. Any other layout is still available in values.
+
+    :ivar _channel: Channel number 0-3.
+    :type _channel: Channel
+    :ivar _values: The values following the channel, None for empty fields.
+    :type _values: tuple[int or None, ...]
+    """
+    __slots__ = ('_channel', '_values')
+
+    def __init__(self, data: str):
+        """
+        CurveGrowcubeReport constructor
+
+        :param data: Response data.
+        :type data: str
+        """
+        GrowcubeReport.__init__(self, 22)
+        parts = data.split(self.CMD_INNER)
+        self._channel = Channel(int(parts[0]))
+        self._values = tuple(int(part) if part else None for part in parts[1:])
+
+    @property
+    def channel(self) -> Channel:
+        """
+        Channel number 0-3
+
+        :return: Channel number 0-3.
+        :rtype: Channel
+        """
+        return self._channel
+
+    @property
+    def values(self) -> Tuple[Optional[int], ...]:
+        """
+        The values following the channel
+
+        :return: The values, None for empty fields.
+        :rtype: tuple[int or None, ...]
+        """
+        return self._values
+
+    @property
+    def timestamp(self) -> Optional[datetime]:
+        """
+        Timestamp of the curve point
+
+        :return: Timestamp, or None if the payload does not contain a complete one.
+        :rtype: datetime or None
+        """
+        fields = self._values[:4]
+        if len(fields) < 4 or None in fields:
+            return None
+        return datetime(*fields)
+
+    @property
+    def moisture(self) -> Optional[int]:
+        """
+        Moisture value of the curve point
+
+        :return: Moisture value, %, or None if the payload does not contain one.
+        :rtype: int or None
+        """
+        return self._values[4] if len(self._values) >= 5 else None
+
+    def get_description(self) -> str:
+        """
+        Get a human-readable description of the report
+
+        :return: A human-readable description of the report.
+        :rtype: str
+        """
+        values = '@'.join('' if value is None else str(value) for value in self._values)
+        return f"{self._command}: channel {self._channel}, values {values}"
+
+
+@GrowcubeReport.register(23)
 class AutoWaterGrowcubeReport(GrowcubeReport):
     """
     Response 23 - AutoWater
@@ -264,6 +388,7 @@ class AutoWaterGrowcubeReport(GrowcubeReport):
     :param data: Response data.
     :type data: str
     """
+    __slots__ = ('_channel', '_year', '_month', '_day', '_hour', '_minute')
 
     def __init__(self, data: str):
         """
@@ -272,7 +397,6 @@ class AutoWaterGrowcubeReport(GrowcubeReport):
         :param data: Response data.
         :type data: str
         """
-
         GrowcubeReport.__init__(self, 23)
         parts = data.split(self.CMD_INNER)
         self._channel = Channel(int(parts[0]))
@@ -362,6 +486,7 @@ class AutoWaterGrowcubeReport(GrowcubeReport):
         return f"{self._command}: {self._channel} - {self._year}-{self._month}-{self._day} {self._hour}:{self._minute}"
 
 
+@GrowcubeReport.register(24)
 class DeviceVersionGrowcubeReport(GrowcubeReport):
     """
     Response 24 - RepDeviceVersion
@@ -372,6 +497,8 @@ class DeviceVersionGrowcubeReport(GrowcubeReport):
     :ivar _device_id: Device ID.
     :type _device_id: str
     """
+    __slots__ = ('_version', '_device_id')
+
     def __init__(self, data: str):
         """
         DeviceVersionGrowcubeReport constructor
@@ -414,6 +541,7 @@ class DeviceVersionGrowcubeReport(GrowcubeReport):
         return f"{self._command}: version {self._version}, device_id {self._device_id}"
 
 
+@GrowcubeReport.register(25)
 class EraseDataGrowcubeReport(GrowcubeReport):
     """
     Response 25 - RepErasureData
@@ -423,6 +551,8 @@ class EraseDataGrowcubeReport(GrowcubeReport):
     :ivar _success: Indicates whether the data erasure was successful.
     :type _success: bool
     """
+    __slots__ = ('_success',)
+
     def __init__(self, data: str):
         """
         EraseDataGrowcubeReport constructor
@@ -453,6 +583,7 @@ class EraseDataGrowcubeReport(GrowcubeReport):
         return f"{self._command}: success {self._success}"
 
 
+@GrowcubeReport.register(26)
 class PumpOpenGrowcubeReport(GrowcubeReport):
     """
     Response 26 - RepPumpOpen
@@ -462,6 +593,8 @@ class PumpOpenGrowcubeReport(GrowcubeReport):
     :ivar _channel: Channel number 0-3
     :type _channel: Channel
     """
+    __slots__ = ('_channel',)
+
     def __init__(self, data):
         """
         PumpOpenGrowcubeReport constructor
@@ -492,6 +625,7 @@ class PumpOpenGrowcubeReport(GrowcubeReport):
         return f"{self._command}: channel {self._channel}"
 
 
+@GrowcubeReport.register(27)
 class PumpCloseGrowcubeReport(GrowcubeReport):
     """
     Response 27 - RepPumpClose
@@ -500,6 +634,8 @@ class PumpCloseGrowcubeReport(GrowcubeReport):
     :ivar _channel: Channel number 0-3
     :type _channel: Channel
     """
+    __slots__ = ('_channel',)
+
     def __init__(self, data):
         """
         PumpCloseGrowcubeReport constructor
@@ -530,6 +666,7 @@ class PumpCloseGrowcubeReport(GrowcubeReport):
         return f"{self._command}: channel {self._channel}"
 
 
+@GrowcubeReport.register(28)
 class CheckSensorGrowcubeReport(GrowcubeReport):
     """
     Response 28 - RepCheckSenSorNotConnected
@@ -538,6 +675,8 @@ class CheckSensorGrowcubeReport(GrowcubeReport):
     :ivar _channel: Channel number 0-3
     :type _channel: Channel
     """
+    __slots__ = ('_channel',)
+
     def __init__(self, data):
         """
         CheckSensorGrowcubeReport constructor
@@ -568,6 +707,7 @@ class CheckSensorGrowcubeReport(GrowcubeReport):
         return f"{self._command}: channel {self._channel}"
 
 
+@GrowcubeReport.register(29)
 class CheckOutletBlockedGrowcubeReport(GrowcubeReport):
     """
     Response 29 - Pump channel blocked
@@ -576,6 +716,8 @@ class CheckOutletBlockedGrowcubeReport(GrowcubeReport):
     :ivar _channel: Channel number 0-3
     :type _channel: Channel
     """
+    __slots__ = ('_channel', 'data')
+
     def __init__(self, data):
         """
         CheckOutletBlockedGrowcubeReport constructor
@@ -608,6 +750,7 @@ class CheckOutletBlockedGrowcubeReport(GrowcubeReport):
         return f"{self._command}: channel {self._channel}"
 
 
+@GrowcubeReport.register(30)
 class CheckSensorNotConnectedGrowcubeReport(GrowcubeReport):
     """
     Response 30 - RepCheckSenSorNotConnect
@@ -616,6 +759,8 @@ class CheckSensorNotConnectedGrowcubeReport(GrowcubeReport):
     :ivar _channel: Channel number 0-3
     :type _channel: Channel
     """
+    __slots__ = ('_channel',)
+
     def __init__(self, data):
         """
         CheckSensorNotConnectedGrowcubeReport constructor
@@ -646,7 +791,7 @@ class CheckSensorNotConnectedGrowcubeReport(GrowcubeReport):
         return f"{self._command}: channel {self._channel}"
 
 
-# Response 31
+@GrowcubeReport.register(31)
 class CheckWifiStateGrowcubeReport(GrowcubeReport):
     """
     Response 31 - RepWifistate
@@ -655,6 +800,8 @@ class CheckWifiStateGrowcubeReport(GrowcubeReport):
     :ivar _state: State
     :type _state: bool
     """
+    __slots__ = ('_state',)
+
     def __init__(self, data):
         """
         CheckWifiStateGrowcubeReport constructor
@@ -685,6 +832,7 @@ class CheckWifiStateGrowcubeReport(GrowcubeReport):
         return f"{self._command}: state {self._state}"
 
 
+@GrowcubeReport.register(32)
 class GrowCubeIPGrowcubeReport(GrowcubeReport):
     """
     Response 32 - RepGrowCubeIP
@@ -695,6 +843,8 @@ class GrowCubeIPGrowcubeReport(GrowcubeReport):
     :ivar _ip: IP address
     :type _ip: str
     """
+    __slots__ = ('_ip',)
+
     def __init__(self, data: str):
         """
         GrowCubeIPGrowcubeReport constructor
@@ -725,6 +875,7 @@ class GrowCubeIPGrowcubeReport(GrowcubeReport):
         return f"{self._command}: ip {self._ip}"
 
 
+@GrowcubeReport.register(33)
 class LockStateGrowcubeReport(GrowcubeReport):
     """
     Response 33 - RepLockstate
@@ -733,6 +884,8 @@ class LockStateGrowcubeReport(GrowcubeReport):
     :ivar _lock_state: Lock state
     :type _lock_state: bool
     """
+    __slots__ = ('_lock_state',)
+
     def __init__(self, data):
         """
         LockStateGrowcubeReport constructor
@@ -764,6 +917,7 @@ class LockStateGrowcubeReport(GrowcubeReport):
         return f"{self._command}: lock_state {self._lock_state}"
 
 
+@GrowcubeReport.register(34)
 class CheckOutletLockedGrowcubeReport(GrowcubeReport):
     """
     Response 34 - ReqCheckSenSorLock
@@ -772,6 +926,8 @@ class CheckOutletLockedGrowcubeReport(GrowcubeReport):
     :ivar _channel: Channel number 0-3
     :type _channel: Channel
     """
+    __slots__ = ('_channel',)
+
     def __init__(self, data):
         """
         CheckOutletLockGrowcubeReport constructor
@@ -802,14 +958,17 @@ class CheckOutletLockedGrowcubeReport(GrowcubeReport):
         return f"{self._command}: channel {self._channel}"
 
 
+@GrowcubeReport.register(35)
 class RepCurveEndFlagGrowcubeReport(GrowcubeReport):
     """
     Response 35 - RepCurveEndFlag
-    Reports the end of the water event reports stream
+    Reports the end of the curve data stream
 
     :ivar _channel: Channel number 0-3
     :type _channel: Channel
     """
+    __slots__ = ('_channel', 'data')
+
     def __init__(self, data):
         """
         RepCurveEndFlagGrowcubeReport constructor
@@ -847,6 +1006,8 @@ class UnknownGrowcubeReport(GrowcubeReport):
     UnknownGrowcubeReport
     Reports an unknown response
     """
+    __slots__ = ('_command', 'data')
+
     def __init__(self, command, data):
         """
         UnknownGrowcubeReport constructor
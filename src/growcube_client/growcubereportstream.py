@@ -0,0 +1,177 @@
+import asyncio
+import collections
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+from typing import Callable, Deque, Optional
+from .growcubeenums import OverflowPolicy
+from .growcubereport import GrowcubeReport
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+
+class GrowcubeReportStream:
+    """
+    Bounded asynchronous stream of reports, used with ``async for``.
+
+    Reports are queued by the client as they arrive. When the queue is full the overflow policy
+    decides what happens: the oldest or newest report is dropped, or reading from the device is
+    paused until the reader has consumed half of the queue.
+
+    :ivar max_size: Maximum number of queued reports.
+    :type max_size: int
+    :ivar policy: What to do when the queue is full.
+    :type policy: OverflowPolicy
+    :ivar dropped: Number of reports dropped because the queue was full.
+    :type dropped: int
+    :ivar pauses: Number of times reading from the device was paused.
+    :type pauses: int
+    :ivar _queue: The queued reports.
+    :type _queue: collections.deque
+    :ivar _waiter: Future the reader waits on while the queue is empty.
+    :type _waiter: asyncio.Future or None
+    :ivar _paused: True if reading from the device is paused by this stream.
+    :type _paused: bool
+    :ivar _closed: True if the stream is closed.
+    :type _closed: bool
+    """
+
+    def __init__(self,
+                 max_size: int = 100,
+                 policy: OverflowPolicy = OverflowPolicy.DropOldest,
+                 pause_reading: Optional[Callable[[], None]] = None,
+                 resume_reading: Optional[Callable[[], None]] = None,
+                 on_close: Optional[Callable[['GrowcubeReportStream'], None]] = None) -> None:
+        """
+        GrowcubeReportStream constructor
+
+        :param max_size: Maximum number of queued reports.
+        :type max_size: int
+        :param policy: What to do when the queue is full.
+        :type policy: OverflowPolicy
+        :param pause_reading: Function that pauses reading from the device, used by OverflowPolicy.Block.
+        :type pause_reading: Callable[[], None] or None
+        :param resume_reading: Function that resumes reading from the device, used by OverflowPolicy.Block.
+        :type resume_reading: Callable[[], None] or None
+        :param on_close: Function called when the stream is closed.
+        :type on_close: Callable[[GrowcubeReportStream], None] or None
+        """
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self.max_size = max_size
+        self.policy = policy
+        self.dropped = 0
+        self.pauses = 0
+        self._pause_reading = pause_reading
+        self._resume_reading = resume_reading
+        self._on_close = on_close
+        self._queue: Deque[GrowcubeReport] = collections.deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._paused = False
+        self._closed = False
+
+    def __len__(self) -> int:
+        """
+        Number of queued reports
+
+        :return: Number of queued reports.
+        :rtype: int
+        """
+        return len(self._queue)
+
+    @property
+    def closed(self) -> bool:
+        """
+        Closed state
+
+        :return: True if the stream is closed, otherwise False.
+        :rtype: bool
+        """
+        return self._closed
+
+    def put(self, report: GrowcubeReport) -> None:
+        """
+        Queue a received report.
+
+        :param report: The received report.
+        :type report: GrowcubeReport
+        """
+        if self._closed:
+            return
+        queue = self._queue
+        if len(queue) >= self.max_size:
+            if self.policy == OverflowPolicy.DropNewest:
+                self.dropped += 1
+                return
+            if self.policy == OverflowPolicy.DropOldest:
+                queue.popleft()
+                self.dropped += 1
+        # With OverflowPolicy.Block, reports already read from the device are always queued
+        queue.append(report)
+        if self.policy == OverflowPolicy.Block and not self._paused and len(queue) >= self.max_size:
+            self._paused = True
+            self.pauses += 1
+            _LOGGER.debug("Report stream full, pausing reading")
+            if self._pause_reading:
+                self._pause_reading()
+        self._wake_reader()
+
+    def close(self) -> None:
+        """
+        Close the stream. The reader gets the reports already queued, and then the iteration stops.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._resume()
+        self._wake_reader()
+        if self._on_close:
+            self._on_close(self)
+
+    def __aiter__(self) -> 'GrowcubeReportStream':
+        return self
+
+    async def __anext__(self) -> GrowcubeReport:
+        queue = self._queue
+        while not queue:
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        report = queue.popleft()
+        if self._paused and len(queue) <= self.max_size // 2:
+            self._resume()
+        return report
+
+    async def __aenter__(self) -> 'GrowcubeReportStream':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _resume(self) -> None:
+        """
+        Resume reading from the device if it was paused by this stream
+        """
+        if self._paused:
+            self._paused = False
+            _LOGGER.debug("Report stream drained, resuming reading")
+            if self._resume_reading:
+                self._resume_reading()
+
+    def _wake_reader(self) -> None:
+        """
+        Wake up a reader waiting for a report
+        """
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
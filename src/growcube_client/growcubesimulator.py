@@ -0,0 +1,352 @@
+import asyncio
+import datetime
+import ipaddress
+import logging
+import random
+
+_LOGGER = logging.getLogger(__name__)
+
+from typing import List, Optional, Set
+from .growcubeenums import Channel
+from .growcubecommand import GrowcubeCommand
+from .growcubeframer import GrowcubeFrameScanner
+from .growcubemessage import GrowcubeMessage
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+
+class GrowcubeSimulator:
+    """
+    Simulated Growcube device, an asyncio server speaking the Growcube protocol.
+
+    On connection the simulator sends the version, water state and lock state reports, followed by
+    moisture reports for all channels every report_interval seconds. Water, close pump and curve data
+    commands are answered the way the device does. Reports are padded with NUL characters to
+    frame_size bytes, and written in fragment_size chunks if set, to exercise the receive path.
+
+    :cvar DEFAULT_FRAME_SIZE: Default size that reports are padded to, as sent by the device.
+    :vartype DEFAULT_FRAME_SIZE: int
+
+    :ivar host: Address the simulator listens on.
+    :type host: str
+    :ivar device_id: Device ID sent in the version report.
+    :type device_id: str
+    :ivar version: Firmware version sent in the version report.
+    :type version: str
+    :ivar report_interval: Time in seconds between moisture reports, or None to not send them.
+    :type report_interval: float or None
+    :ivar frame_size: Size that reports are padded to with NUL characters, or 0 for no padding.
+    :type frame_size: int
+    :ivar fragment_size: Size of the chunks that data is written in, or None to write whole reports.
+    :type fragment_size: int or None
+    :ivar curve_points: Number of curve points sent for a curve data request.
+    :type curve_points: int
+    :ivar moisture: Moisture value of each channel, %.
+    :type moisture: list[int]
+    :ivar humidity: Humidity value, %.
+    :type humidity: int
+    :ivar temperature: Temperature value, °C.
+    :type temperature: int
+    :ivar locked: Lock state of the device.
+    :type locked: bool
+    :ivar water_warning: True if the water level is low.
+    :type water_warning: bool
+    :ivar pumps: Pump state of each channel.
+    :type pumps: list[bool]
+    :ivar commands_received: Number of commands received.
+    :type commands_received: int
+    :ivar reports_sent: Number of reports sent.
+    :type reports_sent: int
+    :ivar _server: The listening server, or None if not started.
+    :type _server: asyncio.AbstractServer or None
+    :ivar _writers: Writers of the open connections.
+    :type _writers: set[asyncio.StreamWriter]
+    :ivar _handlers: Tasks serving the open connections.
+    :type _handlers: set[asyncio.Task]
+    """
+
+    DEFAULT_FRAME_SIZE = 64
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8800, device_id: str = "12663500",
+                 version: str = "3.6", report_interval: Optional[float] = 5.0,
+                 frame_size: int = DEFAULT_FRAME_SIZE, fragment_size: Optional[int] = None,
+                 curve_points: int = 24) -> None:
+        """
+        GrowcubeSimulator constructor
+
+        :param host: Address to listen on.
+        :type host: str
+        :param port: Port to listen on, 0 to use any free port.
+        :type port: int
+        :param device_id: Device ID sent in the version report.
+        :type device_id: str
+        :param version: Firmware version sent in the version report.
+        :type version: str
+        :param report_interval: Time in seconds between moisture reports, or None to not send them.
+        :type report_interval: float or None
+        :param frame_size: Size that reports are padded to with NUL characters, or 0 for no padding.
+        :type frame_size: int
+        :param fragment_size: Size of the chunks that data is written in, or None to write whole reports.
+        :type fragment_size: int or None
+        :param curve_points: Number of curve points sent for a curve data request.
+        :type curve_points: int
+        """
+        self.host = host
+        self._port = port
+        self.device_id = device_id
+        self.version = version
+        self.report_interval = report_interval
+        self.frame_size = frame_size
+        self.fragment_size = fragment_size
+        self.curve_points = curve_points
+        self.moisture = [random.randint(30, 60) for _ in Channel]
+        self.humidity = 40
+        self.temperature = 24
+        self.locked = False
+        self.water_warning = False
+        self.pumps = [False for _ in Channel]
+        self.commands_received = 0
+        self.reports_sent = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+
+    @property
+    def port(self) -> int:
+        """
+        Port the simulator listens on
+
+        :return: Port number, the actual port once started if 0 was given.
+        :rtype: int
+        """
+        return self._port
+
+    @property
+    def connections(self) -> int:
+        """
+        Number of open connections
+
+        :return: Number of open connections.
+        :rtype: int
+        """
+        return len(self._writers)
+
+    async def start(self) -> None:
+        """
+        Start listening for connections
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self._port)
+        self._port = self._server.sockets[0].getsockname()[1]
+        _LOGGER.debug("Simulator %s listening on %s:%i", self.device_id, self.host, self._port)
+
+    async def close(self) -> None:
+        """
+        Close all connections and stop listening
+        """
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        # Let the connection handlers see the closed connections and finish
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    @staticmethod
+    async def start_many(count: int, network: str = "127.1.0.0/16", port: int = 8800,
+                         **kwargs) -> List['GrowcubeSimulator']:
+        """
+        Start many simulators, each on its own address in a loopback network and with its own device ID.
+        All simulators use the same port, so clients can connect with only the host name changed.
+        Using loopback addresses other than 127.0.0.1 requires Linux, or aliases on other systems.
+
+        :param count: Number of simulators.
+        :type count: int
+        :param network: Network to take the addresses from.
+        :type network: str
+        :param port: Port to listen on, 0 to use a free port, which is then used by all simulators.
+        :type port: int
+        :param kwargs: Other GrowcubeSimulator constructor arguments.
+        :return: The started simulators.
+        :rtype: list[GrowcubeSimulator]
+        """
+        hosts = ipaddress.IPv4Network(network).hosts()
+        simulators = [GrowcubeSimulator(str(next(hosts)), port, device_id=str(10000000 + index), **kwargs)
+                      for index in range(count)]
+        if simulators and port == 0:
+            await simulators[0].start()
+            for simulator in simulators[1:]:
+                simulator._port = simulators[0].port
+            simulators_to_start = simulators[1:]
+        else:
+            simulators_to_start = simulators
+        await asyncio.gather(*[simulator.start() for simulator in simulators_to_start])
+        return simulators
+
+    def encode_report(self, command: int, payload: str) -> bytes:
+        """
+        Encode a report the way the device does, padded to frame_size.
+
+        :param command: Report code.
+        :type command: int
+        :param payload: Report payload.
+        :type payload: str
+        :return: The encoded report.
+        :rtype: bytes
+        """
+        data = (f"{GrowcubeMessage.HEADER}{command}{GrowcubeMessage.DELIMITER}{len(payload)}"
+                f"{GrowcubeMessage.DELIMITER}{payload}{GrowcubeMessage.DELIMITER}").encode('ascii')
+        if len(data) < self.frame_size:
+            data += b'\x00' * (self.frame_size - len(data))
+        return data
+
+    def send_report(self, command: int, payload: str) -> None:
+        """
+        Send a report to all connected clients, for example to simulate a sensor fault.
+
+        :param command: Report code.
+        :type command: int
+        :param payload: Report payload.
+        :type payload: str
+        """
+        data = self.encode_report(command, payload)
+        for writer in list(self._writers):
+            self._write(writer, [data])
+
+    def set_locked(self, locked: bool) -> None:
+        """
+        Change the lock state and report it to all connected clients.
+
+        :param locked: The new lock state.
+        :type locked: bool
+        """
+        self.locked = locked
+        self.send_report(33, self._lock_payload())
+
+    def _lock_payload(self) -> str:
+        return f"0@{1 if self.locked else 0}"
+
+    def _moisture_reports(self) -> List[bytes]:
+        """
+        Moisture reports for all channels, with the values drifting slowly
+        """
+        reports = []
+        for channel in Channel:
+            moisture = self.moisture[channel] + random.randint(-1, 1)
+            self.moisture[channel] = moisture = min(100, max(0, moisture))
+            reports.append(self.encode_report(21, f"{channel.value}@{moisture}@{self.humidity}@{self.temperature}"))
+        return reports
+
+    def _write(self, writer: asyncio.StreamWriter, reports: List[bytes]) -> None:
+        """
+        Write reports at once
+        """
+        if writer.is_closing():
+            return
+        self.reports_sent += len(reports)
+        writer.write(b''.join(reports))
+
+    async def _send_fragmented(self, writer: asyncio.StreamWriter, reports: List[bytes]) -> None:
+        """
+        Write reports, letting each fragment reach the socket on its own
+        """
+        if not self.fragment_size:
+            self._write(writer, reports)
+            return
+        self.reports_sent += len(reports)
+        data = b''.join(reports)
+        for start in range(0, len(data), self.fragment_size):
+            if writer.is_closing():
+                return
+            writer.write(data[start:start + self.fragment_size])
+            await writer.drain()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve a connection until it is closed
+        """
+        self._writers.add(writer)
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        reporter = None
+        try:
+            await self._send_fragmented(writer, [
+                self.encode_report(24, f"{self.version}@{self.device_id}"),
+                self.encode_report(20, "0" if self.water_warning else "1"),
+                self.encode_report(33, self._lock_payload()),
+            ] + self._moisture_reports())
+            if self.report_interval is not None:
+                reporter = asyncio.create_task(self._report_periodically(writer))
+            # Invalid frames are dropped, the same way the device ignores them
+            scanner = GrowcubeFrameScanner(resync=True)
+            while True:
+                data = await reader.read(1024)
+                if not data:
+                    break
+                scanner.feed(data)
+                while True:
+                    message = scanner.next_message()
+                    if message is None:
+                        break
+                    self.commands_received += 1
+                    try:
+                        reports = self._handle_command(message)
+                    except (ValueError, IndexError):
+                        # A malformed command is ignored, the connection stays open
+                        _LOGGER.debug("Simulator %s ignoring invalid command %s", self.device_id, message)
+                        continue
+                    if reports:
+                        await self._send_fragmented(writer, reports)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            self._writers.discard(writer)
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _report_periodically(self, writer: asyncio.StreamWriter) -> None:
+        """
+        Send moisture reports every report_interval seconds
+        """
+        while not writer.is_closing():
+            await asyncio.sleep(self.report_interval)
+            await self._send_fragmented(writer, self._moisture_reports())
+
+    def _handle_command(self, message: GrowcubeMessage) -> List[bytes]:
+        """
+        Get the reports answering a command
+
+        :raises ValueError: If the payload is malformed or the channel is out of range.
+        """
+        command = str(message.command)
+        payload = message.payload
+        if command == GrowcubeCommand.CMD_REQ_WATER:
+            channel, _, state = payload.partition("@")
+            channel = Channel(int(channel))
+            self.pumps[channel] = state == "1"
+            return [self.encode_report(26 if state == "1" else 27, str(channel.value))]
+        if command == GrowcubeCommand.CMD_CLOSE_PUMP:
+            channel = Channel(int(payload))
+            self.pumps[channel] = False
+            return [self.encode_report(27, str(channel.value))]
+        if command == GrowcubeCommand.CMD_REQ_CURVE_DATA:
+            # Provisional curve point layout, the same as assumed by CurveGrowcubeReport
+            channel = Channel(int(payload)).value
+            now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+            reports = []
+            for index in range(self.curve_points, 0, -1):
+                point = now - datetime.timedelta(hours=index)
+                reports.append(self.encode_report(
+                    22, f"{channel}@{point.year}@{point.month}@{point.day}@{point.hour}@{self.moisture[channel]}"))
+            reports.append(self.encode_report(35, str(channel)))
+            return reports
+        return []
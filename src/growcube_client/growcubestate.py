@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+from typing import Callable, Dict, List, Optional, Type
+from .growcubeenums import Channel
+from .growcubereport import (
+    GrowcubeReport, WaterStateGrowcubeReport, MoistureHumidityStateGrowcubeReport, DeviceVersionGrowcubeReport,
+    PumpOpenGrowcubeReport, PumpCloseGrowcubeReport, CheckSensorGrowcubeReport, CheckOutletBlockedGrowcubeReport,
+    CheckSensorNotConnectedGrowcubeReport, LockStateGrowcubeReport, CheckOutletLockedGrowcubeReport
+)
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+
+class GrowcubeChannelState:
+    """
+    Latest known state of a single channel
+
+    :ivar moisture: Moisture value, %, or None if not reported yet.
+    :type moisture: int or None
+    :ivar pump_open: True if the pump is running.
+    :type pump_open: bool
+    :ivar sensor_fault: True if the sensor has been reported as malfunctioning.
+    :type sensor_fault: bool
+    :ivar sensor_disconnected: True if the sensor has been reported as not connected.
+    :type sensor_disconnected: bool
+    :ivar outlet_locked: True if the pump outlet has been reported as locked.
+    :type outlet_locked: bool
+    :ivar outlet_blocked: True if the pump outlet has been reported as blocked.
+    :type outlet_blocked: bool
+    """
+    __slots__ = ('moisture', 'pump_open', 'sensor_fault', 'sensor_disconnected', 'outlet_locked', 'outlet_blocked')
+
+    def __init__(self):
+        """
+        GrowcubeChannelState constructor
+        """
+        self.moisture: Optional[int] = None
+        self.pump_open = False
+        self.sensor_fault = False
+        self.sensor_disconnected = False
+        self.outlet_locked = False
+        self.outlet_blocked = False
+
+    def copy(self) -> 'GrowcubeChannelState':
+        """
+        Get a copy of the channel state
+
+        :return: A copy of the channel state.
+        :rtype: GrowcubeChannelState
+        """
+        result = GrowcubeChannelState()
+        for name in self.__slots__:
+            setattr(result, name, getattr(self, name))
+        return result
+
+
+class GrowcubeDeviceState:
+    """
+    Latest known state of a Growcube device, updated in place from received reports.
+
+    Listeners are notified when the state has changed. Changes within the coalesce window are
+    combined into a single notification, so a burst of reports causes one notification.
+
+    :ivar version: Firmware version, or None if not reported yet.
+    :type version: str or None
+    :ivar device_id: Device ID, or None if not reported yet.
+    :type device_id: str or None
+    :ivar humidity: Humidity value, %, or None if not reported yet.
+    :type humidity: int or None
+    :ivar temperature: Temperature value, °C, or None if not reported yet.
+    :type temperature: int or None
+    :ivar water_warning: True if the water level is low.
+    :type water_warning: bool
+    :ivar locked: True if the device is in locked state.
+    :type locked: bool
+    :ivar channels: State of each channel, indexed by Channel.
+    :type channels: list[GrowcubeChannelState]
+    :ivar updated: Monotonic time of the last change, or None.
+    :type updated: float or None
+    :ivar coalesce_window: Time in seconds that changes are combined before listeners are notified.
+    :type coalesce_window: float
+    """
+
+    def __init__(self, coalesce_window: float = 0.0):
+        """
+        GrowcubeDeviceState constructor
+
+        :param coalesce_window: Time in seconds that changes are combined before listeners are notified.
+        :type coalesce_window: float
+        """
+        self.version: Optional[str] = None
+        self.device_id: Optional[str] = None
+        self.humidity: Optional[int] = None
+        self.temperature: Optional[int] = None
+        self.water_warning = False
+        self.locked = False
+        self.channels = [GrowcubeChannelState() for _ in Channel]
+        self.updated: Optional[float] = None
+        self.coalesce_window = coalesce_window
+        self._listeners: List[Callable[['GrowcubeDeviceState'], None]] = []
+        self._notify_handle: Optional[asyncio.Handle] = None
+
+    def channel(self, channel: Channel) -> GrowcubeChannelState:
+        """
+        Get the state of a channel
+
+        :param channel: Channel number 0-3.
+        :type channel: Channel
+        :return: The channel state.
+        :rtype: GrowcubeChannelState
+        """
+        return self.channels[channel]
+
+    def add_listener(self, listener: Callable[['GrowcubeDeviceState'], None]) -> None:
+        """
+        Add a listener that is called with the state when it has changed.
+
+        :param listener: The listener.
+        :type listener: Callable[[GrowcubeDeviceState], None]
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[['GrowcubeDeviceState'], None]) -> None:
+        """
+        Remove a listener.
+
+        :param listener: The listener to remove.
+        :type listener: Callable[[GrowcubeDeviceState], None]
+        """
+        self._listeners.remove(listener)
+
+    def update(self, report: GrowcubeReport) -> bool:
+        """
+        Update the state from a report.
+
+        :param report: The received report.
+        :type report: GrowcubeReport
+        :return: True if the state changed, otherwise False.
+        :rtype: bool
+        """
+        updater = self._UPDATERS.get(type(report))
+        if updater is None or not updater(self, report):
+            return False
+        self.updated = time.monotonic()
+        if self._listeners:
+            self._schedule_notify()
+        return True
+
+    def snapshot(self) -> 'GrowcubeDeviceState':
+        """
+        Get a copy of the current state, without listeners
+
+        :return: A copy of the state.
+        :rtype: GrowcubeDeviceState
+        """
+        result = GrowcubeDeviceState(self.coalesce_window)
+        result.version = self.version
+        result.device_id = self.device_id
+        result.humidity = self.humidity
+        result.temperature = self.temperature
+        result.water_warning = self.water_warning
+        result.locked = self.locked
+        result.channels = [channel.copy() for channel in self.channels]
+        result.updated = self.updated
+        return result
+
+    def _schedule_notify(self) -> None:
+        """
+        Notify listeners now, or at the end of the coalesce window
+        """
+        if self.coalesce_window <= 0:
+            self._notify()
+            return
+        if self._notify_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._notify()
+            return
+        self._notify_handle = loop.call_later(self.coalesce_window, self._notify)
+
+    def _notify(self) -> None:
+        """
+        Call the listeners
+        """
+        self._notify_handle = None
+        for listener in list(self._listeners):
+            try:
+                listener(self)
+            except Exception as e:
+                _LOGGER.error(f"State listener Exception {str(e)}")
+
+    @staticmethod
+    def _set(target, name: str, value) -> bool:
+        """
+        Set an attribute, returning True if the value changed
+        """
+        if getattr(target, name) == value:
+            return False
+        setattr(target, name, value)
+        return True
+
+    def _update_water_state(self, report: WaterStateGrowcubeReport) -> bool:
+        return self._set(self, 'water_warning', report.water_warning)
+
+    def _update_moisture(self, report: MoistureHumidityStateGrowcubeReport) -> bool:
+        changed = self._set(self.channels[report.channel], 'moisture', report.moisture)
+        changed |= self._set(self, 'humidity', report.humidity)
+        changed |= self._set(self, 'temperature', report.temperature)
+        return changed
+
+    def _update_version(self, report: DeviceVersionGrowcubeReport) -> bool:
+        changed = self._set(self, 'version', report.version)
+        changed |= self._set(self, 'device_id', report.device_id)
+        return changed
+
+    def _update_pump_open(self, report: PumpOpenGrowcubeReport) -> bool:
+        return self._set(self.channels[report.channel], 'pump_open', True)
+
+    def _update_pump_close(self, report: PumpCloseGrowcubeReport) -> bool:
+        return self._set(self.channels[report.channel], 'pump_open', False)
+
+    def _update_sensor_fault(self, report: CheckSensorGrowcubeReport) -> bool:
+        return self._set(self.channels[report.channel], 'sensor_fault', True)
+
+    def _update_sensor_disconnected(self, report: CheckSensorNotConnectedGrowcubeReport) -> bool:
+        return self._set(self.channels[report.channel], 'sensor_disconnected', True)
+
+    def _update_outlet_locked(self, report: CheckOutletLockedGrowcubeReport) -> bool:
+        return self._set(self.channels[report.channel], 'outlet_locked', True)
+
+    def _update_outlet_blocked(self, report: CheckOutletBlockedGrowcubeReport) -> bool:
+        return self._set(self.channels[report.channel], 'outlet_blocked', True)
+
+    def _update_lock_state(self, report: LockStateGrowcubeReport) -> bool:
+        return self._set(self, 'locked', report.lock_state)
+
+    _UPDATERS: Dict[Type[GrowcubeReport], Callable[['GrowcubeDeviceState', GrowcubeReport], bool]] = {
+        WaterStateGrowcubeReport: _update_water_state,
+        MoistureHumidityStateGrowcubeReport: _update_moisture,
+        DeviceVersionGrowcubeReport: _update_version,
+        PumpOpenGrowcubeReport: _update_pump_open,
+        PumpCloseGrowcubeReport: _update_pump_close,
+        CheckSensorGrowcubeReport: _update_sensor_fault,
+        CheckSensorNotConnectedGrowcubeReport: _update_sensor_disconnected,
+        CheckOutletLockedGrowcubeReport: _update_outlet_locked,
+        CheckOutletBlockedGrowcubeReport: _update_outlet_blocked,
+        LockStateGrowcubeReport: _update_lock_state,
+    }
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+from typing import Dict, List, Optional, Tuple
+from .growcubeenums import Channel
+from .growcubecommand import WaterCommand
+from .growcubeclient import GrowcubeClient
+
+"""
+Growcube client library
+https://github.com/jonnybergdahl/Python-growcube-client
+
+Author: Jonny Bergdahl
+Date: 2023-09-05
+"""
+
+
+class GrowcubeWateringJob:
+    """
+    A watering job for one channel of a device
+
+    :ivar client: The client for the device.
+    :type client: GrowcubeClient
+    :ivar channel: Channel number 0-3.
+    :type channel: Channel
+    :ivar duration: Duration in seconds.
+    :type duration: float
+    :ivar deadline: Event loop time when the pump is stopped.
+    :type deadline: float
+    :ivar success: True if the pump was both started and stopped successfully, None while running.
+    :type success: bool or None
+    :ivar cancelled: True if the job was stopped before the deadline.
+    :type cancelled: bool
+    :ivar _rounds: Number of remaining turns of the timer wheel before the job expires.
+    :type _rounds: int
+    :ivar _slot: The timer wheel slot holding the job.
+    :type _slot: int
+    :ivar _done: Future that is resolved when the job has finished.
+    :type _done: asyncio.Future
+    """
+
+    def __init__(self, client: GrowcubeClient, channel: Channel, duration: float, deadline: float,
+                 done: asyncio.Future):
+        """
+        GrowcubeWateringJob constructor
+
+        :param client: The client for the device.
+        :type client: GrowcubeClient
+        :param channel: Channel number 0-3.
+        :type channel: Channel
+        :param duration: Duration in seconds.
+        :type duration: float
+        :param deadline: Event loop time when the pump is stopped.
+        :type deadline: float
+        :param done: Future that is resolved when the job has finished.
+        :type done: asyncio.Future
+        """
+        self.client = client
+        self.channel = channel
+        self.duration = duration
+        self.deadline = deadline
+        self.success: Optional[bool] = None
+        self.cancelled = False
+        self._rounds = 0
+        self._slot = 0
+        self._done = done
+
+    @property
+    def done(self) -> bool:
+        """
+        Finished state
+
+        :return: True if the job has finished, otherwise False.
+        :rtype: bool
+        """
+        return self._done.done()
+
+    async def wait(self) -> bool:
+        """
+        Wait until the job has finished.
+
+        :return: True if the pump was both started and stopped successfully, otherwise False.
+        :rtype: bool
+        """
+        return await asyncio.shield(self._done)
+
+
+class GrowcubeWateringScheduler:
+    """
+    Runs watering jobs on many channels and devices at the same time.
+
+    Each job sends a WaterCommand to start the pump and is placed in a timer wheel, a single
+    timer per scheduler advances the wheel and stops the pumps of expired jobs. Jobs can be cancelled,
+    and shutdown stops all running pumps.
+
+    :cvar DEFAULT_RESOLUTION: Default timer wheel resolution in seconds.
+    :vartype DEFAULT_RESOLUTION: float
+    :cvar DEFAULT_WHEEL_SIZE: Default number of timer wheel slots.
+    :vartype DEFAULT_WHEEL_SIZE: int
+
+    :ivar resolution: Timer wheel resolution in seconds.
+    :type resolution: float
+    :ivar _wheel: The timer wheel slots, each an insertion ordered dict used as a set.
+    :type _wheel: list[dict[GrowcubeWateringJob, None]]
+    :ivar _position: The current timer wheel slot.
+    :type _position: int
+    :ivar _position_time: Event loop time of the current timer wheel slot.
+    :type _position_time: float
+    :ivar _jobs: Running jobs, keyed by client and channel.
+    :type _jobs: dict[tuple[GrowcubeClient, Channel], GrowcubeWateringJob]
+    :ivar _timer: Handle of the timer wheel timer, or None when no jobs are running.
+    :type _timer: asyncio.TimerHandle or None
+    """
+
+    DEFAULT_RESOLUTION = 0.1
+    DEFAULT_WHEEL_SIZE = 512
+
+    def __init__(self, resolution: float = DEFAULT_RESOLUTION, wheel_size: int = DEFAULT_WHEEL_SIZE) -> None:
+        """
+        GrowcubeWateringScheduler constructor
+
+        :param resolution: Timer wheel resolution in seconds.
+        :type resolution: float
+        :param wheel_size: Number of timer wheel slots.
+        :type wheel_size: int
+        """
+        self.resolution = resolution
+        self._wheel: List[Dict[GrowcubeWateringJob, None]] = [{} for _ in range(wheel_size)]
+        self._position = 0
+        self._position_time = 0.0
+        self._jobs: Dict[Tuple[GrowcubeClient, Channel], GrowcubeWateringJob] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def jobs(self) -> List[GrowcubeWateringJob]:
+        """
+        Running jobs
+
+        :return: List of running jobs.
+        :rtype: list[GrowcubeWateringJob]
+        """
+        return list(self._jobs.values())
+
+    def start(self, client: GrowcubeClient, channel: Channel, duration: float) -> GrowcubeWateringJob:
+        """
+        Start watering a channel. A running job for the same channel is replaced without stopping the pump,
+        once the new start command has been sent. If it can't be sent, the pump of the running job is stopped.
+
+        :param client: The client for the device.
+        :type client: GrowcubeClient
+        :param channel: Channel number 0-3.
+        :type channel: Channel
+        :param duration: Duration in seconds.
+        :type duration: float
+        :return: The watering job. If the pump could not be started, the job is already finished.
+        :rtype: GrowcubeWateringJob
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        key = (client, channel)
+        previous = self._jobs.get(key)
+        job = GrowcubeWateringJob(client, channel, duration, now + duration, loop.create_future())
+        if not client.send_command(WaterCommand.interned(channel, True)):
+            if previous is not None:
+                # The pump may still be running for the previous job
+                self.cancel(previous)
+            self._finish(job, False)
+            return job
+        if previous is not None:
+            self._unschedule(previous)
+            self._finish(previous, True, cancelled=True)
+        self._jobs[key] = job
+        self._schedule(job, loop)
+        return job
+
+    def cancel(self, job: GrowcubeWateringJob) -> bool:
+        """
+        Stop the pump of a running job now.
+
+        :param job: The job to cancel.
+        :type job: GrowcubeWateringJob
+        :return: True if the pump was stopped successfully, otherwise False.
+        :rtype: bool
+        """
+        if job.done:
+            return bool(job.success)
+        self._unschedule(job)
+        return self._stop(job, cancelled=True)
+
+    def shutdown(self) -> bool:
+        """
+        Stop the pumps of all running jobs and the timer.
+
+        :return: True if all pumps were stopped successfully, otherwise False.
+        :rtype: bool
+        """
+        success = True
+        for job in list(self._jobs.values()):
+            self._unschedule(job)
+            success &= self._stop(job, cancelled=True)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return success
+
+    def _schedule(self, job: GrowcubeWateringJob, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Place a job in the timer wheel, starting the timer if needed
+        """
+        if self._timer is None:
+            self._position_time = loop.time()
+        ticks = max(1, round((job.deadline - self._position_time) / self.resolution))
+        size = len(self._wheel)
+        job._rounds = (ticks - 1) // size
+        job._slot = (self._position + ticks) % size
+        self._wheel[job._slot][job] = None
+        if self._timer is None:
+            self._timer = loop.call_at(self._position_time + self.resolution, self._tick)
+
+    def _unschedule(self, job: GrowcubeWateringJob) -> None:
+        """
+        Remove a job from the timer wheel
+        """
+        self._wheel[job._slot].pop(job, None)
+        if self._jobs.get((job.client, job.channel)) is job:
+            del self._jobs[(job.client, job.channel)]
+        if not self._jobs and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _tick(self) -> None:
+        """
+        Advance the timer wheel to the current time, and stop the pumps of expired jobs
+        """
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        size = len(self._wheel)
+        while self._position_time + self.resolution <= loop.time():
+            self._position = (self._position + 1) % size
+            self._position_time += self.resolution
+            slot = self._wheel[self._position]
+            for job in list(slot):
+                if job._rounds > 0:
+                    job._rounds -= 1
+                    continue
+                del slot[job]
+                del self._jobs[(job.client, job.channel)]
+                self._stop(job)
+        if self._jobs:
+            self._timer = loop.call_at(self._position_time + self.resolution, self._tick)
+
+    def _stop(self, job: GrowcubeWateringJob, cancelled: bool = False) -> bool:
+        """
+        Stop the pump for a job
+        """
+        success = job.client.send_command(WaterCommand.interned(job.channel, False))
+        if not success:
+            # Try again just to be sure
+            success = job.client.send_command(WaterCommand.interned(job.channel, False))
+        if not success:
+            _LOGGER.error("Failed to stop pump on %s channel %s", job.client.host, job.channel)
+        self._finish(job, success, cancelled)
+        return success
+
+    @staticmethod
+    def _finish(job: GrowcubeWateringJob, success: bool, cancelled: bool = False) -> None:
+        """
+        Mark a job as finished
+        """
+        job.success = success
+        job.cancelled = cancelled
+        if not job._done.done():
+            job._done.set_result(success)
@@ -3,12 +3,12 @@ import logging
 import argparse
 import ipaddress
 import socket
-from growcube_client import GrowcubeDiscovery
+from growcube_client import GrowcubeDiscovery, GrowcubeDiscoveryCache
 
 '''
 A simple autodiscovery script for Growcube devices
-If your devices are in another network than your networks default subnet you can add the subnet as 
-a command-line argument in the format '192.168.1.0/24'.
+If your devices are in another network than your networks default subnet you can add one or more subnets as
+command-line arguments in the format '192.168.1.0/24'.
 
 I also found the default max open files limit to be too low for this script to work in macOS (100 files). 
 You can increase the limit by running this command before running this script:
@@ -41,21 +41,32 @@ async def main() -> None:
         None
     '''
     # Get the command-line argument
-    parser = argparse.ArgumentParser(description="Discover Growcube devices in a subnet.")
-    parser.add_argument("subnet", nargs="?", type=str, help="Subnet in CIDR notation (e.g., 192.168.1.0/24)")
+    parser = argparse.ArgumentParser(description="Discover Growcube devices in one or more subnets.")
+    parser.add_argument("subnets", nargs="*", type=str,
+                        help="Subnets in CIDR notation (e.g., 192.168.1.0/24 10.0.0.0/16)")
+    parser.add_argument("--cache", type=str,
+                        help="Discovery cache file, known devices are checked first and the subnets only scanned "
+                             "for missing devices")
     args = parser.parse_args()
-    if args.subnet:
-        subnet = ipaddress.IPv4Network(args.subnet, strict=False)
+    if args.subnets:
+        subnets = [ipaddress.IPv4Network(subnet, strict=False) for subnet in args.subnets]
     else:
-        subnet = None # guess_subnet()
+        subnets = [GrowcubeDiscovery.guess_subnet()]
 
     discovery = GrowcubeDiscovery()
-    print(f"Discovering Growcube clients on subnet {subnet}")
-    devices = await discovery.discover_devices_in_local_subnet(subnet)
-    print(f"Found {len(devices)} devices:")
-    for device in devices:
+    print(f"Discovering Growcube clients on {', '.join(str(subnet) for subnet in subnets)}")
+    if args.cache:
+        cache = GrowcubeDiscoveryCache(args.cache)
+        devices = await cache.refresh(discovery, subnets)
+        print(f"Found {len(devices)} devices:")
+        for device_id, host in devices.items():
+            print(f"Found device: {host} ({device_id})")
+        return
+    devices = []
+    async for device in discovery.scan(subnets):
         print(f"Found device: {device}")
-
+        devices.append(device)
+    print(f"Found {len(devices)} devices, probed {discovery.probed} addresses")
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+import argparse
+from growcube_client import GrowcubeSimulator
+
+'''
+A simple Growcube device simulator
+Starts one or more simulated devices, each listening on its own loopback address, to test clients
+and fleets without hardware. With more than one device the addresses are taken from 127.1.0.0/16,
+which works out of the box on Linux.
+'''
+
+
+async def main() -> None:
+    '''
+    Main async function
+    Returns:
+        None
+    '''
+    parser = argparse.ArgumentParser(description="Simulate Growcube devices.")
+    parser.add_argument("--count", type=int, default=1, help="Number of simulated devices")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on, for a single device")
+    parser.add_argument("--port", type=int, default=8800, help="Port to listen on")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between moisture reports")
+    parser.add_argument("--fragment", type=int, default=None, help="Write data in chunks of this size")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.count == 1:
+        simulators = [GrowcubeSimulator(args.host, args.port, report_interval=args.interval,
+                                        fragment_size=args.fragment)]
+        await simulators[0].start()
+    else:
+        simulators = await GrowcubeSimulator.start_many(args.count, port=args.port, report_interval=args.interval,
+                                                        fragment_size=args.fragment)
+    for simulator in simulators:
+        print(f"Simulating device {simulator.device_id} on {simulator.host}:{simulator.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await asyncio.gather(*[simulator.close() for simulator in simulators])
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,56 @@
+import unittest
+import logging
+from benchmarks.captures import make_captures
+from benchmarks.runner import GrowcubeBenchmarkResult, compare, run_all
+
+
+class GrowcubeBenchmarksTestCase(unittest.TestCase):
+    def test_captures_reproducible(self):
+        first = make_captures(50, seed=3)
+        second = make_captures(50, seed=3)
+        self.assertEqual(["small", "padded", "bursty", "fragmented", "junk"], [capture.name for capture in first])
+        for capture, other in zip(first, second):
+            self.assertEqual(capture.chunks, other.chunks)
+        self.assertNotEqual(first[3].chunks, make_captures(50, seed=4)[3].chunks)
+
+    def test_run_all(self):
+        captures = make_captures(50)
+        results = run_all(captures, rounds=1)
+        self.assertEqual(25, len(results))
+        for result in results:
+            self.assertGreater(result.frames_per_second, 0)
+            self.assertGreater(result.bytes_per_second, 0)
+            self.assertGreater(result.p99_us, 0)
+
+    def test_run_all_restores_log_level(self):
+        logger = logging.getLogger("growcube_client")
+        level = logger.level
+        logger.setLevel(logging.DEBUG)
+        try:
+            run_all(make_captures(10), ["framing"], rounds=1)
+            self.assertEqual(logging.DEBUG, logger.level)
+        finally:
+            logger.setLevel(level)
+
+    def test_all_frames_found(self):
+        from growcube_client import GrowcubeProtocol
+        for capture in make_captures(50):
+            messages = []
+            protocol = GrowcubeProtocol(lambda: None, messages.append, lambda: None)
+            for chunk in capture.chunks:
+                protocol.data_received(chunk)
+            self.assertEqual(50, len(messages), capture.name)
+
+    def test_compare(self):
+        baseline = {"framing/small": {"frames_per_second": 1000, "p99_us": 10.0, "peak_bytes_per_frame": 100.0,
+                                      "blocks_per_frame": 0.0}}
+        good = GrowcubeBenchmarkResult("framing", "small", 900, 90000, 11.0, 110.0, 0.0)
+        self.assertEqual([], compare([good], baseline, 0.25))
+        bad = GrowcubeBenchmarkResult("framing", "small", 500, 50000, 20.0, 200.0, 0.0)
+        self.assertEqual(3, len(compare([bad], baseline, 0.25)))
+        other = GrowcubeBenchmarkResult("framing", "junk", 1, 100, 1000.0, 1000.0, 0.0)
+        self.assertEqual([], compare([other], baseline, 0.25))
+
+
+if __name__ == '__main__':
+    unittest.main()
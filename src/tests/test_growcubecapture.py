@@ -0,0 +1,133 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import time
+from unittest.mock import MagicMock
+from growcube_client import (GrowcubeCaptureWriter, GrowcubeCaptureReader, GrowcubeCaptureRecord, GrowcubeClient,
+                             GrowcubeProtocol, GrowcubeReplayTransport, CaptureDirection, Channel)
+
+
+def make_record(direction, seconds, data):
+    return GrowcubeCaptureRecord(direction, int(seconds * 1e9), data)
+
+
+class GrowcubeCaptureFileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "device.gcap")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_and_read(self):
+        writer = GrowcubeCaptureWriter(self.path)
+        writer.record(CaptureDirection.Received, b"elea24#12#3.6@12663500#\x00\x00")
+        writer.record(CaptureDirection.Sent, b"elea47#1#1#")
+        writer.close()
+        self.assertTrue(writer.closed)
+        self.assertEqual(2, writer.records)
+        self.assertEqual(os.path.getsize(self.path), writer.written)
+
+        records = list(GrowcubeCaptureReader(self.path))
+        self.assertEqual([CaptureDirection.Received, CaptureDirection.Sent], [record.direction for record in records])
+        self.assertEqual(b"elea47#1#1#", records[1].data)
+        self.assertLessEqual(records[0].timestamp, records[1].timestamp)
+
+    def test_append(self):
+        for data in [b"first", b"second"]:
+            writer = GrowcubeCaptureWriter(self.path)
+            writer.record(CaptureDirection.Received, data)
+            writer.close()
+        self.assertEqual([b"first", b"second"], [record.data for record in GrowcubeCaptureReader(self.path)])
+
+    def test_buffer_full_written_before_close(self):
+        writer = GrowcubeCaptureWriter(self.path, buffer_size=16, flush_interval=60)
+        writer.record(CaptureDirection.Received, b"x" * 32)
+        # The full buffer wakes the writer thread long before the flush interval
+        for _ in range(100):
+            if writer.written > 5:
+                break
+            time.sleep(0.01)
+        self.assertGreater(writer.written, 5)
+        writer.close()
+        writer.record(CaptureDirection.Received, b"ignored")
+        self.assertEqual(1, len(list(GrowcubeCaptureReader(self.path))))
+
+    def test_truncated_record_ignored(self):
+        writer = GrowcubeCaptureWriter(self.path)
+        writer.record(CaptureDirection.Received, b"complete")
+        writer.record(CaptureDirection.Received, b"truncated")
+        writer.close()
+        with open(self.path, "r+b") as file:
+            file.truncate(os.path.getsize(self.path) - 3)
+        self.assertEqual([b"complete"], [record.data for record in GrowcubeCaptureReader(self.path)])
+
+    def test_not_a_capture_file(self):
+        with open(self.path, "wb") as file:
+            file.write(b"elea24#")
+        with self.assertRaises(ValueError):
+            list(GrowcubeCaptureReader(self.path))
+
+
+class GrowcubeProtocolCaptureTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_protocol_records_traffic(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "device.gcap")
+            writer = GrowcubeCaptureWriter(path)
+            protocol = GrowcubeProtocol(None, None, None, capture=writer)
+            protocol.connection_made(MagicMock())
+            protocol.data_received(b"elea20#1#1#\x00\x00")
+            protocol.send_message(b"elea47#3#0@1#")
+            protocol.connection_lost(None)
+            writer.close()
+            records = list(GrowcubeCaptureReader(path))
+        self.assertEqual([(CaptureDirection.Received, b"elea20#1#1#\x00\x00"),
+                          (CaptureDirection.Sent, b"elea47#3#0@1#")],
+                         [(record.direction, record.data) for record in records])
+
+
+class GrowcubeReplayTransportTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.records = [
+            make_record(CaptureDirection.Received, 100.0, b"elea24#12#3.6@12663500#"),
+            make_record(CaptureDirection.Sent, 100.05, b"elea47#3#0@1#"),
+            make_record(CaptureDirection.Received, 100.1, b"elea21#1"),
+            make_record(CaptureDirection.Received, 100.2, b"0#0@41@40@24#\x00\x00"),
+        ]
+
+    async def test_replay_maximum_speed(self):
+        messages = []
+        lost = []
+        protocol = GrowcubeProtocol(None, messages.append, lambda: lost.append(True))
+        transport = GrowcubeReplayTransport(protocol, self.records, speed=None)
+        self.assertEqual(3, await transport.replay())
+        self.assertEqual([24, 21], [message.command for message in messages])
+        self.assertEqual([True], lost)
+        self.assertTrue(transport.is_closing())
+
+    async def test_replay_original_timing(self):
+        protocol = GrowcubeProtocol(None, None, None)
+        transport = GrowcubeReplayTransport(protocol, self.records, speed=2.0)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await transport.replay()
+        # 0.2 seconds of traffic at double speed
+        self.assertGreaterEqual(loop.time() - start, 0.09)
+
+    async def test_close_stops_replay(self):
+        protocol = GrowcubeProtocol(None, lambda message: transport.close(), None)
+        transport = GrowcubeReplayTransport(protocol, self.records, speed=None)
+        self.assertEqual(1, await transport.replay())
+
+    async def test_client_replay(self):
+        client = GrowcubeClient("replay", None)
+        client.auto_reconnect = True
+        self.assertEqual(3, await client.replay(self.records, speed=None))
+        self.assertEqual("12663500", client.state.device_id)
+        self.assertEqual(41, client.state.channels[Channel.Channel_A].moisture)
+        self.assertIsNone(client._reconnect_task)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
 import unittest
 import asyncio
+import time
 from unittest.mock import MagicMock, patch
-from growcube_client import GrowcubeClient, GrowcubeReport, Channel, WateringMode
+from growcube_client import (GrowcubeClient, GrowcubeReport, GrowcubeMessage, Channel, WateringMode,
+                             CurveGrowcubeReport, WaterCommand, ClosePumpCommand, SetWorkModeCommand,
+                             GrowcubeCommand)
+from growcube_client.growcubeenums import WorkMode
 
 
 class GrowcubeClientTestCase(unittest.TestCase):
@@ -58,12 +62,9 @@ class GrowcubeClientTestCase(unittest.TestCase):
         self.assertFalse(self.client.connected)
 
     def test_send_command(self):
-        # Create a mock command
-        mock_command = MagicMock()
-        mock_command.get_message.return_value = "test_command"
-        mock_command.get_description.return_value = "Test Command"
-        
-        result = self.client.send_command(mock_command)
+        command = GrowcubeCommand("test_command", None)
+
+        result = self.client.send_command(command)
         
         self.assertTrue(result)
         self.client.protocol.send_message.assert_called_once_with(b"test_command")
@@ -117,6 +118,272 @@ class GrowcubeClientTestCase(unittest.TestCase):
             
             self.callback.assert_called_once_with(mock_report)
 
+    def test_on_message_does_not_describe_report_when_debug_disabled(self):
+        mock_message = MagicMock()
+        mock_report = MagicMock()
+
+        with patch('growcube_client.GrowcubeReport.get_report', return_value=mock_report), \
+                patch('growcube_client.growcubeclient._LOGGER.isEnabledFor', return_value=False):
+            self.client.on_message(mock_message)
+
+        mock_report.get_description.assert_not_called()
+        mock_report.__str__.assert_not_called()
+        self.callback.assert_called_once_with(mock_report)
+
+    def test_on_message_invalid_payload(self):
+        self.client.protocol = MagicMock()
+        self.client.protocol.receive_metrics.errors = 0
+        self.client.on_message(GrowcubeMessage(21, "x@y", b'elea21#3#x@y#'))
+
+        self.callback.assert_not_called()
+        self.assertEqual(1, self.client.protocol.receive_metrics.errors)
+
+    def test_reconnect_delay_backoff(self):
+        self.client.reconnect_jitter = 0
+        self.client.reconnect_min_delay = 1
+        self.client.reconnect_max_delay = 10
+        self.assertEqual([1, 2, 4, 8, 10, 10], [self.client.get_reconnect_delay(i) for i in range(6)])
+
+    def test_reconnect_delay_jitter(self):
+        self.client.reconnect_jitter = 0.5
+        for _ in range(100):
+            delay = self.client.get_reconnect_delay(2)
+            self.assertGreaterEqual(delay, 2)
+            self.assertLessEqual(delay, 4)
+
+    def test_no_reconnect_by_default(self):
+        with patch('asyncio.create_task') as mock_create_task:
+            self.client.on_connection_lost()
+        mock_create_task.assert_not_called()
+
+
+class GrowcubeClientReconnectTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = GrowcubeClient("127.0.0.1", MagicMock(), auto_reconnect=True)
+        self.client.reconnect_min_delay = 0.001
+        self.client.reconnect_max_delay = 0.001
+
+    async def test_reconnect_after_connection_lost(self):
+        results = [(False, "refused"), (False, "refused"), (True, "")]
+        with patch.object(self.client, 'connect', side_effect=results) as mock_connect:
+            self.client.on_connection_lost()
+            await self.client._reconnect_task
+
+        self.assertEqual(3, mock_connect.call_count)
+        self.assertEqual(3, self.client.reconnect_metrics.attempts)
+        self.assertEqual(2, self.client.reconnect_metrics.failures)
+        self.assertEqual(1, self.client.reconnect_metrics.successes)
+        self.assertIsNone(self.client._reconnect_task)
+
+    async def test_reconnect_gives_up(self):
+        self.client.reconnect_max_attempts = 2
+        with patch.object(self.client, 'connect', return_value=(False, "refused")) as mock_connect:
+            self.client.on_connection_lost()
+            await self.client._reconnect_task
+
+        self.assertEqual(2, mock_connect.call_count)
+        self.assertEqual(1, self.client.reconnect_metrics.gave_up)
+
+    async def test_no_reconnect_after_disconnect(self):
+        self.client.disconnect()
+        self.client.on_connection_lost()
+        self.assertIsNone(self.client._reconnect_task)
+
+    async def test_disconnect_cancels_reconnect(self):
+        self.client.reconnect_min_delay = 10
+        self.client.reconnect_max_delay = 10
+        self.client.on_connection_lost()
+        task = self.client._reconnect_task
+        self.client.disconnect()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertIsNone(self.client._reconnect_task)
+
+
+class GrowcubeClientDownloadCurveTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_download_curve(self):
+        client = GrowcubeClient("127.0.0.1", None)
+        client.transport = MagicMock()
+        client.protocol = MagicMock()
+        messages = [GrowcubeMessage(22, "1@2023@7@13@14@45", b""),
+                    GrowcubeMessage(21, "1@63@62@26", b""),
+                    GrowcubeMessage(22, "0@2023@7@13@14@10", b""),
+                    GrowcubeMessage(22, "1@2023@7@13@15@44", b""),
+                    GrowcubeMessage(35, "1", b""),
+                    GrowcubeMessage(22, "1@2023@7@13@16@43", b"")]
+
+        def send_message(data):
+            for message in messages:
+                asyncio.get_running_loop().call_soon(client.on_message, message)
+
+        client.protocol.send_message.side_effect = send_message
+        points = [report async for report in client.download_curve(Channel.Channel_B)]
+
+        self.assertEqual([45, 44], [point.moisture for point in points])
+        self.assertTrue(all(isinstance(point, CurveGrowcubeReport) for point in points))
+        client.protocol.send_message.assert_called_once_with(b"elea48#1#1#")
+        self.assertEqual([], client._report_streams)
+
+    async def test_download_curve_timeout(self):
+        client = GrowcubeClient("127.0.0.1", None)
+        client.protocol = MagicMock()
+        with self.assertRaises(asyncio.TimeoutError):
+            async for _ in client.download_curve(Channel.Channel_A, timeout=0.01):
+                pass
+
+
+    async def test_download_curve_not_sent(self):
+        client = GrowcubeClient("127.0.0.1", None)
+        client.send_command = MagicMock(return_value=False)
+        with self.assertRaises(ConnectionError):
+            async for _ in client.download_curve(Channel.Channel_A, timeout=0.01):
+                pass
+        self.assertEqual([], client._report_streams)
+
+class GrowcubeClientAckTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = GrowcubeClient("127.0.0.1", MagicMock())
+        self.client.protocol = MagicMock()
+        self.client.ack_timeout = 0.05
+
+    def acknowledge_with(self, command: int, after: int = 1):
+        # Answer a write with a report, ignoring the first after - 1 writes
+        loop = asyncio.get_running_loop()
+        writes = []
+
+        def send_message(data):
+            writes.append(data)
+            if len(writes) >= after:
+                channel = data.decode('ascii').split('#')[2][0]
+                loop.call_soon(self.client.on_message, GrowcubeMessage(command, channel, b''))
+
+        self.client.protocol.send_message.side_effect = send_message
+        return writes
+
+    async def test_acknowledged(self):
+        writes = self.acknowledge_with(26)
+        latency = await self.client.send_command_acked(WaterCommand(Channel.Channel_B, True))
+        self.assertEqual(1, len(writes))
+        self.assertGreaterEqual(latency, 0)
+        self.assertEqual(1, self.client.command_metrics.acknowledged)
+        self.assertEqual(latency, self.client.command_metrics.last_latency)
+        self.assertEqual({}, self.client._ack_waiters)
+
+    async def test_other_channel_not_acknowledged(self):
+        self.acknowledge_with(27)
+        self.client.on_message(GrowcubeMessage(27, "3", b''))
+        await self.client.send_command_acked(ClosePumpCommand(Channel.Channel_A))
+        self.assertEqual(0, self.client.command_metrics.retries)
+
+    async def test_retry(self):
+        writes = self.acknowledge_with(27, after=2)
+        await self.client.send_command_acked(WaterCommand(Channel.Channel_A, False))
+        self.assertEqual(2, len(writes))
+        self.assertEqual(1, self.client.command_metrics.retries)
+
+    async def test_not_connected_waits_between_attempts(self):
+        self.client.send_command = MagicMock(return_value=False)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.client.send_command_acked(WaterCommand(Channel.Channel_A, True), retries=2)
+        self.assertGreaterEqual(loop.time() - start, 0.09)
+        self.assertEqual(3, self.client.send_command.call_count)
+        self.assertEqual(1, self.client.command_metrics.timeouts)
+        self.assertEqual({}, self.client._ack_waiters)
+
+    async def test_reconnected_between_attempts(self):
+        writes = self.acknowledge_with(26)
+        send_command = self.client.send_command
+        connected = iter([False])
+        self.client.send_command = lambda command: next(connected, True) and send_command(command)
+        await self.client.send_command_acked(WaterCommand(Channel.Channel_B, True))
+        self.assertEqual(1, len(writes))
+        self.assertEqual(1, self.client.command_metrics.retries)
+        self.assertEqual(1, self.client.command_metrics.acknowledged)
+
+    async def test_timeout(self):
+        self.acknowledge_with(26)
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.client.send_command_acked(WaterCommand(Channel.Channel_A, False), retries=1)
+        self.assertEqual(2, self.client.protocol.send_message.call_count)
+        self.assertEqual(1, self.client.command_metrics.timeouts)
+        self.assertEqual({}, self.client._ack_waiters)
+
+    async def test_not_acknowledged_command(self):
+        with self.assertRaises(ValueError):
+            await self.client.send_command_acked(SetWorkModeCommand(WorkMode.Network))
+
+    async def test_water_plant_acknowledged(self):
+        loop = asyncio.get_running_loop()
+
+        def send_message(data):
+            _, _, payload, _ = data.decode('ascii').split('#')
+            channel, state = payload.split('@')
+            loop.call_soon(self.client.on_message, GrowcubeMessage(26 if state == "1" else 27, channel, b''))
+
+        self.client.protocol.send_message.side_effect = send_message
+        self.assertTrue(await self.client.water_plant(Channel.Channel_C, 0, acknowledged=True))
+        self.assertEqual(2, self.client.protocol.send_message.call_count)
+        self.assertEqual(2, self.client.command_metrics.acknowledged)
+
+    async def test_water_plant_start_not_acknowledged(self):
+        self.acknowledge_with(27)
+        self.assertFalse(await self.client.water_plant(Channel.Channel_C, 10, acknowledged=True))
+        # Three attempts to start, then a stop that is acknowledged
+        self.assertEqual(4, self.client.protocol.send_message.call_count)
+
+
+
+class GrowcubeClientSupervisorTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = GrowcubeClient("127.0.0.1", MagicMock())
+        self.client.transport = MagicMock()
+        self.client.protocol = MagicMock()
+        self.client.connected = True
+
+    async def asyncTearDown(self):
+        self.client._stop_supervisor()
+
+    def start_supervisor(self):
+        self.client._supervisor_task = asyncio.create_task(self.client._supervise())
+
+    # Timeouts are several times the timer granularity of slow CI runners, about 15 ms on Windows
+    async def test_stale_link_closed(self):
+        self.client.stale_timeout = 0.2
+        self.start_supervisor()
+        await asyncio.sleep(0.6)
+        self.client.transport.abort.assert_called_once()
+        self.assertEqual(1, self.client.reconnect_metrics.stale_links)
+        self.assertIsNone(self.client._supervisor_task)
+
+    async def test_activity_keeps_link(self):
+        self.client.stale_timeout = 0.4
+        self.start_supervisor()
+        for _ in range(4):
+            await asyncio.sleep(0.1)
+            self.client.on_message(GrowcubeMessage(20, "1", b''))
+        self.client.transport.abort.assert_not_called()
+
+    async def test_keep_alive_when_idle(self):
+        self.client.keep_alive_interval = 0.1
+        self.start_supervisor()
+        await asyncio.sleep(0.4)
+        self.assertGreaterEqual(self.client.reconnect_metrics.keep_alives, 1)
+        self.client.protocol.send_message.assert_called_with(b"elea43#1#1#")
+
+    async def test_no_keep_alive_when_busy(self):
+        self.client.keep_alive_interval = 0.4
+        self.start_supervisor()
+        for _ in range(4):
+            await asyncio.sleep(0.1)
+            self.client.send_command(WaterCommand(Channel.Channel_A, False))
+        self.assertEqual(0, self.client.reconnect_metrics.keep_alives)
+
+    async def test_heartbeat(self):
+        self.client.on_message(GrowcubeMessage(20, "1", b''))
+        self.assertAlmostEqual(time.time(), self.client.heartbeat, delta=0.1)
+
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -107,6 +107,37 @@ class GrowCubeCommandTestCase(unittest.TestCase):
         command = SyncWFactoryResetCommand()
         self.assertEqual("ele505", command.get_message())
 
+    def test_get_bytes(self):
+        command = WaterCommand(Channel.Channel_B, True)
+        data = command.get_bytes()
+        self.assertEqual(b"elea47#3#1@1#", data)
+        self.assertIs(data, command.get_bytes())
+
+    def test_get_bytes_after_change(self):
+        command = GrowcubeCommand(GrowcubeCommand.CMD_SYNC_TIME, "payload")
+        self.assertEqual(b"elea44#7#payload#", command.get_bytes())
+        command.message = "other"
+        self.assertEqual(b"elea44#5#other#", command.get_bytes())
+
+    def test_get_bytes_not_cached(self):
+        command = WiFiSettingsCommand("SSID", "Password")
+        self.assertIsNot(command.get_bytes(), command.get_bytes())
+
+    def test_interned(self):
+        command = WaterCommand.interned(Channel.Channel_C, False)
+        self.assertIs(command, WaterCommand.interned(Channel.Channel_C, False))
+        self.assertIsNot(command, WaterCommand.interned(Channel.Channel_C, True))
+        self.assertIsNot(command, ClosePumpCommand.interned(Channel.Channel_C))
+        self.assertIsInstance(command, WaterCommand)
+        self.assertEqual(b"elea47#3#2@0#", command.get_bytes())
+        self.assertIs(SyncWaterLevelCommand.interned(), SyncWaterLevelCommand.interned())
+
+    def test_interned_is_frozen(self):
+        command = SetWorkModeCommand.interned(WorkMode.Direct)
+        with self.assertRaises(AttributeError):
+            command.message = "2"
+        self.assertEqual(b"elea43#1#1#", command.get_bytes())
+
 
 if __name__ == '__main__':
     unittest.main()
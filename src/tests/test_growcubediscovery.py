@@ -1,8 +1,11 @@
 import unittest
 import asyncio
 import ipaddress
+import os
+import tempfile
+import time
 from unittest.mock import MagicMock, patch
-from growcube_client import GrowcubeDiscovery
+from growcube_client import GrowcubeDiscovery, GrowcubeDiscoveryCache, GrowcubeDiscoveryCacheEntry
 
 
 class GrowcubeDiscoveryTestCase(unittest.TestCase):
@@ -93,5 +96,151 @@ class GrowcubeDiscoveryTestCase(unittest.TestCase):
         mock_sock_instance.close.assert_called_once()
 
 
+class GrowcubeDiscoveryScanTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+        self.discovery = GrowcubeDiscovery()
+        self.discovery.PORT = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_scan(self):
+        # 127.0.0.2 is also a loopback address, but the server only listens on 127.0.0.1
+        devices = [ip async for ip in self.discovery.scan(ipaddress.IPv4Network("127.0.0.0/30"))]
+        self.assertEqual(["127.0.0.1"], devices)
+        self.assertEqual(2, self.discovery.probed)
+        self.assertEqual(GrowcubeDiscovery.MIN_CONNECT_TIMEOUT, self.discovery.connect_timeout)
+
+    async def test_scan_multiple_subnets(self):
+        subnets = [ipaddress.IPv4Network("127.0.0.0/30"), ipaddress.IPv4Network("127.0.0.0/29")]
+        devices = [ip async for ip in self.discovery.scan(subnets, initial_concurrency=2)]
+        self.assertEqual(["127.0.0.1"], devices)
+        # Overlapping addresses are only probed once
+        self.assertEqual(6, self.discovery.probed)
+        self.assertEqual(2 + 6, self.discovery.concurrency)
+
+    async def test_scan_out_of_sockets(self):
+        results = {"127.0.0.1": [("127.0.0.1", None, None), ("127.0.0.1", True, 0.001)]}
+
+        async def probe(ip):
+            if ip in results and results[ip]:
+                return results[ip].pop(0)
+            return ip, False, None
+
+        with patch.object(self.discovery, '_probe', side_effect=probe):
+            devices = [ip async for ip in self.discovery.scan(ipaddress.IPv4Network("127.0.0.0/30"),
+                                                              initial_concurrency=8)]
+        self.assertEqual(["127.0.0.1"], devices)
+        self.assertEqual(2, self.discovery.probed)
+        self.assertLess(self.discovery.concurrency, 8)
+        self.assertEqual(0, self.discovery.resource_failures)
+
+    async def test_scan_stays_out_of_sockets(self):
+        probes = []
+
+        async def probe(ip):
+            probes.append(ip)
+            return ip, None, None
+
+        self.discovery.RESOURCE_MIN_DELAY = 0.01
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with patch.object(self.discovery, '_probe', side_effect=probe):
+            devices = [ip async for ip in self.discovery.scan(ipaddress.IPv4Network("127.0.0.1/32"))]
+        self.assertEqual([], devices)
+        # The address is given up after the retries, waiting longer after each shortage
+        self.assertEqual(GrowcubeDiscovery.RESOURCE_RETRIES + 1, len(probes))
+        self.assertGreaterEqual(loop.time() - start, 0.01 * (2 ** len(probes) - 1) - 0.01)
+        self.assertEqual(1, self.discovery.probed)
+        self.assertEqual(1, self.discovery.resource_failures)
+        self.assertEqual(1, self.discovery.concurrency)
+
+
+class GrowcubeDiscoveryCacheTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.device_id = "12663500"
+
+        async def handle(reader, writer):
+            writer.write(f"elea24#12#3.6@{self.device_id}#".encode('ascii') + b'\x00' * 41)
+            await writer.drain()
+            writer.close()
+
+        self.server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        self.discovery = GrowcubeDiscovery()
+        self.discovery.PORT = self.server.sockets[0].getsockname()[1]
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "devices.json")
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.directory.cleanup()
+
+    async def test_refresh_scans_when_empty(self):
+        cache = GrowcubeDiscoveryCache(self.path)
+        found = await cache.refresh(self.discovery, ipaddress.IPv4Network("127.0.0.0/30"))
+        self.assertEqual({"12663500": "127.0.0.1"}, found)
+        self.assertEqual("3.6", cache.entries["12663500"].version)
+        self.assertEqual({"12663500": "127.0.0.1"}, GrowcubeDiscoveryCache(self.path).hosts)
+
+    async def test_refresh_known_devices_without_scan(self):
+        cache = GrowcubeDiscoveryCache(self.path)
+        cache.entries["12663500"] = GrowcubeDiscoveryCacheEntry("12663500", "127.0.0.1", "3.5", 0, 1e12)
+        with patch.object(self.discovery, 'scan') as mock_scan:
+            found = await cache.refresh(self.discovery, ipaddress.IPv4Network("127.0.0.0/30"))
+        mock_scan.assert_not_called()
+        self.assertEqual({"12663500": "127.0.0.1"}, found)
+        self.assertEqual("3.6", cache.entries["12663500"].version)
+        self.assertAlmostEqual(time.time(), cache.entries["12663500"].last_seen, delta=5)
+
+    async def test_refresh_finds_moved_device(self):
+        cache = GrowcubeDiscoveryCache(self.path)
+        cache.entries["12663500"] = GrowcubeDiscoveryCacheEntry("12663500", "127.0.0.2", "3.6", time.time(), 3600)
+        found = await cache.refresh(self.discovery, ipaddress.IPv4Network("127.0.0.0/30"))
+        self.assertEqual({"12663500": "127.0.0.1"}, found)
+        self.assertEqual("127.0.0.1", cache.entries["12663500"].host)
+
+    async def test_malformed_reports_skipped(self):
+        data = [b'elea21#3#1@6#elea24#3#3.6#']
+
+        async def handle(reader, writer):
+            writer.write(data[0])
+            await writer.drain()
+            await asyncio.sleep(1)
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        try:
+            cache = GrowcubeDiscoveryCache(self.path)
+            cache.identify_timeout = 0.2
+            port = server.sockets[0].getsockname()[1]
+            self.assertIsNone(await cache.identify("127.0.0.1", port))
+            data[0] += f"elea24#12#3.6@{self.device_id}#".encode('ascii')
+            self.assertEqual(self.device_id, (await cache.identify("127.0.0.1", port)).device_id)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    async def test_expired_entries_dropped(self):
+        cache = GrowcubeDiscoveryCache(self.path, ttl=60)
+        cache.entries["1"] = GrowcubeDiscoveryCacheEntry("1", "127.0.0.2", "3.6", time.time() - 120, 60)
+        cache.entries["2"] = GrowcubeDiscoveryCacheEntry("2", "127.0.0.3", "3.6", time.time(), 60)
+        cache.save()
+        self.assertEqual(["2"], list(GrowcubeDiscoveryCache(self.path).entries))
+
+    async def test_invalid_file(self):
+        with open(self.path, "w") as file:
+            file.write("not json")
+        self.assertEqual({}, GrowcubeDiscoveryCache(self.path).entries)
+
+    async def test_unexpected_file_content(self):
+        for content in ('[]', '"x"', 'null', '{"devices": 5}'):
+            with open(self.path, "w") as file:
+                file.write(content)
+            self.assertEqual({}, GrowcubeDiscoveryCache(self.path).entries, content)
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
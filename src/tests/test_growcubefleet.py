@@ -0,0 +1,87 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, patch
+from growcube_client import GrowcubeFleet, GrowcubeClient, SetWorkModeCommand, WaterStateGrowcubeReport
+from growcube_client.growcubeenums import WorkMode
+
+
+class GrowcubeFleetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.on_message = MagicMock()
+        self.on_connected = MagicMock()
+        self.on_disconnected = MagicMock()
+        self.fleet = GrowcubeFleet(self.on_message, self.on_connected, self.on_disconnected)
+
+    def test_add_device(self):
+        client = self.fleet.add_device("10.0.0.1")
+        self.assertIsInstance(client, GrowcubeClient)
+        self.assertIs(client, self.fleet.add_device("10.0.0.1"))
+        self.assertIs(client, self.fleet.get_client("10.0.0.1"))
+        self.assertEqual(1, len(self.fleet))
+
+    def test_remove_device(self):
+        client = self.fleet.add_device("10.0.0.1")
+        client.transport = MagicMock()
+        self.fleet.remove_device("10.0.0.1")
+        client.transport.close.assert_called_once()
+        self.assertIsNone(self.fleet.get_client("10.0.0.1"))
+
+    def test_message_fan_out(self):
+        second = MagicMock()
+        self.fleet.add_message_callback(second)
+        client = self.fleet.add_device("10.0.0.1")
+        report = WaterStateGrowcubeReport("1")
+        with patch('growcube_client.GrowcubeReport.get_report', return_value=report):
+            client.on_message(MagicMock())
+        self.on_message.assert_called_once_with("10.0.0.1", report)
+        second.assert_called_once_with("10.0.0.1", report)
+        self.assertEqual(1, self.fleet.devices["10.0.0.1"].message_count)
+
+    def test_connection_events(self):
+        client = self.fleet.add_device("10.0.0.1")
+        client.on_connected()
+        self.on_connected.assert_called_once_with("10.0.0.1")
+        self.assertEqual(["10.0.0.1"], self.fleet.connected_hosts)
+        client.on_connection_lost()
+        self.on_disconnected.assert_called_once_with("10.0.0.1")
+        self.assertEqual([], self.fleet.connected_hosts)
+
+    def test_send_command_all(self):
+        for host in ["10.0.0.1", "10.0.0.2"]:
+            client = self.fleet.add_device(host)
+            client.protocol = MagicMock()
+        self.fleet.get_client("10.0.0.1").connected = True
+        result = self.fleet.send_command_all(SetWorkModeCommand(WorkMode.Network))
+        self.assertEqual({"10.0.0.1": True}, result)
+        self.fleet.get_client("10.0.0.2").protocol.send_message.assert_not_called()
+
+
+class GrowcubeFleetConnectTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_connect_all_bounded_concurrency(self):
+        fleet = GrowcubeFleet(max_concurrent_connects=3)
+        running = 0
+        peak = 0
+
+        async def connect(client):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if client.host.endswith(".9"):
+                return False, "refused"
+            return True, ""
+
+        for i in range(10):
+            fleet.add_device(f"10.0.0.{i}")
+        with patch.object(GrowcubeClient, 'connect', autospec=True, side_effect=connect):
+            results = await fleet.connect_all()
+
+        self.assertEqual(10, len(results))
+        self.assertEqual(3, peak)
+        self.assertEqual((False, "refused"), results["10.0.0.9"])
+        self.assertEqual("refused", fleet.devices["10.0.0.9"].last_error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import unittest
+from growcube_client import GrowcubeFrameScanner, GrowcubeReceiveBuffer
+
+
+class GrowcubeFrameScannerTestCase(unittest.TestCase):
+
+    def test_empty(self):
+        scanner = GrowcubeFrameScanner()
+        self.assertIsNone(scanner.next_message())
+        self.assertEqual(0, scanner.pending)
+
+    def test_complete_message(self):
+        scanner = GrowcubeFrameScanner()
+        scanner.feed(b'elea28#1#0#')
+        message = scanner.next_message()
+        self.assertEqual(28, message.command)
+        self.assertEqual("0", message.payload)
+        self.assertEqual(b'elea28#1#0#', message.data)
+        self.assertEqual(0, scanner.pending)
+        self.assertIsNone(scanner.next_message())
+
+    def test_multiple_messages(self):
+        scanner = GrowcubeFrameScanner()
+        scanner.feed(b'elea24#12#3.6@12663500#elea21#10#0@26@41@24#elea33#3#0@1#')
+        commands = []
+        while True:
+            message = scanner.next_message()
+            if message is None:
+                break
+            commands.append(message.command)
+        self.assertEqual([24, 21, 33], commands)
+
+    def test_fragmented_message(self):
+        scanner = GrowcubeFrameScanner()
+        for part in [b'el', b'ea2', b'4#1', b'2#3.6@1266', b'3500', b'#']:
+            self.assertIsNone(scanner.next_message())
+            scanner.feed(part)
+        message = scanner.next_message()
+        self.assertEqual(24, message.command)
+        self.assertEqual("3.6@12663500", message.payload)
+
+    def test_junk_is_skipped(self):
+        scanner = GrowcubeFrameScanner()
+        scanner.feed(b'crapcrapcrap')
+        self.assertIsNone(scanner.next_message())
+        self.assertLess(scanner.pending, len(GrowcubeFrameScanner.HEADER))
+        scanner.feed(b'elea28#1#0#')
+        message = scanner.next_message()
+        self.assertEqual(28, message.command)
+        self.assertEqual(b'elea28#1#0#', message.data)
+
+    def test_invalid_command(self):
+        scanner = GrowcubeFrameScanner(b'eleaxx#1#0#')
+        with self.assertRaises(ValueError):
+            scanner.next_message()
+
+    def test_invalid_payload_length(self):
+        scanner = GrowcubeFrameScanner(b'elea28#x#0#')
+        with self.assertRaises(ValueError):
+            scanner.next_message()
+
+    def test_invalid_frame_skipped_after_error(self):
+        scanner = GrowcubeFrameScanner(b'elea2x#1#0#elea28#x#0#elea28#1#0#')
+        with self.assertRaisesRegex(ValueError, 'Invalid command'):
+            scanner.next_message()
+        with self.assertRaisesRegex(ValueError, 'Invalid payload length'):
+            scanner.next_message()
+        self.assertEqual(b'elea28#1#0#', scanner.next_message().data)
+        self.assertIsNone(scanner.next_message())
+        self.assertEqual(2, scanner.metrics.errors)
+        self.assertEqual(2 * len(b'elea2x#1#0#'), scanner.metrics.discarded)
+
+    def messages(self, scanner):
+        messages = []
+        while True:
+            message = scanner.next_message()
+            if message is None:
+                return messages
+            messages.append(message)
+
+    def test_resync_invalid_command(self):
+        scanner = GrowcubeFrameScanner(b'eleaxx#1#0#elea28#1#0#', resync=True)
+        self.assertEqual([b'elea28#1#0#'], [message.data for message in self.messages(scanner)])
+        self.assertEqual(1, scanner.metrics.errors)
+        self.assertEqual(1, scanner.metrics.frames)
+        self.assertEqual(len(b'eleaxx#1#0#'), scanner.metrics.discarded)
+        self.assertEqual(0, scanner.pending)
+
+    def test_resync_invalid_payload_length(self):
+        scanner = GrowcubeFrameScanner(b'elea28#x#0#elea33#3#0@1#', resync=True)
+        self.assertEqual([33], [message.command for message in self.messages(scanner)])
+        self.assertEqual(1, scanner.metrics.errors)
+
+    def test_resync_truncated_frame(self):
+        # The first frame is cut off, its payload length points into the next frame
+        scanner = GrowcubeFrameScanner(b'elea24#12#3.6@elea21#10#0@26@41@24#', resync=True)
+        self.assertEqual([21], [message.command for message in self.messages(scanner)])
+        self.assertEqual(1, scanner.metrics.errors)
+
+    def test_resync_fragmented(self):
+        scanner = GrowcubeFrameScanner(resync=True)
+        messages = []
+        for part in [b'elea2', b'x#1#0#el', b'ea24#1', b'2#3.6@12663500', b'#']:
+            scanner.feed(part)
+            messages.extend(self.messages(scanner))
+        self.assertEqual(["3.6@12663500"], [message.payload for message in messages])
+        self.assertEqual(1, scanner.metrics.errors)
+
+    def test_frame_too_long(self):
+        scanner = GrowcubeFrameScanner(resync=True)
+        scanner.feed(b'elea21#' + b'1' * (GrowcubeFrameScanner.DEFAULT_MAX_FRAME_SIZE + 10))
+        self.assertEqual([], self.messages(scanner))
+        self.assertEqual(1, scanner.metrics.overflows)
+        self.assertLess(scanner.pending, len(GrowcubeFrameScanner.HEADER))
+        scanner.feed(b'elea99#5000#0#elea28#1#0#')
+        self.assertEqual([28], [message.command for message in self.messages(scanner)])
+        self.assertEqual(2, scanner.metrics.overflows)
+        self.assertEqual(0, scanner.metrics.errors)
+
+    def test_frame_too_long_without_resync(self):
+        scanner = GrowcubeFrameScanner(max_frame_size=16)
+        scanner.feed(b'elea21#10#0@26@41@24#elea28#1#0#elea24#')
+        self.assertEqual([28], [message.command for message in self.messages(scanner)])
+        self.assertEqual(1, scanner.metrics.overflows)
+        scanner.feed(b'12#3.6@12663500#')
+        self.assertEqual([], self.messages(scanner))
+        self.assertEqual(2, scanner.metrics.overflows)
+
+    def test_buffer_overflow(self):
+        scanner = GrowcubeFrameScanner(resync=True, max_frame_size=16, max_buffer_size=32)
+        scanner.feed(b'elea28#1#0#elea28#1#0#elea28#1#0#')
+        self.assertEqual(1, scanner.metrics.overflows)
+        # Only the last 32 bytes are kept, the first frame loses its first byte
+        self.assertEqual(1, scanner.metrics.discarded)
+        self.assertEqual(2, len(self.messages(scanner)))
+        self.assertLessEqual(scanner.buffer.capacity, GrowcubeReceiveBuffer.DEFAULT_CAPACITY)
+
+    def test_memory_bounded(self):
+        scanner = GrowcubeFrameScanner(resync=True, max_frame_size=64, max_buffer_size=256)
+        for _ in range(1000):
+            scanner.feed(b'elea21#1' + b'0' * 300)
+            self.messages(scanner)
+        self.assertLessEqual(scanner.pending, 256)
+        self.assertLessEqual(scanner.buffer.capacity, GrowcubeReceiveBuffer.DEFAULT_CAPACITY)
+        scanner.feed(b'elea28#1#0#')
+        self.assertEqual([28], [message.command for message in self.messages(scanner)])
+
+    def test_resync_waits_for_end_delimiter(self):
+        scanner = GrowcubeFrameScanner(b'elea24#12#3.6@1266', resync=True)
+        self.assertEqual([], self.messages(scanner))
+        scanner.feed(b'3500#')
+        self.assertEqual([24], [message.command for message in self.messages(scanner)])
+        self.assertEqual(0, scanner.metrics.errors)
+
+
+class GrowcubeReceiveBufferTestCase(unittest.TestCase):
+
+    def test_append_and_consume(self):
+        buffer = GrowcubeReceiveBuffer(16)
+        buffer.append(b'0123456789')
+        self.assertEqual(10, len(buffer))
+        self.assertEqual(4, buffer.find(b'45', 0))
+        buffer.consume(4)
+        self.assertEqual(4, buffer.read_position)
+        self.assertEqual(b'456', buffer.read(4, 7))
+        self.assertEqual(-1, buffer.find(b'12', 0))
+
+    def test_consume_all_resets_storage(self):
+        buffer = GrowcubeReceiveBuffer(16)
+        buffer.append(b'0123456789')
+        buffer.consume(10)
+        self.assertEqual(0, len(buffer))
+        buffer.append(b'abc')
+        self.assertEqual(10, buffer.find(b'a', 0))
+        self.assertEqual(b'abc', buffer.read(10, 13))
+        self.assertEqual(0, buffer.compactions)
+
+    def test_compaction_at_watermark(self):
+        buffer = GrowcubeReceiveBuffer(16, watermark=8)
+        buffer.append(b'0123456789')
+        buffer.consume(9)
+        buffer.append(b'abc')
+        self.assertEqual(1, buffer.compactions)
+        self.assertEqual(9, buffer.read_position)
+        self.assertEqual(b'9abc', buffer.read(9, 13))
+        self.assertEqual(16, buffer.capacity)
+
+    def test_growth(self):
+        buffer = GrowcubeReceiveBuffer(4)
+        buffer.append(b'0123456789')
+        self.assertEqual(10, len(buffer))
+        self.assertEqual(b'0123456789', buffer.read(0, 10))
+
+    def test_scanner_does_not_copy_buffer_per_frame(self):
+        buffer = GrowcubeReceiveBuffer()
+        scanner = GrowcubeFrameScanner(buffer=buffer)
+        scanner.feed(b'elea21#10#0@26@41@24#' * 100 + b'elea21#10#0@26')
+        count = 0
+        while scanner.next_message() is not None:
+            count += 1
+        self.assertEqual(100, count)
+        self.assertEqual(0, buffer.compactions)
+        self.assertEqual(len(b'elea21#10#0@26'), len(buffer))
+
+
+if __name__ == '__main__':
+    unittest.main()
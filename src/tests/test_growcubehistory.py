@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch
+from growcube_client import (GrowcubeHistory, GrowcubeSeries, Channel, MoistureHumidityStateGrowcubeReport,
+                             PumpOpenGrowcubeReport)
+from growcube_client import growcubehistory
+
+
+class GrowcubeSeriesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.series = GrowcubeSeries()
+        for i in range(10):
+            self.series.append(100.0 + i * 10, 30 + i, 50, 20 + i % 2)
+
+    def test_append(self):
+        self.assertEqual(10, len(self.series))
+        self.assertEqual((100.0, 30, 50, 20), next(iter(self.series)))
+
+    def test_append_out_of_order(self):
+        with self.assertRaises(ValueError):
+            self.series.append(50.0, 1, 2, 3)
+
+    def test_window(self):
+        window = self.series.window(120, 150)
+        self.assertEqual([120.0, 130.0, 140.0, 150.0], list(window.timestamps))
+        self.assertEqual([32, 33, 34, 35], list(window.moisture))
+        self.assertEqual(10, len(self.series.window()))
+        self.assertEqual(0, len(self.series.window(500)))
+
+    def test_downsample(self):
+        result = self.series.downsample(40)
+        self.assertEqual([80.0, 120.0, 160.0], list(result.timestamps))
+        self.assertEqual([30, 34, 38], list(result.moisture))
+        self.assertEqual([50, 50, 50], list(result.humidity))
+
+    def test_bytes_per_sample(self):
+        series = GrowcubeSeries()
+        for i in range(10000):
+            series.append(float(i), i % 100, 50, 20)
+        self.assertEqual(14, series.nbytes / len(series))
+
+    def test_append_while_exported(self):
+        # to_numpy exports the column buffers the same way
+        views = [memoryview(column) for column in self.series._columns()]
+        self.series.append(200.0, 1, 2, 3)
+        self.assertEqual(11, len(self.series))
+        self.assertEqual((200.0, 1, 2, 3), list(self.series)[-1])
+        self.assertEqual(10, len(views[1]))
+        self.assertEqual(39, views[1][-1])
+        for view in views:
+            view.release()
+
+    @unittest.skipIf(growcubehistory.numpy is None, "NumPy is not installed")
+    def test_to_numpy(self):
+        arrays = self.series.to_numpy()
+        self.assertEqual(10, len(arrays['moisture']))
+        self.assertEqual(39, arrays['moisture'][-1])
+
+    @unittest.skipIf(growcubehistory.numpy is not None, "NumPy is installed")
+    def test_to_numpy_without_numpy(self):
+        with self.assertRaises(ImportError):
+            self.series.to_numpy()
+
+
+class GrowcubeHistoryTestCase(unittest.TestCase):
+    def test_record(self):
+        history = GrowcubeHistory()
+        self.assertTrue(history.record("cube1", MoistureHumidityStateGrowcubeReport("1@63@62@26"), 10.0))
+        self.assertTrue(history.record("cube1", MoistureHumidityStateGrowcubeReport("1@64@62@26"), 20.0))
+        self.assertTrue(history.record("cube2", MoistureHumidityStateGrowcubeReport("0@40@62@26"), 20.0))
+        self.assertFalse(history.record("cube1", PumpOpenGrowcubeReport("1")))
+        self.assertEqual(3, len(history))
+        self.assertEqual([63, 64], list(history.series("cube1", Channel.Channel_B).moisture))
+        self.assertEqual({("cube1", Channel.Channel_B), ("cube2", Channel.Channel_A)}, set(history.keys))
+
+    def test_record_clock_set_back(self):
+        history = GrowcubeHistory()
+        self.assertTrue(history.record("cube1", MoistureHumidityStateGrowcubeReport("1@63@62@26"), 20.0))
+        self.assertTrue(history.record("cube1", MoistureHumidityStateGrowcubeReport("1@64@62@26"), 10.0))
+        series = history.series("cube1", Channel.Channel_B)
+        self.assertEqual([20.0, 20.0], list(series.timestamps))
+        self.assertEqual([63, 64], list(series.moisture))
+
+    def test_record_current_time_set_back(self):
+        history = GrowcubeHistory()
+        with patch('time.time', side_effect=[1000.0, 900.0]):
+            history.record("cube1", MoistureHumidityStateGrowcubeReport("1@63@62@26"))
+            history.record("cube1", MoistureHumidityStateGrowcubeReport("1@64@62@26"))
+        self.assertEqual([1000.0, 1000.0], list(history.series("cube1", Channel.Channel_B).timestamps))
+
+    def test_record_while_exported(self):
+        history = GrowcubeHistory()
+        history.record("cube1", MoistureHumidityStateGrowcubeReport("1@63@62@26"), 10.0)
+        view = memoryview(history.series("cube1", Channel.Channel_B).moisture)
+        self.assertTrue(history.record("cube1", MoistureHumidityStateGrowcubeReport("1@64@62@26"), 20.0))
+        self.assertEqual([63, 64], list(history.series("cube1", Channel.Channel_B).moisture))
+        self.assertEqual([63], view.tolist())
+        view.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -65,6 +65,13 @@ class GrowCubeMessageTestCase(unittest.TestCase):
         self.assertIsNone(message)
         self.assertEqual(data[new_index:], b"elea24#12#3.6@12663500")
 
+    def test_long_message(self):
+        payload = "x" * 2000
+        data = f"elea24#{len(payload)}#{payload}#".encode('ascii')
+        new_index, message = GrowcubeMessage.from_bytes(data)
+        self.assertEqual(len(data), new_index)
+        self.assertEqual(payload, message.payload)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -6,6 +6,8 @@ from growcube_client import GrowcubeProtocol, GrowcubeMessage
 
 class GrowcubeProtocolTestCase(unittest.TestCase):
     def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
         self.on_connected = MagicMock()
         self.on_message = MagicMock()
         self.on_connection_lost = MagicMock()
@@ -17,6 +19,9 @@ class GrowcubeProtocolTestCase(unittest.TestCase):
         self.transport = MagicMock()
         self.protocol.transport = self.transport
 
+    def tearDown(self):
+        self.loop.close()
+
     def test_connection_made(self):
         # Create a new transport mock to test connection_made
         transport = MagicMock()
@@ -29,48 +34,75 @@ class GrowcubeProtocolTestCase(unittest.TestCase):
             self.on_connected.assert_called_once()
             mock_reset_timeout.assert_called_once()
 
-    @patch('growcube_client.GrowcubeMessage.from_bytes')
-    def test_data_received_complete_message(self, mock_from_bytes):
-        # Mock a complete message
-        mock_message = MagicMock()
-        mock_from_bytes.return_value = (10, mock_message)  # 10 bytes consumed, message returned
-        
+    def test_data_received_complete_message(self):
         # Reset the timeout handle mock
         with patch.object(self.protocol, '_reset_timeout') as mock_reset_timeout:
             self.protocol.data_received(b'elea28#1#0#')
-            
+
             mock_reset_timeout.assert_called_once()
-            mock_from_bytes.assert_called_once()
-            self.on_message.assert_called_once_with(mock_message)
+            self.on_message.assert_called_once()
+            message = self.on_message.call_args[0][0]
+            self.assertEqual(28, message.command)
+            self.assertEqual("0", message.payload)
 
-    @patch('growcube_client.GrowcubeMessage.from_bytes')
-    def test_data_received_incomplete_message(self, mock_from_bytes):
-        # Mock an incomplete message
-        mock_from_bytes.return_value = (0, None)  # 0 bytes consumed, no message
-        
+    def test_data_received_incomplete_message(self):
         # Reset the timeout handle mock
         with patch.object(self.protocol, '_reset_timeout') as mock_reset_timeout:
             self.protocol.data_received(b'elea')
-            
+
             mock_reset_timeout.assert_called_once()
-            mock_from_bytes.assert_called_once()
             self.on_message.assert_not_called()
 
-    @patch('growcube_client.GrowcubeMessage.from_bytes')
-    def test_data_received_with_null_bytes(self, mock_from_bytes):
-        # Mock a message with null bytes
-        mock_message = MagicMock()
-        mock_from_bytes.return_value = (10, mock_message)  # 10 bytes consumed, message returned
-        
+    def test_data_received_with_null_bytes(self):
         # Reset the timeout handle mock
         with patch.object(self.protocol, '_reset_timeout') as mock_reset_timeout:
             self.protocol.data_received(b'elea28\x00#1#0#')
-            
+
             mock_reset_timeout.assert_called_once()
             # Check that null bytes were filtered out
-            mock_from_bytes.assert_called_once()
-            self.assertEqual(b'elea28#1#0#', mock_from_bytes.call_args[0][0])
-            self.on_message.assert_called_once_with(mock_message)
+            self.on_message.assert_called_once()
+            self.assertEqual(b'elea28#1#0#', self.on_message.call_args[0][0].data)
+
+    def test_data_received_fragmented_messages(self):
+        with patch.object(self.protocol, '_reset_timeout'):
+            self.protocol.data_received(b'crapelea24#12#3.6@126')
+            self.protocol.data_received(b'63500#elea28#1#0#ele')
+            self.protocol.data_received(b'a33#3#0@1#')
+
+            self.assertEqual([24, 28, 33],
+                             [call[0][0].command for call in self.on_message.call_args_list])
+
+    def test_data_received_malformed_frame(self):
+        with patch.object(self.protocol, '_reset_timeout'):
+            self.protocol.data_received(b'eleaxx#1#0#\x00\x00elea28#1#0#')
+            self.protocol.data_received(b'elea28#x#0#elea33#3#0@1#')
+
+            self.assertEqual([28, 33], [call[0][0].command for call in self.on_message.call_args_list])
+            self.assertEqual(2, self.protocol.receive_metrics.errors)
+            self.assertEqual(2, self.protocol.receive_metrics.frames)
+
+    def test_data_received_larger_than_buffer(self):
+        protocol = GrowcubeProtocol(None, self.on_message, None, max_frame_size=32, max_buffer_size=64)
+        protocol.data_received(b'elea28#1#0#' * 20)
+        self.assertEqual(20, self.on_message.call_count)
+        self.assertEqual(0, protocol.receive_metrics.overflows)
+
+        protocol.data_received(b'elea21#1' + b'0' * 200 + b'elea28#1#0#')
+        self.assertEqual(21, self.on_message.call_count)
+        self.assertEqual(1, protocol.receive_metrics.overflows)
+
+    def test_data_received_large_chunk_in_parts(self):
+        protocol = GrowcubeProtocol(None, self.on_message, None, max_frame_size=32, max_buffer_size=64)
+        protocol.data_received(b'elea28#1#0#elea2')
+        chunk = b'8#1#0#' + b'elea21#7#1@63@62#' * 5000
+        with patch.object(protocol._scanner, 'feed', wraps=protocol._scanner.feed) as mock_feed:
+            protocol.data_received(chunk)
+        self.assertEqual(5002, self.on_message.call_count)
+        self.assertEqual(0, protocol.receive_metrics.overflows)
+        # The parts are views of the chunk, covering it once
+        parts = [call.args[0] for call in mock_feed.call_args_list]
+        self.assertTrue(all(isinstance(part, memoryview) for part in parts))
+        self.assertEqual(len(chunk), sum(len(part) for part in parts))
 
     def test_send_message(self):
         # Reset the timeout handle mock
@@ -85,34 +117,116 @@ class GrowcubeProtocolTestCase(unittest.TestCase):
         exc = Exception("Test exception")
         
         # Mock the timeout handle
-        self.protocol._timeout_handle = MagicMock()
+        timeout_handle = MagicMock()
+        self.protocol._timeout_handle = timeout_handle
         
         self.protocol.connection_lost(exc)
         
-        self.protocol._timeout_handle.cancel.assert_called_once()
+        timeout_handle.cancel.assert_called_once()
+        self.assertIsNone(self.protocol._timeout_handle)
         self.on_connection_lost.assert_called_once()
 
-    @patch('asyncio.get_event_loop')
-    def test_reset_timeout(self, mock_get_event_loop):
-        # Mock the loop and timeout handle
+    def test_reset_timeout(self):
+        # Mock the loop
         mock_loop = MagicMock()
-        mock_get_event_loop.return_value = mock_loop
-        mock_timeout_handle = MagicMock()
-        self.protocol._timeout_handle = mock_timeout_handle
+        mock_loop.time.return_value = 100.0
         self.protocol._loop = mock_loop
-        
+
         self.protocol._reset_timeout()
-        
-        # Check that the old timeout handle was canceled
-        mock_timeout_handle.cancel.assert_called_once()
-        # Check that a new timeout handle was created
-        mock_loop.call_later.assert_called_once()
+        self.protocol._reset_timeout()
+
+        # Check that a single timer was armed for the deadline
+        mock_loop.call_at.assert_called_once_with(130.0, self.protocol._check_timeout)
+        self.assertEqual(100.0, self.protocol._last_activity)
 
     def test_check_timeout(self):
+        self.protocol._last_activity = self.loop.time() - 31
         self.protocol._check_timeout()
         
         # Check that the transport was aborted
         self.transport.abort.assert_called_once()
+        self.assertIsNone(self.protocol._timeout_handle)
+
+    def test_check_timeout_after_activity(self):
+        mock_loop = MagicMock()
+        mock_loop.time.return_value = 120.0
+        self.protocol._loop = mock_loop
+        self.protocol._last_activity = 100.0
+
+        self.protocol._check_timeout()
+
+        # Check that the timer was re-armed for the new deadline instead of aborting
+        self.transport.abort.assert_not_called()
+        mock_loop.call_at.assert_called_once_with(130.0, self.protocol._check_timeout)
+
+
+class GrowcubeProtocolSendQueueTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.protocol = GrowcubeProtocol(MagicMock(), MagicMock(), MagicMock(), coalesce_writes=True)
+        self.transport = MagicMock()
+        self.protocol.transport = self.transport
+
+    async def asyncTearDown(self):
+        self.protocol.connection_lost(None)
+
+    async def test_coalesce_writes(self):
+        self.protocol.send_message(b'one')
+        self.protocol.send_message(b'two')
+        self.assertEqual(2, self.protocol.queue_depth)
+        self.transport.write.assert_not_called()
+        await asyncio.sleep(0)
+        self.transport.writelines.assert_called_once_with([b'one', b'two'])
+        self.assertEqual(0, self.protocol.queue_depth)
+        metrics = self.protocol.send_metrics
+        self.assertEqual((2, 1, 2, 2), (metrics.queued, metrics.writes, metrics.written, metrics.max_depth))
+
+    async def test_pacing(self):
+        self.protocol.send_interval = 0.02
+        self.protocol.max_batch = 1
+        loop = asyncio.get_running_loop()
+        times = []
+        self.transport.writelines.side_effect = lambda batch: times.append(loop.time())
+        for message in (b'one', b'two', b'three'):
+            self.protocol.send_message(message)
+        await asyncio.sleep(0.1)
+        self.assertEqual([[b'one'], [b'two'], [b'three']],
+                         [call.args[0] for call in self.transport.writelines.call_args_list])
+        self.assertGreaterEqual(times[2] - times[0], 0.035)
+
+    async def test_connection_lost_drops_queue(self):
+        self.protocol.send_message(b'one')
+        self.protocol.connection_lost(None)
+        await asyncio.sleep(0)
+        self.transport.writelines.assert_not_called()
+        self.assertEqual(1, self.protocol.send_metrics.dropped)
+
+
+class GrowcubeProtocolPaddedCaptureTestCase(unittest.TestCase):
+    # Frames as sent by the device, each padded with NUL characters
+    CAPTURE = (b'elea24#12#3.6@12663500#' + b'\x00' * 41 +
+               b'elea33#3#0@0#' + b'\x00' * 51 +
+               b'elea20#1#1#' + b'\x00' * 53 +
+               b'elea21#10#0@26@41@24#' + b'\x00' * 43 +
+               b'elea21#10#1@26@41@24#' + b'\x00' * 43) * 40
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_null_padding_removal(self):
+        data = self.CAPTURE
+        self.assertEqual(bytearray(filter(lambda c: c != 0, data)), data.replace(b'\x00', b''))
+
+    def test_data_received_padded_capture(self):
+        messages = []
+        protocol = GrowcubeProtocol(None, messages.append, None)
+        protocol._reset_timeout = lambda: None
+        for _ in range(3):
+            protocol.data_received(self.CAPTURE)
+        self.assertEqual(3 * 5 * 40, len(messages))
 
 
 if __name__ == '__main__':
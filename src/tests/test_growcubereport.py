@@ -1,4 +1,6 @@
+import tracemalloc
 import unittest
+from datetime import datetime
 from growcube_client import *
 
 
@@ -18,6 +20,33 @@ class GrowCubeReportTestCase(unittest.TestCase):
         self.assertEqual(62, report.humidity)
         self.assertEqual(26, report.temperature)
 
+    def test_curve_report(self):
+        report = CurveGrowcubeReport("1@2023@7@13@14@45")
+        self.assertEqual(Channel.Channel_B, report.channel)
+        self.assertEqual((2023, 7, 13, 14, 45), report.values)
+        self.assertEqual(datetime(2023, 7, 13, 14), report.timestamp)
+        self.assertEqual(45, report.moisture)
+
+    def test_curve_report_short_payload(self):
+        report = CurveGrowcubeReport("2@17")
+        self.assertEqual(Channel.Channel_C, report.channel)
+        self.assertIsNone(report.timestamp)
+        self.assertIsNone(report.moisture)
+
+    def test_curve_report_empty_field(self):
+        report = CurveGrowcubeReport("1@2023@@13@14@45")
+        self.assertEqual((2023, None, 13, 14, 45), report.values)
+        self.assertIsNone(report.timestamp)
+        self.assertEqual(45, report.moisture)
+        report = CurveGrowcubeReport("1@2023@7@13@14@")
+        self.assertEqual(datetime(2023, 7, 13, 14), report.timestamp)
+        self.assertIsNone(report.moisture)
+
+    def test_get_report_curve(self):
+        report = GrowcubeReport.get_report(GrowcubeMessage(22, "0@2023@7@13@14@45", b""))
+        self.assertIsInstance(report, CurveGrowcubeReport)
+        self.assertEqual("RepCurveCmd", report.command)
+
     def test_auto_water_report(self):
         report = AutoWaterGrowcubeReport("2@2023@7@13@14@23")
         self.assertEqual(Channel.Channel_C, report.channel)
@@ -86,6 +115,94 @@ class GrowCubeReportTestCase(unittest.TestCase):
         self.assertEqual("Unknown response: 99", report._command)
         self.assertEqual("1, 2, 3", report.data)
 
+    def test_get_report_dispatch(self):
+        report = GrowcubeReport.get_report(GrowcubeMessage(21, "1@63@62@26", b""))
+        self.assertIsInstance(report, MoistureHumidityStateGrowcubeReport)
+        self.assertEqual(63, report.moisture)
+
+    def test_get_report_unknown(self):
+        report = GrowcubeReport.get_report(GrowcubeMessage(99, "1@2", b""))
+        self.assertIsInstance(report, UnknownGrowcubeReport)
+
+    def test_register_report_class(self):
+        @GrowcubeReport.register(98, "RepTestCmd")
+        class TestGrowcubeReport(GrowcubeReport):
+            def __init__(self, data):
+                GrowcubeReport.__init__(self, 98)
+                self.data = data
+
+        try:
+            report = GrowcubeReport.get_report(GrowcubeMessage(98, "xyz", b""))
+            self.assertIsInstance(report, TestGrowcubeReport)
+            self.assertEqual("RepTestCmd", report.command)
+            self.assertEqual("xyz", report.data)
+        finally:
+            del GrowcubeReport.ReportClasses[98]
+            del GrowcubeReport.Response[98]
+
+    def test_unregistered_slotted_subclass(self):
+        class TestGrowcubeReport(GrowcubeReport):
+            # Not registered, so the command name is stored per instance
+            __slots__ = ('_command', 'value')
+
+            def __init__(self, command, data):
+                GrowcubeReport.__init__(self, command)
+                self.value = data
+
+        self.assertEqual("RepLockstateCmd", TestGrowcubeReport(33, "1").command)
+        self.assertEqual("Unknown response: 97", TestGrowcubeReport(97, "1").command)
+
+    def test_registered_class_has_class_command(self):
+        report = PumpOpenGrowcubeReport("1")
+        self.assertEqual("RepPumpOpenCmd", PumpOpenGrowcubeReport._command)
+        self.assertNotIn('_command', PumpOpenGrowcubeReport.__slots__)
+        self.assertEqual("RepPumpOpenCmd", report.command)
+        # A registered class can't be reused for another command value
+        with self.assertRaises(ValueError):
+            GrowcubeReport.__init__(report, 27)
+
+    def test_str_is_description(self):
+        report = MoistureHumidityStateGrowcubeReport("1@63@62@26")
+        self.assertEqual(report.get_description(), str(report))
+
+    def test_reports_have_no_instance_dict(self):
+        for report in [WaterStateGrowcubeReport('1'), MoistureHumidityStateGrowcubeReport("1@63@62@26"),
+                       PumpOpenGrowcubeReport("0"), LockStateGrowcubeReport("1@1"),
+                       UnknownGrowcubeReport(99, "1@2@3")]:
+            self.assertFalse(hasattr(report, '__dict__'), type(report).__name__)
+        self.assertEqual("RepSTHSateCmd", MoistureHumidityStateGrowcubeReport("1@63@62@26").command)
+
+
+class GrowCubeReportMemoryTestCase(unittest.TestCase):
+    class DictMoistureHumidityStateReport:
+        # Layout of MoistureHumidityStateGrowcubeReport before __slots__ was used
+        def __init__(self, data: str):
+            self._command = GrowcubeReport.Response[21]
+            values = data.split(GrowcubeReport.CMD_INNER)
+            self._channel = Channel(int(values[0]))
+            self._moisture = int(values[1])
+            self._humidity = int(values[2])
+            self._temperature = int(values[3])
+
+    @staticmethod
+    def _bytes_per_report(report_class, count=10000) -> float:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            reports = [report_class(f"{i % 4}@{i % 100}@62@26") for i in range(count)]
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        del reports
+        return size / count
+
+    def test_bytes_per_retained_report(self):
+        with_dict = self._bytes_per_report(self.DictMoistureHumidityStateReport)
+        slotted = self._bytes_per_report(MoistureHumidityStateGrowcubeReport)
+        # Four slots and no __dict__ or per-instance command name, about 72 bytes against about 121 here
+        self.assertLess(slotted, 0.7 * with_dict,
+                        f"{slotted:.1f} bytes per slotted report, {with_dict:.1f} bytes with a __dict__")
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, patch
+from growcube_client import (GrowcubeClient, GrowcubeReportStream, OverflowPolicy, WaterStateGrowcubeReport,
+                             PumpOpenGrowcubeReport)
+
+
+class GrowcubeReportStreamTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_iterate_reports(self):
+        stream = GrowcubeReportStream(10)
+        reports = [PumpOpenGrowcubeReport(str(i)) for i in range(3)]
+        for report in reports:
+            stream.put(report)
+        stream.close()
+        received = [report async for report in stream]
+        self.assertEqual(reports, received)
+
+    async def test_reader_waits_for_report(self):
+        stream = GrowcubeReportStream(10)
+        report = WaterStateGrowcubeReport("1")
+        asyncio.get_running_loop().call_soon(stream.put, report)
+        self.assertIs(report, await asyncio.wait_for(stream.__anext__(), 1))
+
+    async def test_drop_oldest(self):
+        stream = GrowcubeReportStream(2, OverflowPolicy.DropOldest)
+        reports = [PumpOpenGrowcubeReport(str(i)) for i in range(4)]
+        for report in reports:
+            stream.put(report)
+        stream.close()
+        self.assertEqual(reports[2:], [report async for report in stream])
+        self.assertEqual(2, stream.dropped)
+
+    async def test_drop_newest(self):
+        stream = GrowcubeReportStream(2, OverflowPolicy.DropNewest)
+        reports = [PumpOpenGrowcubeReport(str(i)) for i in range(4)]
+        for report in reports:
+            stream.put(report)
+        stream.close()
+        self.assertEqual(reports[:2], [report async for report in stream])
+        self.assertEqual(2, stream.dropped)
+
+    async def test_block_pauses_reading(self):
+        pause = MagicMock()
+        resume = MagicMock()
+        stream = GrowcubeReportStream(4, OverflowPolicy.Block, pause, resume)
+        for i in range(5):
+            stream.put(PumpOpenGrowcubeReport(str(i % 4)))
+        pause.assert_called_once()
+        self.assertEqual(5, len(stream))
+        self.assertEqual(0, stream.dropped)
+        for _ in range(2):
+            await stream.__anext__()
+        resume.assert_not_called()
+        await stream.__anext__()
+        resume.assert_called_once()
+
+
+class GrowcubeClientReportsTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_client_reports(self):
+        client = GrowcubeClient("127.0.0.1", None)
+        client.transport = MagicMock()
+        stream = client.reports(2, OverflowPolicy.Block)
+        report = WaterStateGrowcubeReport("1")
+        with patch('growcube_client.GrowcubeReport.get_report', return_value=report):
+            for _ in range(2):
+                client.on_message(MagicMock())
+        client.transport.pause_reading.assert_called_once()
+
+        self.assertIs(report, await stream.__anext__())
+        client.transport.resume_reading.assert_called_once()
+
+        client.disconnect()
+        self.assertEqual([report], [report async for report in stream])
+        self.assertEqual([], client._report_streams)
+
+
+if __name__ == '__main__':
+    unittest.main()
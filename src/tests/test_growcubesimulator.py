@@ -0,0 +1,78 @@
+import unittest
+import asyncio
+import sys
+from unittest.mock import MagicMock
+from growcube_client import (GrowcubeSimulator, GrowcubeClient, GrowcubeFleet, Channel, WaterCommand,
+                             GrowcubeCommand, DeviceVersionGrowcubeReport, MoistureHumidityStateGrowcubeReport)
+
+
+class GrowcubeSimulatorTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.simulator = GrowcubeSimulator(port=0, report_interval=0.02, fragment_size=7)
+        await self.simulator.start()
+        self.reports = []
+        self.client = GrowcubeClient("127.0.0.1", self.reports.append)
+        self.client.port = self.simulator.port
+
+    async def asyncTearDown(self):
+        self.client.disconnect()
+        await self.simulator.close()
+
+    async def test_connect_reports(self):
+        self.assertEqual((True, ""), await self.client.connect())
+        await asyncio.sleep(0.1)
+        self.assertIsInstance(self.reports[0], DeviceVersionGrowcubeReport)
+        self.assertEqual("12663500", self.client.state.device_id)
+        self.assertGreater(len([r for r in self.reports if isinstance(r, MoistureHumidityStateGrowcubeReport)]), 4)
+        self.assertEqual(self.simulator.moisture[Channel.Channel_A], self.client.state.channel(Channel.Channel_A).moisture)
+        self.assertEqual(1, self.simulator.connections)
+
+    async def test_water_acknowledged(self):
+        await self.client.connect()
+        self.assertTrue(await self.client.water_plant(Channel.Channel_B, 0.01, acknowledged=True))
+        self.assertEqual(2, self.client.command_metrics.acknowledged)
+        self.assertEqual([False] * 4, self.simulator.pumps)
+
+    async def test_invalid_commands_ignored(self):
+        await self.client.connect()
+        for command, payload in ((GrowcubeCommand.CMD_REQ_WATER, "x@1"), (GrowcubeCommand.CMD_REQ_WATER, "7@1"),
+                                 (GrowcubeCommand.CMD_CLOSE_PUMP, "-1"), (GrowcubeCommand.CMD_REQ_CURVE_DATA, "")):
+            self.client.send_command(GrowcubeCommand(command, payload))
+        self.assertTrue(await self.client.water_plant(Channel.Channel_A, 0.01, acknowledged=True))
+        self.assertEqual(6, self.simulator.commands_received)
+        self.assertEqual([False] * 4, self.simulator.pumps)
+
+    async def test_download_curve(self):
+        self.simulator.curve_points = 5
+        await self.client.connect()
+        points = [point async for point in self.client.download_curve(Channel.Channel_C, timeout=1)]
+        self.assertEqual(5, len(points))
+        self.assertEqual(self.simulator.moisture[Channel.Channel_C], points[-1].moisture)
+
+    async def test_lock_state(self):
+        await self.client.connect()
+        await asyncio.sleep(0.05)
+        self.simulator.set_locked(True)
+        await asyncio.sleep(0.05)
+        self.assertTrue(self.client.state.locked)
+
+    # Loopback addresses other than 127.0.0.1 need aliases on other systems
+    @unittest.skipUnless(sys.platform.startswith('linux'), "Needs the 127.0.0.0/8 loopback network")
+    async def test_many_simulators(self):
+        simulators = await GrowcubeSimulator.start_many(50, port=0, report_interval=None)
+        try:
+            fleet = GrowcubeFleet(MagicMock())
+            for simulator in simulators:
+                fleet.add_device(simulator.host).port = simulator.port
+            results = await fleet.connect_all()
+            self.assertTrue(all(result[0] for result in results.values()))
+            await asyncio.sleep(0.05)
+            device_ids = {device.client.state.device_id for device in fleet.devices.values()}
+            self.assertEqual({simulator.device_id for simulator in simulators}, device_ids)
+            fleet.disconnect_all()
+        finally:
+            await asyncio.gather(*[simulator.close() for simulator in simulators])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, patch
+from growcube_client import *
+
+
+class GrowcubeDeviceStateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = GrowcubeDeviceState()
+
+    def test_initial_state(self):
+        self.assertIsNone(self.state.humidity)
+        self.assertEqual(4, len(self.state.channels))
+        self.assertIsNone(self.state.channel(Channel.Channel_A).moisture)
+        self.assertIsNone(self.state.updated)
+
+    def test_moisture_humidity(self):
+        self.assertTrue(self.state.update(MoistureHumidityStateGrowcubeReport("1@63@62@26")))
+        self.assertEqual(63, self.state.channel(Channel.Channel_B).moisture)
+        self.assertEqual(62, self.state.humidity)
+        self.assertEqual(26, self.state.temperature)
+        self.assertIsNone(self.state.channel(Channel.Channel_A).moisture)
+        self.assertIsNotNone(self.state.updated)
+
+    def test_unchanged_value(self):
+        self.state.update(MoistureHumidityStateGrowcubeReport("1@63@62@26"))
+        self.assertFalse(self.state.update(MoistureHumidityStateGrowcubeReport("1@63@62@26")))
+
+    def test_pump(self):
+        self.state.update(PumpOpenGrowcubeReport("2"))
+        self.assertTrue(self.state.channel(Channel.Channel_C).pump_open)
+        self.state.update(PumpCloseGrowcubeReport("2"))
+        self.assertFalse(self.state.channel(Channel.Channel_C).pump_open)
+
+    def test_flags(self):
+        self.state.update(WaterStateGrowcubeReport("0"))
+        self.state.update(LockStateGrowcubeReport("1@1"))
+        self.state.update(DeviceVersionGrowcubeReport("3.6@12663500"))
+        self.state.update(CheckSensorGrowcubeReport("0"))
+        self.state.update(CheckSensorNotConnectedGrowcubeReport("1"))
+        self.state.update(CheckOutletLockedGrowcubeReport("2"))
+        self.state.update(CheckOutletBlockedGrowcubeReport("3"))
+        self.assertTrue(self.state.water_warning)
+        self.assertTrue(self.state.locked)
+        self.assertEqual("12663500", self.state.device_id)
+        self.assertTrue(self.state.channel(Channel.Channel_A).sensor_fault)
+        self.assertTrue(self.state.channel(Channel.Channel_B).sensor_disconnected)
+        self.assertTrue(self.state.channel(Channel.Channel_C).outlet_locked)
+        self.assertTrue(self.state.channel(Channel.Channel_D).outlet_blocked)
+
+    def test_unhandled_report(self):
+        self.assertFalse(self.state.update(UnknownGrowcubeReport(99, "1")))
+
+    def test_snapshot(self):
+        self.state.update(MoistureHumidityStateGrowcubeReport("0@10@62@26"))
+        snapshot = self.state.snapshot()
+        self.state.update(MoistureHumidityStateGrowcubeReport("0@20@62@26"))
+        self.assertEqual(10, snapshot.channel(Channel.Channel_A).moisture)
+        self.assertEqual(20, self.state.channel(Channel.Channel_A).moisture)
+
+    def test_listener_without_window(self):
+        listener = MagicMock()
+        self.state.add_listener(listener)
+        self.state.update(PumpOpenGrowcubeReport("0"))
+        self.state.update(PumpOpenGrowcubeReport("0"))
+        listener.assert_called_once_with(self.state)
+
+    def test_client_updates_state(self):
+        client = GrowcubeClient("127.0.0.1", None)
+        with patch('growcube_client.GrowcubeReport.get_report', return_value=PumpOpenGrowcubeReport("1")):
+            client.on_message(MagicMock())
+        self.assertTrue(client.state.channel(Channel.Channel_B).pump_open)
+
+
+class GrowcubeDeviceStateCoalesceTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesced_notification(self):
+        state = GrowcubeDeviceState(coalesce_window=0.01)
+        listener = MagicMock()
+        state.add_listener(listener)
+        for i in range(4):
+            state.update(MoistureHumidityStateGrowcubeReport(f"{i}@{i + 10}@62@26"))
+        listener.assert_not_called()
+        await asyncio.sleep(0.05)
+        listener.assert_called_once_with(state)
+        self.assertEqual(13, state.channel(Channel.Channel_D).moisture)
+
+
+if __name__ == '__main__':
+    unittest.main()
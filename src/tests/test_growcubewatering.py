@@ -0,0 +1,118 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock
+from growcube_client import GrowcubeWateringScheduler, WaterCommand
+from growcube_client.growcubeenums import Channel
+
+
+def make_client(host: str) -> MagicMock:
+    client = MagicMock()
+    client.host = host
+    client.send_command.return_value = True
+    return client
+
+
+def pump_states(client: MagicMock) -> list:
+    result = []
+    for call in client.send_command.call_args_list:
+        command = call.args[0]
+        assert isinstance(command, WaterCommand)
+        result.append(command.get_message())
+    return result
+
+
+class GrowcubeWateringSchedulerTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.scheduler = GrowcubeWateringScheduler(resolution=0.01, wheel_size=8)
+
+    async def test_parallel_jobs(self):
+        clients = [make_client(f"10.0.0.{i}") for i in range(3)]
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        jobs = [self.scheduler.start(client, channel, 0.05) for client in clients for channel in Channel]
+        self.assertEqual(12, len(self.scheduler.jobs))
+        results = await asyncio.gather(*[job.wait() for job in jobs])
+        self.assertTrue(all(results))
+        self.assertLess(loop.time() - start, 0.5)
+        self.assertEqual([], self.scheduler.jobs)
+        for client in clients:
+            self.assertEqual(8, client.send_command.call_count)
+            self.assertEqual([WaterCommand(channel, True).get_message() for channel in Channel] +
+                             [WaterCommand(channel, False).get_message() for channel in Channel],
+                             pump_states(client))
+
+    async def test_long_job_wraps_wheel(self):
+        client = make_client("10.0.0.1")
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        job = self.scheduler.start(client, Channel.Channel_A, 0.2)
+        self.assertTrue(await job.wait())
+        self.assertGreaterEqual(loop.time() - start, 0.19)
+        self.assertFalse(job.cancelled)
+
+    async def test_cancel(self):
+        client = make_client("10.0.0.1")
+        job = self.scheduler.start(client, Channel.Channel_B, 10)
+        self.assertTrue(self.scheduler.cancel(job))
+        self.assertTrue(job.done)
+        self.assertTrue(job.cancelled)
+        self.assertEqual([WaterCommand(Channel.Channel_B, True).get_message(),
+                          WaterCommand(Channel.Channel_B, False).get_message()], pump_states(client))
+        self.assertIsNone(self.scheduler._timer)
+
+    async def test_shutdown_stops_all_pumps(self):
+        client = make_client("10.0.0.1")
+        jobs = [self.scheduler.start(client, channel, 10) for channel in Channel]
+        self.assertTrue(self.scheduler.shutdown())
+        self.assertTrue(all(job.done and job.cancelled for job in jobs))
+        self.assertEqual([WaterCommand(channel, False).get_message() for channel in Channel],
+                         pump_states(client)[4:])
+        self.assertEqual([], self.scheduler.jobs)
+
+    async def test_restart_replaces_job(self):
+        client = make_client("10.0.0.1")
+        first = self.scheduler.start(client, Channel.Channel_A, 10)
+        second = self.scheduler.start(client, Channel.Channel_A, 0.02)
+        self.assertTrue(first.done)
+        self.assertEqual([second], self.scheduler.jobs)
+        await second.wait()
+        self.assertEqual(3, client.send_command.call_count)
+
+    async def test_restart_failure_stops_previous_job(self):
+        client = make_client("10.0.0.1")
+        first = self.scheduler.start(client, Channel.Channel_A, 10)
+        client.send_command.side_effect = [False, True]
+        second = self.scheduler.start(client, Channel.Channel_A, 10)
+        self.assertFalse(await second.wait())
+        self.assertTrue(await first.wait())
+        self.assertTrue(first.cancelled)
+        self.assertEqual([WaterCommand(Channel.Channel_A, True).get_message()] * 2 +
+                         [WaterCommand(Channel.Channel_A, False).get_message()], pump_states(client))
+        self.assertEqual([], self.scheduler.jobs)
+
+    async def test_restart_failure_stop_failure(self):
+        client = make_client("10.0.0.1")
+        first = self.scheduler.start(client, Channel.Channel_A, 10)
+        client.send_command.return_value = False
+        self.scheduler.start(client, Channel.Channel_A, 10)
+        self.assertFalse(await first.wait())
+        self.assertEqual([], self.scheduler.jobs)
+
+    async def test_start_failure(self):
+        client = make_client("10.0.0.1")
+        client.send_command.return_value = False
+        job = self.scheduler.start(client, Channel.Channel_A, 10)
+        self.assertTrue(job.done)
+        self.assertFalse(await job.wait())
+        self.assertEqual([], self.scheduler.jobs)
+
+    async def test_stop_retry(self):
+        client = make_client("10.0.0.1")
+        job = self.scheduler.start(client, Channel.Channel_A, 10)
+        client.send_command.side_effect = [False, True]
+        self.assertTrue(self.scheduler.cancel(job))
+        self.assertEqual(3, client.send_command.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()